@@ -0,0 +1,180 @@
+"""Cold-start import cost and package size of the Lambda handlers, checked against a budget.
+
+    python benchmarks/cold_start_bench.py [--repeat 5] [--budget benchmarks/cold_start_budget.json]
+                                          [--breakdown 8] [--json FILE]
+
+For every function in LAMBDA_DEFINITIONS and CONSUMER_DEFINITIONS (and the router used in router mode) a fresh interpreter
+imports the handler module laid out as Lambda does it - function asset at the front of sys.path,
+UtilsLayer as /opt/python - and reports the median import time, the number of modules loaded, and
+the heaviest top-level imports from `python -X importtime`. Sizes of the function assets and of the
+layer are recorded unzipped and zipped (what Lambda downloads on a cold start).
+
+Exits with status 1 when a measurement exceeds the budget file. Import times depend on the
+machine: keep the time budget loose and rely on module counts and sizes for tight limits.
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+lambda_code_path = project_root / 'lambda'
+layer_path = lambda_code_path / 'lambda_layer'
+if str(project_root / 'infrastructure') not in sys.path:
+    sys.path.insert(0, str(project_root / 'infrastructure'))
+
+DEFAULT_BUDGET = Path(__file__).with_name('cold_start_budget.json')
+ROUTER = {'handler': 'goals_router/goals_router.lambda_handler', 'path': ''}
+
+# Runs in the child interpreter. Only sys and time (both already loaded at startup) are touched
+# before the handler import, so nothing the handler needs is preloaded
+_PROBE = """
+import sys, time
+before = len(sys.modules)
+started = time.perf_counter()
+__import__(sys.argv[1])
+print((time.perf_counter() - started) * 1000, len(sys.modules) - before)
+"""
+
+
+def handler_module(definition: dict) -> str:
+    module_path = definition['handler'].rpartition('.')[0]
+    return module_path.replace('/', '.')
+
+
+def functions() -> dict:
+    from app_constructs.lambda_module import CONSUMER_DEFINITIONS, LAMBDA_DEFINITIONS
+    return {**LAMBDA_DEFINITIONS, **CONSUMER_DEFINITIONS, 'GoalsRouter': ROUTER}
+
+
+def _environment(definition: dict) -> dict:
+    env = {key: value for key, value in os.environ.items() if not key.startswith('PYTHON')}
+    env.update({
+        # Function asset at /var/task, layer at /opt/python
+        'PYTHONPATH': os.pathsep.join([str(lambda_code_path / definition['path']), str(layer_path / 'python')]),
+        'PYTHONDONTWRITEBYTECODE': '1',
+        'GOALS_TABLE_NAME': 'goals-cold-start',
+        'CURSOR_SIGNING_KEY': 'cold-start-key'
+    })
+    return env
+
+
+def parse_importtime(stderr: str, module: str) -> dict:
+    # Cumulative milliseconds of each import made directly by `module`, from `-X importtime` lines
+    #   import time: self [us] | cumulative | imported package
+    # which are printed children first, nested by two spaces per level
+    direct = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            direct[name.strip()] = int(cumulative)
+        elif depth == 0:
+            if name.strip() == module:
+                return {name: round(us / 1000, 2) for name, us in sorted(direct.items(), key=lambda entry: -entry[1])}
+            direct = {}
+    return {}
+
+
+def measure_import(definition: dict, repeat: int) -> dict:
+    module = handler_module(definition)
+    runs = []
+    breakdown = {}
+    for attempt in range(repeat):
+        # No bytecode cache, like the first import from a freshly extracted asset
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', _PROBE, module],
+            env=_environment(definition), capture_output=True, text=True, check=True,
+            cwd=str(lambda_code_path / definition['path'])
+        )
+        import_ms, modules = completed.stdout.split()
+        runs.append({'import_ms': float(import_ms), 'modules': int(modules)})
+        if attempt == 0:
+            breakdown = parse_importtime(completed.stderr, module)
+    return {
+        'import_ms': round(statistics.median(run['import_ms'] for run in runs), 2),
+        'modules': max(run['modules'] for run in runs),
+        'breakdown_ms': breakdown
+    }
+
+
+def directory_size(path: Path, exclude: tuple = ()) -> dict:
+    # Unzipped bytes and the size of the zip CDK would upload for the directory
+    unzipped = 0
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for file in sorted(path.rglob('*')):
+            relative = file.relative_to(path)
+            if not file.is_file() or '__pycache__' in relative.parts or relative.parts[0] in exclude:
+                continue
+            unzipped += file.stat().st_size
+            archive.write(file, str(relative))
+    return {'unzipped_bytes': unzipped, 'zipped_bytes': len(buffer.getvalue())}
+
+
+def run(repeat: int = 5) -> dict:
+    results = {'functions': {}, 'layer': directory_size(layer_path)}
+    for name, definition in functions().items():
+        exclude = ('lambda_layer',) if definition is ROUTER else ()
+        results['functions'][name] = {
+            **measure_import(definition, repeat),
+            **directory_size(lambda_code_path / definition['path'], exclude)
+        }
+    return results
+
+
+def check_budget(results: dict, budget: dict) -> list:
+    # budget: {"function": {limits}, "functions": {name: {overrides}}, "layer": {limits}}
+    # Limits are keyed like the measurements: import_ms, modules, unzipped_bytes, zipped_bytes
+    violations = []
+    for name, measured in results['functions'].items():
+        limits = {**budget.get('function', {}), **budget.get('functions', {}).get(name, {})}
+        for metric, limit in limits.items():
+            if measured[metric] > limit:
+                violations.append(f"{name}: {metric} {measured[metric]} exceeds budget {limit}")
+    for metric, limit in budget.get('layer', {}).items():
+        if results['layer'][metric] > limit:
+            violations.append(f"UtilsLayer: {metric} {results['layer'][metric]} exceeds budget {limit}")
+    return violations
+
+
+def print_results(results: dict, breakdown: int):
+    print(f"{'function':<14} {'import ms':>10} {'modules':>8} {'asset B':>9} {'zipped B':>9}  heaviest imports (ms)")
+    for name, measured in results['functions'].items():
+        heaviest = ', '.join(f"{module} {ms}" for module, ms in list(measured['breakdown_ms'].items())[:breakdown])
+        print(f"{name:<14} {measured['import_ms']:>10.1f} {measured['modules']:>8} "
+              f"{measured['unzipped_bytes']:>9} {measured['zipped_bytes']:>9}  {heaviest}")
+    layer = results['layer']
+    print(f"{'UtilsLayer':<14} {'':>10} {'':>8} {layer['unzipped_bytes']:>9} {layer['zipped_bytes']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per function; the median is reported')
+    parser.add_argument('--budget', type=Path, default=DEFAULT_BUDGET)
+    parser.add_argument('--breakdown', type=int, default=6, help='top-level imports shown per function')
+    parser.add_argument('--json', type=Path, help='also write the measurements to this file')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print_results(results, args.breakdown)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    violations = check_budget(results, json.loads(args.budget.read_text()))
+    for violation in violations:
+        print(f"OVER BUDGET {violation}")
+    if violations:
+        sys.exit(1)
+    print(f"Within budget ({args.budget.name})")
+
+
+if __name__ == '__main__':
+    main()
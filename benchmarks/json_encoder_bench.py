@@ -0,0 +1,54 @@
+"""Micro-benchmark for the response encoders in utils.json_encoder.
+
+    python benchmarks/json_encoder_bench.py [--repeat N]
+
+Encodes goal lists of 10, 1k and 10k items, shaped like what the handlers return
+(including Decimal and set attributes), with every available encoder.
+"""
+import argparse
+import sys
+import timeit
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / 'lambda/lambda_layer/python'))
+
+from utils.json_encoder import ENCODERS
+
+SIZES = (10, 1_000, 10_000)
+
+
+def make_goals(count: int) -> list:
+    return [
+        {
+            'userId': 'bench-user',
+            'goalId': str(uuid.uuid4()),
+            'title': f'Goal number {i}',
+            'content': 'Run 5 km three times a week and keep a training log. ' * 4,
+            'createdAt': '2025-01-01T12:00:00.000000',
+            'version': Decimal(i % 7 + 1),
+            'tags': {'health', 'sport'}
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'goals':>8} {'encoder':>8} {'best ms':>10} {'MB/s':>8}")
+    for size in SIZES:
+        goals = make_goals(size)
+        number = max(1, 10_000 // size)
+        for name, encoder in ENCODERS.items():
+            payload_size = len(encoder(goals).encode('utf-8'))
+            best = min(timeit.repeat(lambda: encoder(goals), number=number, repeat=args.repeat)) / number
+            print(f"{size:>8} {name:>8} {best * 1000:>10.3f} {payload_size / best / 1e6:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
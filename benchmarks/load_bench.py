@@ -0,0 +1,189 @@
+"""In-process load benchmark for the goal handlers.
+
+    python benchmarks/load_bench.py [--sizes 10,1000,10000,100000] [--seconds 1]
+                                    [--save-baseline FILE] [--baseline FILE --threshold 0.25]
+
+Drives CreateGoal, GetGoal, GetAllGoals (first page, latest page and the legacy full list), UpdateGoal and
+DeleteGoal with API Gateway proxy events carrying Cognito claims, against the in-memory DynamoDB
+stand-in (local/dynamodb.py), for a user whose partition holds each of the given numbers of goals.
+Reports ops/sec and p50/p95/p99 handler latency per route and partition size.
+
+With --baseline the run is compared against a saved one and the script exits with status 1 when a
+route's --metric grew by more than --threshold (and by at least --min-delta-ms, to ignore jitter).
+Baselines are only comparable on the same machine.
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+for path in (project_root / 'lambda/lambda_layer/python', project_root / 'lambda', project_root):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from local.dynamodb import LocalDynamoDB, seed_goals
+from local.events import LambdaContext, proxy_event
+from utils import dynamodb
+from utils.cache import goal_cache
+
+DEFAULT_SIZES = (10, 1_000, 10_000, 100_000)
+ROUTES = ('CreateGoal', 'GetGoal', 'GetAllGoals', 'GetAllGoals:latest', 'GetAllGoals:all', 'UpdateGoal', 'DeleteGoal')
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+USER_ID = 'bench-user'
+MIN_SAMPLES = 5
+
+
+def load_router() -> dict:
+    # The handlers read their configuration at import time, like they do on a cold start
+    os.environ.setdefault('GOALS_TABLE_NAME', 'goals-bench')
+    os.environ.setdefault('CURSOR_SIGNING_KEY', 'bench-signing-key')
+    return importlib.import_module('goals_router.goals_router').ROUTES
+
+
+def percentile(samples: list, fraction: float) -> float:
+    # Nearest-rank percentile of already sorted samples
+    index = max(0, min(len(samples) - 1, int(round(fraction * len(samples) + 0.5)) - 1))
+    return samples[index]
+
+
+def summarize(samples: list) -> dict:
+    samples = sorted(samples)
+    return {
+        'samples': len(samples),
+        'ops_per_sec': round(len(samples) / sum(samples), 1) if sum(samples) else 0.0,
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 4),
+        'p95_ms': round(percentile(samples, 0.95) * 1000, 4),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 4)
+    }
+
+
+def _measure(invoke, make_event, seconds: float, max_requests: int) -> list:
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_requests and (len(samples) < MIN_SAMPLES or time.perf_counter() - started < seconds):
+        event = make_event(len(samples))
+        if event is None:
+            break
+        began = time.perf_counter()
+        invoke(event)
+        samples.append(time.perf_counter() - began)
+    return samples
+
+
+def run_size(routes: dict, size: int, seconds: float, max_requests: int) -> dict:
+    client = LocalDynamoDB()
+    dynamodb.set_client(client)
+    goal_ids = seed_goals(client, dynamodb.get_table_name(), USER_ID, size)
+    created = []
+    rng = random.Random(size)
+
+    def invoke(event):
+        response = routes[(event['httpMethod'], event['resource'])](event, LambdaContext())
+        if response['statusCode'] >= 300:
+            raise RuntimeError(f"{event['httpMethod']} {event['path']} returned {response['statusCode']}: {response['body']}")
+        if event['httpMethod'] == 'POST':
+            created.append(json.loads(response['body'])['goalId'])
+
+    existing = lambda i: {'id': rng.choice(goal_ids)}
+    scenarios = {
+        'CreateGoal': lambda i: proxy_event('POST', '/goals', body={'title': f'Bench goal {i}', 'content': 'Created by the load benchmark'}, user_id=USER_ID),
+        'GetGoal': lambda i: proxy_event('GET', '/goals/{id}', existing(i), user_id=USER_ID),
+        'GetAllGoals': lambda i: proxy_event('GET', '/goals', query={'limit': 20}, user_id=USER_ID),
+        'GetAllGoals:latest': lambda i: proxy_event('GET', '/goals', query={'order': 'desc', 'limit': 20}, user_id=USER_ID),
+        'GetAllGoals:all': lambda i: proxy_event('GET', '/goals', user_id=USER_ID),
+        'UpdateGoal': lambda i: proxy_event('PUT', '/goals/{id}', existing(i), body={'title': f'Updated {i}'}, user_id=USER_ID),
+        'DeleteGoal': lambda i: proxy_event('DELETE', '/goals/{id}', {'id': created[i]}, user_id=USER_ID) if i < len(created) else None
+    }
+
+    results = {}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # Deletes run straight after creates and remove what they added, so the reads and updates
+        # see a partition of exactly `size` goals
+        for route in ('CreateGoal', 'DeleteGoal', 'GetGoal', 'GetAllGoals', 'GetAllGoals:latest', 'GetAllGoals:all', 'UpdateGoal'):
+            results[route] = summarize(_measure(invoke, scenarios[route], seconds, max_requests))
+    return {route: results[route] for route in ROUTES}
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, seconds: float = 1.0, max_requests: int = 10_000, read_cache: bool = False) -> dict:
+    routes = load_router()
+    ttl_seconds = goal_cache.ttl_seconds
+    # Measured without the in-container read cache by default, so reads reach DynamoDB every time
+    goal_cache.clear()
+    if not read_cache:
+        goal_cache.ttl_seconds = 0
+    try:
+        return {str(size): run_size(routes, size, seconds, max_requests) for size in sizes}
+    finally:
+        goal_cache.ttl_seconds = ttl_seconds
+        goal_cache.clear()
+        dynamodb.set_client(None)
+
+
+def find_regressions(baseline: dict, current: dict, threshold: float, metric: str = 'p95_ms', min_delta_ms: float = 0.05) -> list:
+    regressions = []
+    for size, routes in current.items():
+        for route, stats in routes.items():
+            before = baseline.get(size, {}).get(route)
+            if not before or not before.get(metric):
+                continue
+            after = stats[metric]
+            if after > before[metric] * (1 + threshold) and after - before[metric] >= min_delta_ms:
+                regressions.append({
+                    'size': size,
+                    'route': route,
+                    'metric': metric,
+                    'baseline': before[metric],
+                    'current': after,
+                    'change': round(after / before[metric] - 1, 3)
+                })
+    return regressions
+
+
+def print_results(results: dict):
+    print(f"{'goals':>8} {'route':<18} {'samples':>8} {'ops/sec':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for size, routes in results.items():
+        for route, stats in routes.items():
+            print(f"{size:>8} {route:<18} {stats['samples']:>8} {stats['ops_per_sec']:>10.1f} "
+                  f"{stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='comma-separated number of goals in the benchmarked partition')
+    parser.add_argument('--seconds', type=float, default=1.0, help='time budget per route and size')
+    parser.add_argument('--max-requests', type=int, default=10_000)
+    parser.add_argument('--read-cache', action='store_true', help='keep the in-container read cache enabled')
+    parser.add_argument('--save-baseline', type=Path)
+    parser.add_argument('--baseline', type=Path)
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed relative slowdown, 0.25 = 25%%')
+    parser.add_argument('--metric', choices=METRICS, default='p95_ms')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = run_benchmark(sizes, args.seconds, args.max_requests, args.read_cache)
+    print_results(results)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2))
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = find_regressions(json.loads(args.baseline.read_text()), results, args.threshold, args.metric, args.min_delta_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression['route']} at {regression['size']} goals: {regression['metric']} "
+                  f"{regression['baseline']} -> {regression['current']} (+{regression['change']:.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No route slower than baseline by more than {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Recommended memory and architecture per function, from load benchmark results.
+
+    python benchmarks/load_bench.py --save-baseline results.json
+    python benchmarks/profile_recommender.py results.json [--target-ms 100] [--size 100000]
+                                             [--cpu-factor 1.0] [--io-ms 10] [--json FILE]
+
+load_bench.py runs against the in-memory DynamoDB, so what it measures is CPU time, and Lambda
+hands out CPU in proportion to memory: one full vCPU at 1769 MB, a fraction of it below. The p95 a
+route had (worst of its variants, at the given partition size) is taken as its time on one vCPU -
+times --cpu-factor, how much slower a Lambda vCPU is than the benchmark machine - scaled up for
+smaller memory sizes, plus --io-ms for the DynamoDB round trips, which no amount of memory
+shortens. Of the sizes and architectures that stay under --target-ms, the cheapest per million
+invocations is recommended; a function that can't make the target gets the fastest option.
+
+The output is the LAMBDA_PROFILES value for the environment file, see
+infrastructure/app_constructs/lambda_module.py. Functions load_bench.py doesn't drive keep the
+profile of their definition.
+"""
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root / 'infrastructure') not in sys.path:
+    sys.path.insert(0, str(project_root / 'infrastructure'))
+
+# Above one vCPU more memory only adds cores, which a single-threaded handler doesn't use
+FULL_VCPU_MB = 1769
+MEMORY_SIZES = (128, 256, 512, 1024, FULL_VCPU_MB)
+# USD per GB-second and per request (us-east-1)
+GB_SECOND_PRICES = {'arm64': 0.0000133334, 'x86_64': 0.0000166667}
+REQUEST_PRICE = 0.0000002
+# Time a request spends waiting on DynamoDB within the region
+DEFAULT_IO_MS = 10.0
+
+
+def function_name(route: str) -> str:
+    # load_bench.py reports variants of one function as "GetAllGoals:latest"
+    return route.partition(':')[0]
+
+
+def route_times(results: dict, size: str = None, metric: str = 'p95_ms') -> dict:
+    # Worst metric per function at one partition size (the largest one by default)
+    size = size or max(results, key=int)
+    times = {}
+    for route, stats in results[size].items():
+        name = function_name(route)
+        times[name] = max(times.get(name, 0.0), stats[metric])
+    return times
+
+
+def estimate(cpu_ms: float, memory_mb: int, architecture: str, io_ms: float = DEFAULT_IO_MS, arm_factor: float = 1.0) -> dict:
+    duration_ms = cpu_ms * max(1.0, FULL_VCPU_MB / memory_mb) * (arm_factor if architecture == 'arm64' else 1.0) + io_ms
+    # Billed per started millisecond
+    billed_seconds = math.ceil(duration_ms) / 1000
+    return {
+        'memory_mb': memory_mb,
+        'architecture': architecture,
+        'duration_ms': round(duration_ms, 2),
+        'cost_per_million': round((memory_mb / 1024 * billed_seconds * GB_SECOND_PRICES[architecture] + REQUEST_PRICE) * 1_000_000, 4)
+    }
+
+
+def recommend(cpu_ms: float, target_ms: float, io_ms: float = DEFAULT_IO_MS, arm_factor: float = 1.0) -> dict:
+    candidates = [estimate(cpu_ms, memory_mb, architecture, io_ms, arm_factor)
+                  for architecture in GB_SECOND_PRICES for memory_mb in MEMORY_SIZES]
+    within = [candidate for candidate in candidates if candidate['duration_ms'] <= target_ms]
+    if within:
+        return {**min(within, key=lambda candidate: (candidate['cost_per_million'], candidate['duration_ms'])), 'meets_target': True}
+    return {**min(candidates, key=lambda candidate: (candidate['duration_ms'], candidate['cost_per_million'])), 'meets_target': False}
+
+
+def recommend_profiles(results: dict, target_ms: float, size: str = None, cpu_factor: float = 1.0,
+                       io_ms: float = DEFAULT_IO_MS, arm_factor: float = 1.0) -> dict:
+    return {name: recommend(cpu_ms * cpu_factor, target_ms, io_ms, arm_factor)
+            for name, cpu_ms in route_times(results, size).items()}
+
+
+def lambda_profiles(recommendations: dict) -> dict:
+    return {name: {'memory_mb': recommendation['memory_mb'], 'architecture': recommendation['architecture']}
+            for name, recommendation in recommendations.items()}
+
+
+def print_recommendations(recommendations: dict, target_ms: float):
+    from app_constructs.lambda_module import LAMBDA_DEFINITIONS, resolve_profile
+    print(f"{'function':<14} {'current':>12} {'recommended':>16} {'est. ms':>9} {'$/1M':>9}")
+    for name, recommendation in recommendations.items():
+        current = resolve_profile(name, LAMBDA_DEFINITIONS.get(name, {}).get('profile'))
+        missed = '' if recommendation['meets_target'] else f'  misses {target_ms} ms'
+        print(f"{name:<14} {current['memory_mb']:>5} {current['architecture']:>6} "
+              f"{recommendation['memory_mb']:>7} {recommendation['architecture']:>8} "
+              f"{recommendation['duration_ms']:>9.2f} {recommendation['cost_per_million']:>9.4f}{missed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('results', type=Path, help='results of load_bench.py --save-baseline')
+    parser.add_argument('--target-ms', type=float, default=100.0, help='p95 each function should stay under')
+    parser.add_argument('--size', help='partition size to size for; the largest in the results by default')
+    parser.add_argument('--cpu-factor', type=float, default=1.0, help='Lambda vCPU time per benchmark-machine CPU time')
+    parser.add_argument('--io-ms', type=float, default=DEFAULT_IO_MS, help='DynamoDB wait per request')
+    parser.add_argument('--arm-factor', type=float, default=1.0, help='arm64 time per x86_64 time')
+    parser.add_argument('--json', type=Path, help='also write the LAMBDA_PROFILES value to this file')
+    args = parser.parse_args()
+
+    recommendations = recommend_profiles(json.loads(args.results.read_text()), args.target_ms, args.size,
+                                         args.cpu_factor, args.io_ms, args.arm_factor)
+    print_recommendations(recommendations, args.target_ms)
+    profiles = json.dumps(lambda_profiles(recommendations), separators=(',', ':'))
+    print(f"\nLAMBDA_PROFILES='{profiles}'")
+    if args.json:
+        args.json.write_text(profiles)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ from aws_cdk import (
     aws_cognito as cognito,
     aws_logs as logs,
     aws_cloudwatch as cw,
+    aws_iam as iam,
     aws_sns as sns,
     aws_sns_subscriptions as subscriptions,
     Duration,
@@ -16,6 +17,108 @@ from config.app_config import AppConfig
 
 from .lambda_module import LambdaModule
 
+# Stage cache keys for the read routes. The Authorization header keeps entries private to the caller,
+# Accept-Encoding separates compressed variants and "v" is the frontend's cache-busting write marker.
+# These routes answer 304 when If-None-Match matches, so it is a key too: otherwise a cached empty
+# 304 would be served to a caller that sent no validator and needs the body.
+GOALS_LIST_CACHE_KEYS = [
+    "method.request.header.Authorization",
+    "method.request.header.Accept-Encoding",
+    "method.request.header.If-None-Match",
+    "method.request.querystring.order",
+    "method.request.querystring.view",
+    "method.request.querystring.limit",
+    "method.request.querystring.cursor",
+    "method.request.querystring.v"
+]
+GOAL_CACHE_KEYS = [
+    "method.request.header.Authorization",
+    "method.request.header.Accept-Encoding",
+    "method.request.header.If-None-Match",
+    "method.request.path.id",
+    "method.request.querystring.v"
+]
+
+def _cache_request_parameters(cache_keys: list[str]) -> dict:
+    return {key: key in ("method.request.header.Authorization", "method.request.path.id") for key in cache_keys}
+
+# Every method of the API and the LambdaModule function behind it. The construct builds its resources,
+# CORS preflights and methods from this table, and local/api.py serves the same table on one box.
+# All routes use the Cognito user pool authorizer. "direct" routes can be served by API Gateway
+# straight from DynamoDB instead (GOAL_READ_INTEGRATION=dynamodb); /goals/{id}/full is the
+# Lambda read those fall back to for goals whose content is compressed or offloaded.
+API_ROUTES = [
+    {"path": "/goals", "method": "GET", "function": "GetAllGoals", "cache_keys": GOALS_LIST_CACHE_KEYS},
+    {"path": "/goals", "method": "POST", "function": "CreateGoal", "method_responses": ["200", "500"]},
+    {"path": "/goals/{id}", "method": "GET", "function": "GetGoal", "cache_keys": GOAL_CACHE_KEYS, "direct": True},
+    {"path": "/goals/{id}/full", "method": "GET", "function": "GetGoal", "cache_keys": GOAL_CACHE_KEYS},
+    {"path": "/goals/{id}", "method": "PUT", "function": "UpdateGoal"},
+    {"path": "/goals/{id}", "method": "DELETE", "function": "DeleteGoal"},
+    {"path": "/goals/batch", "method": "POST", "function": "BatchGoals"},
+    {"path": "/goals/batch-get", "method": "POST", "function": "BatchGetGoals"},
+    {"path": "/goals/search", "method": "GET", "function": "SearchGoals"},
+    {"path": "/goals/stats", "method": "GET", "function": "GoalStats"}
+]
+CORS_ALLOW_HEADERS = ["Content-Type", "X-Amz-Date", "Authorization", "X-Api-Key", "X-Amz-Security-Token"]
+GOAL_READ_INTEGRATIONS = ("lambda", "dynamodb")
+
+# GetItem request of the direct integration: the caller's Cognito sub and the path id, the same key
+# get_goal.py reads. escapeJavaScript also escapes ' which JSON doesn't allow, so its escaped form is
+# turned back into ' (taken from escapeJavaScript itself rather than written as a backslash literal)
+GET_ITEM_REQUEST_TEMPLATE = r'''#set($escapedApostrophe = $util.escapeJavaScript("'"))
+{
+    "TableName": "%(table_name)s",
+    "Key": {
+        "userId": {"S": "$context.authorizer.claims.sub"},
+        "goalId": {"S": "$util.escapeJavaScript($input.params('id')).replace($escapedApostrophe, "'")"}
+    }
+}'''
+
+# GetItem response reshaped into get_goal.py's JSON: every string and number attribute of the item.
+# With application/json as a binary media type the DynamoDB response may be treated as binary, and
+# CONVERT_TO_TEXT then hands it to the template base64-encoded. Like get_goal.py,
+# reserved sort keys (search index, stats, summaries) are not goals. Compressed or offloaded
+# content can't be decoded here, so those goals redirect to the Lambda read. The ETag is item_etag()'s,
+# the goal's id and version, 0 for goals written before versions existed.
+GET_ITEM_RESPONSE_TEMPLATE = r'''#set($raw = $input.body)
+#if($raw.startsWith("{"))#set($json = $raw)#else#set($json = $util.base64Decode($raw))#end
+#set($item = $util.parseJson($json).Item)
+#set($q = '"')
+#set($escapedApostrophe = $util.escapeJavaScript("'"))
+#if(!$item || !$item.goalId || $item.goalId.S.startsWith("~"))
+#set($context.responseOverride.status = 404)
+{"error": "Goal not found or not authorized"}
+#elseif($item.containsKey("contentZ") || $item.containsKey("contentRef"))
+#set($context.responseOverride.status = 307)
+#set($version = "$!input.params('v')")
+#set($context.responseOverride.header.Location = "/$context.stage/goals/$util.urlEncode($item.goalId.S)/full#if($version != '')?v=$util.urlEncode($version)#end")
+{"goalId": "$item.goalId.S"}
+#else
+#if($item.version)#set($itemVersion = $item.version.N)#else#set($itemVersion = "0")#end
+#set($etag = "${q}$item.goalId.S:$itemVersion${q}")
+#set($context.responseOverride.header.ETag = $etag)
+#set($ifNoneMatch = "$!input.params('If-None-Match')")
+#if($ifNoneMatch.contains($etag) || $ifNoneMatch.trim() == "*")
+#set($context.responseOverride.status = 304)
+#else
+{#set($first = true)#foreach($name in $item.keySet())#set($value = $item.get($name))#if($value.containsKey("S") || $value.containsKey("N"))#if(!$first),#end#set($first = false)
+"$name": #if($value.containsKey("S"))"$util.escapeJavaScript($value.S).replace($escapedApostrophe, "'")"#else$value.N#end#end#end
+}
+#end
+#end'''
+
+
+def cors_preflight_options() -> dict:
+    # Per resource path: the methods it serves and, for readable resources, the conditional request headers
+    options = {}
+    for route in API_ROUTES:
+        cors = options.setdefault(route["path"], {"allow_methods": ["OPTIONS"], "allow_headers": list(CORS_ALLOW_HEADERS), "expose_headers": []})
+        cors["allow_methods"].append(route["method"])
+        if route["method"] == "GET":
+            cors["allow_headers"].append("If-None-Match")
+            cors["expose_headers"].append("ETag")
+    return options
+
 
 class APIGateway(Construct):
     def __init__(self, scope: Construct, api_id: str, api_name: str, cognito_name: str, auth_name: str,
@@ -71,7 +174,15 @@ class APIGateway(Construct):
             rest_api_name=f"{api_name}-{config.environment}",
             description="This service manages goals",
             cloud_watch_role=True,
+            # Lets Lambda return base64 encoded gzip/br bodies, which are application/json like every
+            # other response; compression itself is negotiated in the handlers (utils.compression), so
+            # stage-level minimum_compression_size stays unset. Only that type: a wildcard would also
+            # make the body-less CORS preflight binary and skip its MOCK request template
+            binary_media_types=["application/json"],
             deploy_options=apigateway.StageOptions(
+                cache_cluster_enabled=config.api_cache_enabled,
+                cache_cluster_size=config.api_cache_cluster_size if config.api_cache_enabled else None,
+                method_options=self._read_cache_method_options(config),
                 logging_level=apigateway.MethodLoggingLevel.INFO,
                 data_trace_enabled=True,
                 access_log_destination=apigateway.LogGroupLogDestination(self.log_group),
@@ -95,61 +206,35 @@ class APIGateway(Construct):
             identity_source="method.request.header.Authorization"
         )  
 
-        goals_resource = self.rest_api.root.add_resource("goals", 
-            default_cors_preflight_options=apigateway.CorsOptions(
-                allow_origins=apigateway.Cors.ALL_ORIGINS,
-                allow_methods=["OPTIONS", "GET", "POST"],
-                allow_headers=["Content-Type", "X-Amz-Date", "Authorization", "X-Api-Key", "X-Amz-Security-Token"],
-                allow_credentials=True
-            )
-        )       
-        
-        goal_id_resource = goals_resource.add_resource("{id}",
-            default_cors_preflight_options=apigateway.CorsOptions(
-                allow_origins=apigateway.Cors.ALL_ORIGINS,
-                allow_methods=["OPTIONS", "GET", "PUT", "DELETE"],
-                allow_headers=["Content-Type", "X-Amz-Date", "Authorization", "X-Api-Key", "X-Amz-Security-Token"],
-                allow_credentials=True
-            ))
+        resources = {"": self.rest_api.root}
+        for path, cors in cors_preflight_options().items():
+            parent_path, _, part = path.rpartition("/")
+            resources[path] = resources[parent_path].add_resource(part,
+                default_cors_preflight_options=apigateway.CorsOptions(
+                    allow_origins=apigateway.Cors.ALL_ORIGINS,
+                    allow_methods=cors["allow_methods"],
+                    allow_headers=cors["allow_headers"],
+                    expose_headers=cors["expose_headers"] or None,
+                    allow_credentials=True
+                ))
 
+        if config.goal_read_integration not in GOAL_READ_INTEGRATIONS:
+            raise ValueError(f"GOAL_READ_INTEGRATION must be one of {GOAL_READ_INTEGRATIONS}")
 
-        goals_resource.add_method("POST",
-            apigateway.LambdaIntegration(lambdaFn.lambdas["CreateGoal"]),
-            authorization_type=apigateway.AuthorizationType.COGNITO,
-            authorizer=authorizer,
-            method_responses=[
-                apigateway.MethodResponse(status_code="200"),
-                apigateway.MethodResponse(status_code="500")
-            ]
-        )
-
-        # GET /goals
-        goals_resource.add_method("GET",
-            apigateway.LambdaIntegration(lambdaFn.lambdas["GetAllGoals"]),
-            authorization_type=apigateway.AuthorizationType.COGNITO,
-            authorizer=authorizer
-        )
-
-        # GET /goals/{ID}
-        goal_id_resource.add_method("GET",
-            apigateway.LambdaIntegration(lambdaFn.lambdas["GetGoal"]),
-            authorization_type=apigateway.AuthorizationType.COGNITO,
-            authorizer=authorizer
-        )
-
-        # PUT /goals/{ID}
-        goal_id_resource.add_method("PUT",
-            apigateway.LambdaIntegration(lambdaFn.lambdas["UpdateGoal"]),
-            authorization_type=apigateway.AuthorizationType.COGNITO,
-            authorizer=authorizer
-        )
-
-         # DELETE /goals/{ID}
-        goal_id_resource.add_method("DELETE",
-            apigateway.LambdaIntegration(lambdaFn.lambdas["DeleteGoal"]),
-            authorization_type=apigateway.AuthorizationType.COGNITO,
-            authorizer=authorizer
-        )
+        for route in API_ROUTES:
+            cache_keys = route.get("cache_keys")
+            integration = apigateway.LambdaIntegration(lambdaFn.route_functions[route["function"]], cache_key_parameters=cache_keys)
+            method_responses = [apigateway.MethodResponse(status_code=code) for code in route["method_responses"]] \
+                if "method_responses" in route else None
+            if route.get("direct") and config.goal_read_integration == "dynamodb":
+                integration, method_responses = self._get_item_integration(config, cache_keys)
+            resources[route["path"]].add_method(route["method"],
+                integration,
+                authorization_type=apigateway.AuthorizationType.COGNITO,
+                authorizer=authorizer,
+                request_parameters=_cache_request_parameters(cache_keys) if cache_keys else None,
+                method_responses=method_responses
+            )
 
        # Outputs
         CfnOutput(self, "APIGatewayURL",
@@ -163,4 +248,72 @@ class APIGateway(Construct):
         CfnOutput(self, "CognitoUserPoolClientId",
             value=self.user_pool_client.user_pool_client_id,
             description="Cognito User Pool Client ID"
-        )
\ No newline at end of file
+        )
+
+    def _get_item_integration(self, config: AppConfig, cache_keys: list[str]):
+        # GET /goals/{id} without a Lambda invocation: API Gateway calls GetItem itself, with a role
+        # that can do nothing else
+        if not hasattr(self, "get_item_role"):
+            self.get_item_role = iam.Role(self, f"GoalGetItemRole-{config.environment}",
+                assumed_by=iam.ServicePrincipal("apigateway.amazonaws.com")
+            )
+            self.get_item_role.add_to_policy(iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=["dynamodb:GetItem"],
+                resources=[config.table_arn]
+            ))
+
+        response_headers = ["Access-Control-Allow-Origin", "Access-Control-Expose-Headers", "ETag", "Location"]
+        cors_parameters = {
+            "method.response.header.Access-Control-Allow-Origin": "'*'",
+            "method.response.header.Access-Control-Expose-Headers": "'ETag'"
+        }
+        integration = apigateway.AwsIntegration(
+            service="dynamodb",
+            action="GetItem",
+            options=apigateway.IntegrationOptions(
+                credentials_role=self.get_item_role,
+                cache_key_parameters=cache_keys,
+                passthrough_behavior=apigateway.PassthroughBehavior.NEVER,
+                # application/json is a binary media type (see binary_media_types): payloads API Gateway
+                # treats as binary reach the templates base64-encoded instead of bypassing them
+                content_handling=apigateway.ContentHandling.CONVERT_TO_TEXT,
+                request_templates={"application/json": GET_ITEM_REQUEST_TEMPLATE % {"table_name": config.full_table_name}},
+                integration_responses=[
+                    apigateway.IntegrationResponse(
+                        status_code="200",
+                        content_handling=apigateway.ContentHandling.CONVERT_TO_TEXT,
+                        response_parameters=cors_parameters,
+                        response_templates={"application/json": GET_ITEM_RESPONSE_TEMPLATE}
+                    ),
+                    # Throttling, validation or service errors of the GetItem call
+                    apigateway.IntegrationResponse(
+                        status_code="500",
+                        selection_pattern="[45]\\d{2}",
+                        content_handling=apigateway.ContentHandling.CONVERT_TO_TEXT,
+                        response_parameters=cors_parameters,
+                        response_templates={"application/json": '{"error": "Internal server error"}'}
+                    )
+                ]
+            )
+        )
+        # Statuses the response template can switch to with $context.responseOverride
+        method_responses = [
+            apigateway.MethodResponse(status_code=code, response_parameters={f"method.response.header.{header}": False for header in response_headers})
+            for code in ("200", "304", "307", "404", "500")
+        ]
+        return integration, method_responses
+
+    def _read_cache_method_options(self, config: AppConfig) -> dict:
+        if not config.api_cache_enabled:
+            return None
+        read_cache = apigateway.MethodDeploymentOptions(
+            caching_enabled=True,
+            cache_ttl=Duration.seconds(config.api_cache_ttl_seconds),
+            cache_data_encrypted=True
+        )
+        return {
+            "/goals/GET": read_cache,
+            "/goals/{id}/GET": read_cache,
+            "/goals/{id}/full/GET": read_cache
+        }
\ No newline at end of file
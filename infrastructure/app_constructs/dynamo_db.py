@@ -21,6 +21,8 @@ class DynamoDB(Construct):
                 type=dynamodb.AttributeType.STRING
             ),
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            # Feeds the GoalSummary consumer (LambdaModule); both images so goal removals can be filtered on
+            stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES,
             encryption=dynamodb.TableEncryption.AWS_MANAGED,
             removal_policy=RemovalPolicy.DESTROY
         )
\ No newline at end of file
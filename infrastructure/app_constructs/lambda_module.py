@@ -1,9 +1,15 @@
 from aws_cdk import (
+    aws_applicationautoscaling as appscaling,
+    aws_dynamodb as dynamodb,
     aws_iam as iam,
     aws_lambda as _lambda,
+    aws_lambda_event_sources as event_sources,
     aws_logs as logs,
+    aws_s3 as s3,
+    aws_sqs as sqs,
     RemovalPolicy,
-    Duration
+    Duration,
+    Size
 )
 from constructs import Construct
 from pathlib import Path
@@ -14,8 +20,143 @@ lambda_layer_code_path = project_root / 'lambda/lambda_layer'
 
 from config.app_config import AppConfig
 
+# Sizing of a function. Memory also sets the CPU share (one full vCPU at 1769 MB), so JSON-heavy
+# handlers get more than the single-item ones. Everything runs on arm64: the code and the utils
+# layer are pure Python. benchmarks/profile_recommender.py suggests values from benchmark results,
+# and AppConfig.lambda_profiles overrides them per environment.
+DEFAULT_PROFILE = {
+    "memory_mb": 128,
+    "architecture": "arm64",
+    "timeout_s": 5,
+    "ephemeral_storage_mb": 512,
+    "reserved_concurrency": None
+}
+ARCHITECTURES = {"arm64": _lambda.Architecture.ARM_64, "x86_64": _lambda.Architecture.X86_64}
+
+# Goal handlers by route name: handler module inside lambda/<path>/, the DynamoDB actions its role gets,
+# for handlers that touch offloaded goal content its actions on the content bucket, and the
+# profile keys that differ from DEFAULT_PROFILE.
+# api_gateway.API_ROUTES refers to these names.
+LAMBDA_DEFINITIONS = {
+    "GetAllGoals": {
+        "handler": "get_all_goals.lambda_handler",
+        "path":    "get_all_goals",
+        "actions": ["dynamodb:Query", "dynamodb:Scan"],
+        "profile": {"memory_mb": 512}
+    },
+    "CreateGoal": {
+        "handler": "create_goal.lambda_handler",
+        "path":    "create_goal",
+        "actions": ["dynamodb:PutItem", "dynamodb:GetItem", "dynamodb:BatchWriteItem"],
+        "bucket_actions": ["s3:PutObject", "s3:DeleteObject"],
+        "profile": {"memory_mb": 256}
+    },
+    "GetGoal": {
+        "handler": "get_goal.lambda_handler",
+        "path":    "get_goal",
+        "actions": ["dynamodb:GetItem"],
+        "bucket_actions": ["s3:GetObject"]
+    },
+    "UpdateGoal": {
+        "handler": "update_goal.lambda_handler",
+        "path":    "update_goal",
+        "actions": ["dynamodb:UpdateItem", "dynamodb:BatchWriteItem"],
+        "bucket_actions": ["s3:PutObject", "s3:GetObject", "s3:DeleteObject"],
+        "profile": {"memory_mb": 256}
+    },
+    "DeleteGoal": {
+        "handler": "delete_goal.lambda_handler",
+        "path":    "delete_goal",
+        "actions": ["dynamodb:GetItem", "dynamodb:DeleteItem", "dynamodb:BatchWriteItem"],
+        "bucket_actions": ["s3:DeleteObject"]
+    },
+    "BatchGoals": {
+        "handler": "batch_goals.lambda_handler",
+        "path":    "batch_goals",
+        "actions": ["dynamodb:BatchWriteItem", "dynamodb:BatchGetItem"],
+        "bucket_actions": ["s3:PutObject", "s3:DeleteObject"],
+        "profile": {"memory_mb": 512, "timeout_s": 10}
+    },
+    "BatchGetGoals": {
+        "handler": "batch_get_goals.lambda_handler",
+        "path":    "batch_get_goals",
+        "actions": ["dynamodb:BatchGetItem"],
+        "profile": {"memory_mb": 512}
+    },
+    "SearchGoals": {
+        "handler": "search_goals.lambda_handler",
+        "path":    "search_goals",
+        "actions": ["dynamodb:Query", "dynamodb:BatchGetItem"],
+        "profile": {"memory_mb": 256}
+    },
+    "GoalStats": {
+        "handler": "goal_stats.lambda_handler",
+        "path":    "goal_stats",
+        "actions": ["dynamodb:GetItem", "dynamodb:Query", "dynamodb:UpdateItem"],
+        "profile": {"timeout_s": 10}
+    }
+}
+
+# Functions fed by the table stream or a queue rather than API Gateway; deployed the same way in both modes
+CONSUMER_DEFINITIONS = {
+    "GoalSummary": {
+        "handler": "goal_summary.lambda_handler",
+        "path":    "goal_summary",
+        "actions": ["dynamodb:Query", "dynamodb:PutItem", "dynamodb:DeleteItem", "dynamodb:UpdateItem"],
+        "profile": {"memory_mb": 256, "timeout_s": 30}
+    },
+    # Only deployed with CREATE_GOAL_MODE=queue
+    "GoalWriter": {
+        "handler": "goal_writer.lambda_handler",
+        "path":    "goal_writer",
+        "actions": ["dynamodb:BatchWriteItem", "dynamodb:BatchGetItem"],
+        "profile": {"memory_mb": 256, "timeout_s": 30}
+    }
+}
+CREATE_GOAL_MODES = ("sync", "queue")
+# Receives before a goal that can't be written moves to the dead-letter queue
+GOAL_WRITE_MAX_RECEIVES = 5
+
+# Inclusive bounds Lambda accepts for each numeric profile key
+PROFILE_LIMITS = {
+    "memory_mb": (128, 10240),
+    "timeout_s": (1, 900),
+    "ephemeral_storage_mb": (512, 10240),
+    "reserved_concurrency": (0, 10000)
+}
+
+
+def resolve_profile(name: str, profile: dict = None, override: dict = None) -> dict:
+    # DEFAULT_PROFILE, then the definition's profile, then the environment's override
+    resolved = {**DEFAULT_PROFILE, **(profile or {}), **(override or {})}
+    unknown = set(resolved) - set(DEFAULT_PROFILE)
+    if unknown:
+        raise ValueError(f"{name}: unknown profile keys {sorted(unknown)}")
+    if resolved["architecture"] not in ARCHITECTURES:
+        raise ValueError(f"{name}: architecture must be one of {sorted(ARCHITECTURES)}")
+    for key, (low, high) in PROFILE_LIMITS.items():
+        value = resolved[key]
+        if value is None and key == "reserved_concurrency":
+            continue
+        if not isinstance(value, int) or isinstance(value, bool) or not low <= value <= high:
+            raise ValueError(f"{name}: {key} must be an integer between {low} and {high}")
+    return resolved
+
+
+def router_profile(definitions: dict) -> dict:
+    # The router serves every route, so it needs the most any of them asks for, and can only move to
+    # arm64 once they all have
+    profiles = [resolve_profile(name, details.get("profile")) for name, details in definitions.items()]
+    return {
+        "memory_mb": max(profile["memory_mb"] for profile in profiles),
+        "architecture": "arm64" if all(profile["architecture"] == "arm64" for profile in profiles) else "x86_64",
+        "timeout_s": max(profile["timeout_s"] for profile in profiles),
+        "ephemeral_storage_mb": max(profile["ephemeral_storage_mb"] for profile in profiles)
+    }
+
+
 class LambdaModule(Construct):
-    def __init__(self, scope: Construct, construct_id: str, config: AppConfig, **kwargs):
+    def __init__(self, scope: Construct, construct_id: str, config: AppConfig, table: dynamodb.ITable = None, **kwargs):
         super().__init__(scope, construct_id, **kwargs)
         self.scope = scope
         #self.dashboard = dashboard
@@ -23,53 +164,181 @@ class LambdaModule(Construct):
         self.config = config
         self.lambdas = {}
         self.log_groups = {}
+        # Function backing each entry of lambda_definitions; the same router function for all of them in router mode.
+        # These are the "live" aliases, which carry any provisioned concurrency
+        self.route_functions = {}
+        self.aliases = {}
+        # Resolved profile of each function, by name
+        self.profiles = {}
+        # Create requests waiting for GoalWriter, and the ones it gave up on (CREATE_GOAL_MODE=queue)
+        self.goal_write_queue = None
+        self.goal_write_dead_letter_queue = None
 
-        self.lambda_definitions = {
-            "GetAllGoals": {
-                "handler": "get_all_goals.lambda_handler",
-                "path":    "get_all_goals",
-                "actions": ["dynamodb:Query", "dynamodb:Scan"]
-            },
-            "CreateGoal": {
-                "handler": "create_goal.lambda_handler",
-                "path":    "create_goal",
-                "actions": ["dynamodb:PutItem", "dynamodb:GetItem"]
-            },
-            "GetGoal": {
-                "handler": "get_goal.lambda_handler",
-                "path":    "get_goal",
-                "actions": ["dynamodb:GetItem"]
-            },
-            "UpdateGoal": {
-                "handler": "update_goal.lambda_handler",
-                "path":    "update_goal",
-                "actions": ["dynamodb:UpdateItem", "dynamodb:GetItem"]
-            },
-            "DeleteGoal": {
-                "handler": "delete_goal.lambda_handler",
-                "path":    "delete_goal",
-                "actions": ["dynamodb:DeleteItem", "dynamodb:GetItem"]
-            }
-        }
+        self.lambda_definitions = LAMBDA_DEFINITIONS
         utils_layer = _lambda.LayerVersion(
             self, f"UtilsLayer-{config.environment}",
             code=_lambda.Code.from_asset(str(lambda_layer_code_path)),
             compatible_runtimes=[_lambda.Runtime.PYTHON_3_10],
+            compatible_architectures=list(ARCHITECTURES.values()),
             description="Shared utils layer"
         )
 
+        # Goal content too large to keep in the table even compressed (lambda/lambda_layer/python/utils/content.py)
+        self.content_bucket = s3.Bucket(
+            self, f"GoalContentBucket-{config.environment}",
+            encryption=s3.BucketEncryption.S3_MANAGED,
+            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+            enforce_ssl=True,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
         log_group_prefix = f"{construct_id}_log_group-{config.environment}-{config.app_name}_"
 
-        for name, details in self.lambda_definitions.items():
-            role = self._create_lambda_role(f"{name}LambdaRole-{config.environment}", details["actions"])
-            log_group = self._create_log_group(log_group_prefix, name)
-            lambda_fn = self._create_lambda(name, details["handler"], details["path"], role, log_group, utils_layer)
+        if config.create_goal_mode not in CREATE_GOAL_MODES:
+            raise ValueError(f"CREATE_GOAL_MODE must be one of {CREATE_GOAL_MODES}")
+        if config.create_goal_mode == "queue":
+            self._create_goal_writer(log_group_prefix, utils_layer)
 
-            self.lambdas[name] = lambda_fn
-            self.log_groups[name] = log_group
+        if config.lambda_deployment_mode == "router":
+            self._create_router(log_group_prefix, utils_layer)
+        else:
+            for name, details in self.lambda_definitions.items():
+                role = self._create_lambda_role(f"{name}LambdaRole-{config.environment}", details["actions"], details.get("bucket_actions"))
+                log_group = self._create_log_group(log_group_prefix, name)
+                code = _lambda.Code.from_asset(str(lambda_code_path/details["path"]))
+                profile = resolve_profile(name, details.get("profile"), config.lambda_profiles.get(name))
+                lambda_fn = self._create_lambda(name, details["handler"], code, role, log_group, utils_layer, profile)
 
+                self.lambdas[name] = lambda_fn
+                self.log_groups[name] = log_group
+                if name == "CreateGoal":
+                    self._connect_goal_write_queue(lambda_fn)
+                self.route_functions[name] = self._create_alias(name, lambda_fn)
 
-    def _create_lambda_role(self, role_name: str, actions: list[str]) ->iam.Role:
+        unknown = set(config.provisioned_concurrency) - set(self.aliases)
+        if unknown:
+            raise ValueError(f"PROVISIONED_CONCURRENCY names functions this deployment doesn't have: {sorted(unknown)}")
+
+        if table is not None and table.table_stream_arn:
+            self._create_summary_consumer(log_group_prefix, utils_layer, table)
+
+        unknown = set(config.lambda_profiles) - set(self.lambdas)
+        if unknown:
+            raise ValueError(f"LAMBDA_PROFILES names functions this deployment doesn't have: {sorted(unknown)}")
+
+    def _create_summary_consumer(self, log_group_prefix: str, utils_layer: _lambda.LayerVersion, table: dynamodb.ITable):
+        name = "GoalSummary"
+        details = CONSUMER_DEFINITIONS[name]
+        role = self._create_lambda_role(f"{name}LambdaRole-{self.config.environment}", details["actions"])
+        log_group = self._create_log_group(log_group_prefix, name)
+        code = _lambda.Code.from_asset(str(lambda_code_path/details["path"]))
+        profile = resolve_profile(name, details.get("profile"), self.config.lambda_profiles.get(name))
+        lambda_fn = self._create_lambda(name, details["handler"], code, role, log_group, utils_layer, profile)
+        lambda_fn.add_event_source(event_sources.DynamoEventSource(table,
+            starting_position=_lambda.StartingPosition.TRIM_HORIZON,
+            batch_size=100,
+            max_batching_window=Duration.seconds(1),
+            bisect_batch_on_error=True,
+            retry_attempts=10,
+            report_batch_item_failures=True,
+            # Only goal items carry a title; search index, stats and the summary shards themselves
+            # never reach the consumer
+            filters=[
+                _lambda.FilterCriteria.filter({"dynamodb": {"NewImage": {"title": {"S": _lambda.FilterRule.exists()}}}}),
+                _lambda.FilterCriteria.filter({"dynamodb": {"OldImage": {"title": {"S": _lambda.FilterRule.exists()}}}})
+            ]
+        ))
+
+        self.lambdas[name] = lambda_fn
+        self.log_groups[name] = log_group
+
+    def _create_goal_writer(self, log_group_prefix: str, utils_layer: _lambda.LayerVersion):
+        name = "GoalWriter"
+        details = CONSUMER_DEFINITIONS[name]
+        role = self._create_lambda_role(f"{name}LambdaRole-{self.config.environment}", details["actions"])
+        log_group = self._create_log_group(log_group_prefix, name)
+        code = _lambda.Code.from_asset(str(lambda_code_path/details["path"]))
+        profile = resolve_profile(name, details.get("profile"), self.config.lambda_profiles.get(name))
+        lambda_fn = self._create_lambda(name, details["handler"], code, role, log_group, utils_layer, profile)
+
+        self.goal_write_dead_letter_queue = sqs.Queue(
+            self, f"GoalWriteDeadLetterQueue-{self.config.environment}",
+            encryption=sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+            retention_period=Duration.days(14)
+        )
+        self.goal_write_queue = sqs.Queue(
+            self, f"GoalWriteQueue-{self.config.environment}",
+            encryption=sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+            # Six times the consumer timeout, so a batch still being retried is not handed out again
+            visibility_timeout=Duration.seconds(6 * profile["timeout_s"]),
+            dead_letter_queue=sqs.DeadLetterQueue(max_receive_count=GOAL_WRITE_MAX_RECEIVES, queue=self.goal_write_dead_letter_queue)
+        )
+        # max_concurrency is what smooths a burst: the queue absorbs it, and at most that many
+        # consumers write to the table at a time
+        lambda_fn.add_event_source(event_sources.SqsEventSource(self.goal_write_queue,
+            batch_size=100,
+            max_batching_window=Duration.seconds(1),
+            max_concurrency=self.config.goal_write_max_concurrency,
+            report_batch_item_failures=True
+        ))
+
+        self.lambdas[name] = lambda_fn
+        self.log_groups[name] = log_group
+
+    def _connect_goal_write_queue(self, lambda_fn: _lambda.Function):
+        # The function serving POST /goals enqueues instead of writing
+        if self.goal_write_queue is None:
+            return
+        lambda_fn.add_environment("GOAL_WRITE_QUEUE_URL", self.goal_write_queue.queue_url)
+        self.goal_write_queue.grant_send_messages(lambda_fn)
+
+    def _create_router(self, log_group_prefix: str, utils_layer: _lambda.LayerVersion):
+        # One function serving every route; it imports the per-route handler modules from the lambda/ tree
+        name = "GoalsRouter"
+        actions = sorted({action for details in self.lambda_definitions.values() for action in details["actions"]})
+        bucket_actions = sorted({action for details in self.lambda_definitions.values() for action in details.get("bucket_actions", [])})
+        role = self._create_lambda_role(f"{name}LambdaRole-{self.config.environment}", actions, bucket_actions)
+        log_group = self._create_log_group(log_group_prefix, name)
+        code = _lambda.Code.from_asset(str(lambda_code_path), exclude=["lambda_layer", "**/__pycache__"])
+        profile = resolve_profile(name, router_profile(self.lambda_definitions), self.config.lambda_profiles.get(name))
+        lambda_fn = self._create_lambda(name, "goals_router/goals_router.lambda_handler", code, role, log_group, utils_layer, profile)
+
+        self.lambdas[name] = lambda_fn
+        self.log_groups[name] = log_group
+        self._connect_goal_write_queue(lambda_fn)
+        alias = self._create_alias(name, lambda_fn)
+        for route_name in self.lambda_definitions:
+            self.route_functions[route_name] = alias
+
+    def _create_alias(self, name: str, lambda_fn: _lambda.Function) -> _lambda.Alias:
+        # API Gateway invokes the alias, so provisioned concurrency (which needs a published version)
+        # can be switched on per function without touching the API
+        settings = self.config.provisioned_concurrency.get(name)
+        reserved = self.profiles[name]["reserved_concurrency"]
+        if settings and reserved is not None and settings["max"] > reserved:
+            raise ValueError(f"{name}: provisioned concurrency max {settings['max']} exceeds its reserved concurrency {reserved}")
+        alias = _lambda.Alias(
+            self, f"{name}LiveAlias",
+            alias_name="live",
+            version=lambda_fn.current_version,
+            provisioned_concurrent_executions=settings["min"] if settings else None
+        )
+        if settings:
+            scaling = alias.add_auto_scaling(min_capacity=settings["min"], max_capacity=settings["max"])
+            scaling.scale_on_utilization(utilization_target=self.config.provisioned_concurrency_utilization)
+            for index, window in enumerate(settings.get("schedules", [])):
+                scaling.scale_on_schedule(f"{name}Schedule{index}",
+                    schedule=appscaling.Schedule.expression(window["cron"]),
+                    min_capacity=window["min"],
+                    max_capacity=window["max"]
+                )
+        self.aliases[name] = alias
+        return alias
+
+
+    def _create_lambda_role(self, role_name: str, actions: list[str], bucket_actions: list[str] = None) ->iam.Role:
         role = iam.Role(
             self, role_name,
             assumed_by=iam.ServicePrincipal("lambda.amazonaws.com"),
@@ -85,25 +354,56 @@ class LambdaModule(Construct):
             actions=actions,
             resources=[self.table_arn]
         ))
+        if bucket_actions:
+            role.add_to_policy(iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=bucket_actions,
+                resources=[self.content_bucket.arn_for_objects("*")]
+            ))
+        # The cursor signing key is read once per container (lambda_layer utils/pagination.py). It is
+        # encrypted with the aws/ssm key, whose key policy already lets SSM decrypt it for the account
+        role.add_to_policy(iam.PolicyStatement(
+            effect=iam.Effect.ALLOW,
+            actions=["ssm:GetParameter"],
+            resources=[self.config.cursor_signing_key_parameter_arn]
+        ))
 
         return role
     
-    def _create_lambda(self, name: str, handler: str, path: str, role: iam.Role, log_group: logs.LogGroup, utils_layer: _lambda.LayerVersion) -> _lambda.Function:
+    def _create_lambda(self, name: str, handler: str, code: _lambda.Code, role: iam.Role, log_group: logs.LogGroup, utils_layer: _lambda.LayerVersion, profile: dict) -> _lambda.Function:
         lambda_fn = _lambda.Function(
             self, f"{name}Function",
             runtime=_lambda.Runtime.PYTHON_3_10,
             handler=handler,
-            timeout =Duration.seconds(5),
-            code=_lambda.Code.from_asset(str(lambda_code_path/path)),
+            memory_size=profile["memory_mb"],
+            architecture=ARCHITECTURES[profile["architecture"]],
+            timeout=Duration.seconds(profile["timeout_s"]),
+            ephemeral_storage_size=Size.mebibytes(profile["ephemeral_storage_mb"]),
+            reserved_concurrent_executions=profile["reserved_concurrency"],
+            code=code,
             log_group=log_group,
             layers=[utils_layer],
+            # Starts the X-Ray daemon that utils.tracing sends the per-invocation spans to
+            tracing=_lambda.Tracing.ACTIVE,
             environment={
-                'GOALS_TABLE_NAME': self.config.full_table_name
+                'GOALS_TABLE_NAME': self.config.full_table_name,
+                'CURSOR_SIGNING_KEY_PARAMETER': self.config.cursor_signing_key_parameter,
+                'COMPRESSION_MIN_SIZE': str(self.config.compression_min_size),
+                'READ_CACHE_TTL_SECONDS': str(self.config.read_cache_ttl_seconds),
+                'READ_CACHE_MAX_ENTRIES': str(self.config.read_cache_max_entries),
+                'DEADLINE_SAFETY_MARGIN_MS': str(self.config.deadline_safety_margin_ms),
+                'METRICS_NAMESPACE': self.config.metrics_namespace,
+                'CONTENT_BUCKET_NAME': self.content_bucket.bucket_name,
+                'CONTENT_COMPRESS_MIN_SIZE': str(self.config.content_compress_min_size),
+                'CONTENT_OFFLOAD_MIN_SIZE': str(self.config.content_offload_min_size),
+                'CONTENT_MAX_SIZE': str(self.config.content_max_size),
+                'TRACE_EXPORTER': 'xray'
             },
             role=role
         )
         lambda_fn.node.add_dependency(log_group)
         lambda_fn.node.add_dependency(role)
+        self.profiles[name] = profile
         return lambda_fn
     
     def _create_log_group(self, log_group_prefix: str, log_group_name: str, retention: logs.RetentionDays = logs.RetentionDays.ONE_WEEK) -> logs.LogGroup:
@@ -36,6 +36,8 @@ class Monitoring(Construct):
         self.create_api_gateway_alarms()
         self.create_fargate_alarms()
         self.create_alb_alarms()
+        self.create_route_performance_dashboard()
+        self.create_goal_write_queue_alarms()
 
     def _create_lambda_duration_alarms(self):
         for name, fn in self.lambda_module.lambdas.items():
@@ -292,3 +294,105 @@ class Monitoring(Construct):
                 left=[request_metric]
             )
         )
+
+    def _route_metric(self, metric_name: str, route: str, statistic: str) -> cw.Metric:
+        # Emitted by the handlers as Embedded Metric Format log lines (utils.metrics in the Lambda layer)
+        return cw.Metric(
+            namespace=self.config.metrics_namespace,
+            metric_name=metric_name,
+            dimensions_map={"Route": route},
+            statistic=statistic,
+            period=Duration.minutes(1),
+            label=f"{route} {statistic}"
+        )
+
+    def create_route_performance_dashboard(self):
+        routes = list(self.lambda_module.lambda_definitions)
+        self.performance_dashboard = cw.Dashboard(self, f"RoutePerformanceDashboard-{self.config.environment}-{self.config.app_name}",
+            dashboard_name=f"RoutePerformance-{self.config.environment}-{self.config.app_name}"
+        )
+
+        for route in routes:
+            self.performance_dashboard.add_widgets(
+                cw.GraphWidget(
+                    title=f"{route} latency breakdown p99 (ms)",
+                    left=[
+                        self._route_metric("HandlerLatency", route, "p99"),
+                        self._route_metric("DynamoDBLatency", route, "p99"),
+                        self._route_metric("SerializeLatency", route, "p99")
+                    ],
+                    right=[self._route_metric("ColdStart", route, "Sum")],
+                    width=12
+                ),
+                cw.GraphWidget(
+                    title=f"{route} DynamoDB capacity and payload",
+                    left=[
+                        self._route_metric("ConsumedCapacity", route, "Sum"),
+                        self._route_metric("ItemCount", route, "Average")
+                    ],
+                    right=[self._route_metric("ResponseSize", route, "p99")],
+                    width=12
+                )
+            )
+
+        # Invocations that found no provisioned environment free and cold-started anyway
+        for name in self.config.provisioned_concurrency:
+            alias = self.lambda_module.aliases[name]
+            self.performance_dashboard.add_widgets(
+                cw.GraphWidget(
+                    title=f"{name} provisioned concurrency",
+                    left=[alias.metric("ProvisionedConcurrencyUtilization", statistic="Maximum", period=Duration.minutes(1))],
+                    right=[alias.metric("ProvisionedConcurrencySpilloverInvocations", statistic="Sum", period=Duration.minutes(1))],
+                    width=12
+                )
+            )
+
+        self.performance_dashboard.add_widgets(
+            cw.GraphWidget(
+                title="Handler latency p50 per route (ms)",
+                left=[self._route_metric("HandlerLatency", route, "p50") for route in routes],
+                width=12
+            ),
+            cw.GraphWidget(
+                title="Handler latency p99 per route (ms)",
+                left=[self._route_metric("HandlerLatency", route, "p99") for route in routes],
+                width=12
+            )
+        )
+
+    def create_goal_write_queue_alarms(self):
+        # Only with CREATE_GOAL_MODE=queue. A message in the dead-letter queue is a create that was
+        # answered with 202 but never written
+        queue = self.lambda_module.goal_write_queue
+        dead_letter_queue = self.lambda_module.goal_write_dead_letter_queue
+        if queue is None:
+            return
+        dead_letters = dead_letter_queue.metric_approximate_number_of_messages_visible(
+            statistic="Maximum",
+            period=Duration.minutes(1)
+        )
+        alarm = cw.Alarm(self, f"GoalWriteDeadLetterAlarm-{self.config.environment}",
+            alarm_name=f"GoalWriteDeadLetters-{self.config.environment}-{self.config.app_name}",
+            metric=dead_letters,
+            threshold=1,
+            evaluation_periods=1,
+            comparison_operator=cw.ComparisonOperator.GREATER_THAN_OR_EQUAL_TO_THRESHOLD,
+            alarm_description="Queued goal creates that could not be written",
+            treat_missing_data=cw.TreatMissingData.NOT_BREACHING
+        )
+        alarm.apply_removal_policy(RemovalPolicy.DESTROY)
+        alarm.add_alarm_action(cw_actions.SnsAction(self.api_gateway.sns_topic))
+
+        self.performance_dashboard.add_widgets(
+            cw.GraphWidget(
+                title="Goal write queue backlog",
+                left=[queue.metric_approximate_number_of_messages_visible(statistic="Maximum", period=Duration.minutes(1))],
+                right=[queue.metric_approximate_age_of_oldest_message(statistic="Maximum", period=Duration.minutes(1))],
+                width=12
+            ),
+            cw.GraphWidget(
+                title="Goal write dead letters",
+                left=[dead_letters],
+                width=12
+            )
+        )
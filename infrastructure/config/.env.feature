@@ -19,4 +19,22 @@ AVAILABILITY_ZONE_2='eu-west-1b'
 TEAM_NAME='int9aws2025-team'
 MANAGED_BY='cdk'
 STACK_NAME='MainStack'
-LEVI9_GUEST_NETWORK='178.220.237.81/32'
\ No newline at end of file
+LEVI9_GUEST_NETWORK='178.220.237.81/32'
+CURSOR_SIGNING_KEY_PARAMETER='/goals-api/feature/cursor-signing-key'
+LAMBDA_DEPLOYMENT_MODE='per_function'
+COMPRESSION_MIN_SIZE=1024
+READ_CACHE_TTL_SECONDS=5
+READ_CACHE_MAX_ENTRIES=256
+API_CACHE_ENABLED=false
+API_CACHE_CLUSTER_SIZE=0.5
+API_CACHE_TTL_SECONDS=60
+DEADLINE_SAFETY_MARGIN_MS=300
+CONTENT_COMPRESS_MIN_SIZE=4096
+CONTENT_OFFLOAD_MIN_SIZE=65536
+CONTENT_MAX_SIZE=1048576
+PROVISIONED_CONCURRENCY='{}'
+PROVISIONED_CONCURRENCY_UTILIZATION=0.7
+LAMBDA_PROFILES='{}'
+CREATE_GOAL_MODE=sync
+GOAL_WRITE_MAX_CONCURRENCY=2
+GOAL_READ_INTEGRATION=lambda
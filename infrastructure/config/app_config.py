@@ -1,3 +1,4 @@
+import json
 import os
 
 class AppConfig:
@@ -29,3 +30,32 @@ class AppConfig:
         self.managed_by = os.getenv("MANAGED_BY")
         self.stack_name = os.getenv("STACK_NAME")
         self.levi9_network = os.getenv('LEVI9_GUEST_NETWORK')
+        # SSM SecureString holding the HMAC key for pagination cursors, created outside the stack:
+        # aws ssm put-parameter --type SecureString --name <name> --value "$(openssl rand -hex 32)"
+        self.cursor_signing_key_parameter = os.getenv("CURSOR_SIGNING_KEY_PARAMETER")
+        self.cursor_signing_key_parameter_arn = f"arn:aws:ssm:{self.region}:{self.account_id}:parameter{self.cursor_signing_key_parameter}"
+        self.lambda_deployment_mode = os.getenv("LAMBDA_DEPLOYMENT_MODE", "per_function")
+        self.compression_min_size = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+        self.read_cache_ttl_seconds = int(os.getenv("READ_CACHE_TTL_SECONDS", "5"))
+        self.read_cache_max_entries = int(os.getenv("READ_CACHE_MAX_ENTRIES", "256"))
+        self.api_cache_enabled = os.getenv("API_CACHE_ENABLED", "false").lower() == "true"
+        self.api_cache_cluster_size = os.getenv("API_CACHE_CLUSTER_SIZE", "0.5")
+        self.api_cache_ttl_seconds = int(os.getenv("API_CACHE_TTL_SECONDS", "60"))
+        self.deadline_safety_margin_ms = int(os.getenv("DEADLINE_SAFETY_MARGIN_MS", "300"))
+        self.content_compress_min_size = int(os.getenv("CONTENT_COMPRESS_MIN_SIZE", "4096"))
+        self.content_offload_min_size = int(os.getenv("CONTENT_OFFLOAD_MIN_SIZE", "65536"))
+        self.content_max_size = int(os.getenv("CONTENT_MAX_SIZE", "1048576"))
+        # Provisioned concurrency on the "live" alias, by function name (GoalsRouter in router mode):
+        # {"GetGoal": {"min": 1, "max": 10, "schedules": [{"cron": "cron(0 7 ? * MON-FRI *)", "min": 3, "max": 20}]}}
+        # Between min and max it follows utilization; schedules move min and max for time windows
+        self.provisioned_concurrency = json.loads(os.getenv("PROVISIONED_CONCURRENCY") or "{}")
+        self.provisioned_concurrency_utilization = float(os.getenv("PROVISIONED_CONCURRENCY_UTILIZATION", "0.7"))
+        # Per-function overrides of the profiles in app_constructs/lambda_module.py, by function name
+        # (GoalsRouter in router mode): {"GetAllGoals": {"memory_mb": 1024}, "GetGoal": {"reserved_concurrency": 50}}
+        self.lambda_profiles = json.loads(os.getenv("LAMBDA_PROFILES") or "{}")
+        # "queue": POST /goals answers 202 and the GoalWriter consumer writes the goal (lambda_layer utils/write_queue.py)
+        self.create_goal_mode = os.getenv("CREATE_GOAL_MODE", "sync")
+        self.goal_write_max_concurrency = int(os.getenv("GOAL_WRITE_MAX_CONCURRENCY", "2"))
+        # "dynamodb": API Gateway serves GET /goals/{id} with GetItem itself, without the GetGoal Lambda
+        self.goal_read_integration = os.getenv("GOAL_READ_INTEGRATION", "lambda")
+        self.metrics_namespace = f"GoalsApi-{self.environment}"
@@ -27,7 +27,7 @@ class MainStack(TaggedStack):
 
         self.dynamo = DynamoDB(self, f"DYNAMO_DB-{config.environment}", config=config)
         
-        self.lambda_module = LambdaModule(self, f"LAMBDA-{config.environment}", config=config)
+        self.lambda_module = LambdaModule(self, f"LAMBDA-{config.environment}", config=config, table=self.dynamo.table)
 
         self.api_gateway = APIGateway(self, api_id=f"API_GATEWAY-{config.environment}", api_name="ApiGoal", cognito_name="CognitoGoal", auth_name="GoalAuthorizer",
                                       config=config, lambdaFn=self.lambda_module)
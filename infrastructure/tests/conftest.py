@@ -0,0 +1,58 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).resolve().parents[2]
+
+# Make the shared Lambda layer importable the same way the Lambda runtime does (/opt/python)
+sys.path.insert(0, str(project_root / 'lambda/lambda_layer/python'))
+# Local stand-ins (local/) and the benchmark scripts (benchmarks/)
+sys.path.insert(0, str(project_root))
+# Handler packages (lambda/<name>/<name>.py), as the router imports them
+sys.path.insert(0, str(project_root / 'lambda'))
+
+os.environ.setdefault('CURSOR_SIGNING_KEY', 'test-signing-key')
+os.environ.setdefault('GOALS_TABLE_NAME', 'goals-test')
+os.environ.setdefault('CONTENT_BUCKET_NAME', 'goal-content-test')
+
+
+@pytest.fixture(scope='session')
+def config():
+    # The stack configuration of the ENV being tested (config/.env.<ENV>)
+    from dotenv import load_dotenv
+    from config.app_config import AppConfig
+    load_dotenv(dotenv_path=f"config/.env.{os.getenv('ENV', 'fail')}")
+    return AppConfig()
+
+
+@pytest.fixture
+def synth(config):
+    # synth(**overrides) -> Template of MainStack, built with the given AppConfig attributes replaced
+    import copy
+    import aws_cdk as cdk
+    from aws_cdk.assertions import Template
+    from stacks.main_stack.main_stack import MainStack
+
+    def synth(**overrides):
+        stack_config = copy.copy(config)
+        for name, value in overrides.items():
+            setattr(stack_config, name, value)
+        env = cdk.Environment(account=stack_config.account_id, region=stack_config.region)
+        return Template.from_stack(MainStack(cdk.App(), "TestStack", config=stack_config, env=env))
+    return synth
+
+
+@pytest.fixture
+def local_client():
+    # In-memory DynamoDB (local/dynamodb.py) behind utils.dynamodb for the test; goals the
+    # handlers cached on the way are dropped with it
+    from local.dynamodb import LocalDynamoDB
+    from utils import dynamodb
+    from utils.cache import goal_cache
+    client = LocalDynamoDB()
+    dynamodb.set_client(client)
+    yield client
+    dynamodb.set_client(None)
+    goal_cache.clear()
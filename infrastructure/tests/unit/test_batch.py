@@ -0,0 +1,81 @@
+import functools
+import json
+
+from local.events import proxy_event
+from utils import dynamodb
+from utils.batch import batch_get, batch_write
+
+TABLE = "goals"
+
+
+class FlakyDynamoDB:
+    # Leaves the last request of every call unprocessed the first time it is seen
+    def __init__(self):
+        self.calls = []
+        self.seen = set()
+
+    def batch_write_item(self, RequestItems):
+        requests = RequestItems[TABLE]
+        self.calls.append(len(requests))
+        last = repr(requests[-1])
+        if last in self.seen:
+            return {"UnprocessedItems": {}}
+        self.seen.add(last)
+        return {"UnprocessedItems": {TABLE: requests[-1:]}}
+
+    def batch_get_item(self, RequestItems):
+        keys = RequestItems[TABLE]["Keys"]
+        self.calls.append(len(keys))
+        return {"Responses": {TABLE: keys[:-1]}, "UnprocessedKeys": {TABLE: {"Keys": keys[-1:]}}}
+
+
+def test_batch_write_chunks_and_retries_unprocessed():
+    client = FlakyDynamoDB()
+    requests = [{"DeleteRequest": {"Key": {"goalId": str(i)}}} for i in range(30)]
+    sleeps = []
+
+    unprocessed = batch_write(client, TABLE, requests, sleep=sleeps.append)
+
+    assert unprocessed == []
+    assert client.calls == [25, 1, 5, 1]
+    assert len(sleeps) == 2
+
+
+def test_batch_get_reports_keys_left_after_max_attempts():
+    client = FlakyDynamoDB()
+    keys = [{"goalId": str(i)} for i in range(3)]
+
+    items, unprocessed = batch_get(client, TABLE, keys, max_attempts=2, sleep=lambda _: None)
+
+    assert items == keys[:2]
+    assert unprocessed == keys[2:]
+
+
+def test_batch_deletes_only_goals_that_were_read(local_client, monkeypatch):
+    from batch_goals import batch_goals
+    from create_goal import create_goal
+    monkeypatch.setattr(batch_goals, "batch_get", functools.partial(batch_get, sleep=lambda _: None))
+    batch_get_item = local_client.batch_get_item
+
+    def throttled(RequestItems, **kwargs):
+        # The last key is never read, as when BatchGetItem keeps returning it in UnprocessedKeys
+        table, request = next(iter(RequestItems.items()))
+        response = batch_get_item(RequestItems={table: {**request, "Keys": request["Keys"][:-1]}}, **kwargs)
+        response["UnprocessedKeys"] = {table: {"Keys": request["Keys"][-1:]}}
+        return response
+
+    goal_ids = [json.loads(create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": title, "content": "c"}), None)["body"])["goalId"]
+                for title in ("Run a marathon", "Read books")]
+    monkeypatch.setattr(local_client, "batch_get_item", throttled)
+    response = batch_goals.lambda_handler(proxy_event("POST", "/goals/batch", body={"operations": [
+        {"action": "delete", "goalId": goal_ids[0]},
+        {"action": "delete", "goalId": "01HZZZZZZZZZZZZZZZZZZZZZZZ"},
+        {"action": "delete", "goalId": goal_ids[1]}
+    ]}), None)
+    remaining = [item["goalId"]["S"] for item in local_client.scan(TableName=dynamodb.get_table_name())["Items"]
+                 if not item["goalId"]["S"].startswith("~")]
+
+    results = json.loads(response["body"])["results"]
+    assert [result["status"] for result in results] == [200, 404, 503]
+    # The unread goal was left in place, with its index entries, for the client to retry
+    assert remaining == [goal_ids[1]]
@@ -0,0 +1,62 @@
+from utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(**kwargs):
+    clock = FakeClock()
+    options = {"ttl_seconds": 5, "max_entries": 3, "max_bytes": 10_000, "clock": clock}
+    options.update(kwargs)
+    return TTLCache(**options), clock
+
+
+def test_hit_miss_and_expiry():
+    cache, clock = make_cache()
+    assert cache.get(("u1", "g1")) is None
+    cache.put(("u1", "g1"), {"title": "run"})
+    assert cache.get(("u1", "g1")) == {"title": "run"}
+
+    clock.now = 5
+    assert cache.get(("u1", "g1")) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache, _ = make_cache()
+    for goal_id in ("g1", "g2", "g3"):
+        cache.put(("u1", goal_id), goal_id)
+    cache.get(("u1", "g1"))
+    cache.put(("u1", "g4"), "g4")
+
+    assert cache.get(("u1", "g2")) is None
+    assert cache.get(("u1", "g1")) == "g1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_cap_is_enforced():
+    cache, _ = make_cache(max_bytes=100)
+    cache.put(("u1", "big"), "x" * 500)
+    cache.put(("u1", "a"), "x" * 40)
+    cache.put(("u1", "b"), "x" * 40)
+
+    assert cache.get(("u1", "big")) is None
+    assert cache.get(("u1", "a")) is None
+    assert cache.stats()["bytes"] <= 100
+
+
+def test_invalidate_user_only_drops_that_user():
+    cache, _ = make_cache()
+    cache.put(("u1", "g1"), 1)
+    cache.put(("u1", "#list", None, None), [1])
+    cache.put(("u2", "g1"), 2)
+    cache.invalidate_user("u1")
+
+    assert cache.stats()["entries"] == 1
+    assert cache.get(("u2", "g1")) == 2
@@ -0,0 +1,30 @@
+from utils.clients import lazy_client
+
+
+def test_clients_are_built_once_per_configuration(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-1")
+    sqs = lazy_client("sqs")
+    configured = []
+
+    def config():
+        from botocore.config import Config
+        configured.append(1)
+        return Config(read_timeout=2)
+
+    assert sqs.init_ms is None
+    default = sqs.get()
+    timed = sqs.get("timed", config=config)
+
+    assert sqs.get() is default and sqs.get("timed", config=config) is timed and timed is not default
+    assert timed.meta.config.read_timeout == 2 and configured == [1]
+    assert sqs.init_ms is not None
+
+
+def test_a_stand_in_replaces_every_configuration():
+    ssm = lazy_client("ssm")
+    stand_in = object()
+
+    ssm.set(stand_in)
+    assert ssm.get() is stand_in and ssm.get("timed") is stand_in
+    ssm.set(None)
+    assert ssm.init_ms is None
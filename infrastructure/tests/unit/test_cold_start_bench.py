@@ -0,0 +1,55 @@
+import json
+
+from benchmarks.cold_start_bench import (DEFAULT_BUDGET, check_budget, directory_size, measure_import,
+                                         parse_importtime)
+from app_constructs.lambda_module import LAMBDA_DEFINITIONS
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       300 |        300 |   encodings
+import time:      1000 |       1000 | site
+import time:       200 |        200 |       json.decoder
+import time:       500 |        700 |     json
+import time:       100 |        800 |   utils.utils
+import time:      4000 |       4000 |   uuid
+import time:        50 |       4850 | create_goal
+"""
+
+
+def test_breakdown_lists_direct_imports_of_the_handler():
+    assert parse_importtime(IMPORTTIME, "create_goal") == {"uuid": 4.0, "utils.utils": 0.8}
+
+
+def test_budget_defaults_and_overrides():
+    results = {
+        "functions": {
+            "GetGoal": {"import_ms": 90, "modules": 140, "unzipped_bytes": 1000, "zipped_bytes": 500},
+            "GoalsRouter": {"import_ms": 90, "modules": 140, "unzipped_bytes": 1000, "zipped_bytes": 500}
+        },
+        "layer": {"unzipped_bytes": 10, "zipped_bytes": 5}
+    }
+    budget = {"function": {"modules": 130}, "functions": {"GoalsRouter": {"modules": 150}}, "layer": {"zipped_bytes": 4}}
+
+    assert check_budget(results, budget) == [
+        "GetGoal: modules 140 exceeds budget 130",
+        "UtilsLayer: zipped_bytes 5 exceeds budget 4"
+    ]
+
+
+def test_directory_size_skips_bytecode(tmp_path):
+    (tmp_path / "handler.py").write_text("x = 1\n" * 100)
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "handler.cpython-311.pyc").write_bytes(b"0" * 5000)
+
+    sizes = directory_size(tmp_path)
+
+    assert sizes["unzipped_bytes"] == 600
+    assert 0 < sizes["zipped_bytes"] < 600
+
+
+def test_handler_import_is_measured_in_a_fresh_interpreter():
+    measured = measure_import(LAMBDA_DEFINITIONS["GetGoal"], repeat=1)
+
+    assert measured["import_ms"] > 0
+    assert measured["modules"] > 10
+    assert "utils.middleware" in measured["breakdown_ms"]
+    assert set(json.loads(DEFAULT_BUDGET.read_text())) == {"function", "functions", "layer"}
@@ -0,0 +1,48 @@
+import base64
+import gzip
+import json
+
+import pytest
+from utils import compression
+from utils.compression import negotiate_encoding
+from utils.utils import build_response, parse_body
+
+GOALS = [{"goalId": str(i), "title": "Goal", "content": "x" * 100} for i in range(50)]
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("identity", None),
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0, deflate", None),
+    ("*;q=0.5", "gzip"),
+])
+def test_negotiate_encoding(header, expected, monkeypatch):
+    # Pin to the stdlib-only set so the result does not depend on brotli being installed
+    monkeypatch.setattr(compression, "COMPRESSORS", {"gzip": gzip.compress})
+    assert negotiate_encoding(header) == expected
+
+
+def test_brotli_preferred_when_available(monkeypatch):
+    monkeypatch.setattr(compression, "COMPRESSORS", {"gzip": gzip.compress, "br": bytes})
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0.5") == "gzip"
+
+
+def test_large_body_is_gzipped_for_accepting_clients():
+    event = {"headers": {"Accept-Encoding": "gzip"}}
+    response = build_response(200, GOALS, event=event)
+
+    assert response["isBase64Encoded"] is True
+    assert response["headers"]["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(base64.b64decode(response["body"]))) == GOALS
+
+
+def test_small_body_is_left_uncompressed():
+    response = build_response(200, {"ok": True}, event={"headers": {"accept-encoding": "gzip"}})
+    assert "isBase64Encoded" not in response
+
+
+def test_parse_body_decodes_base64_requests():
+    body = base64.b64encode(b'{"title": "t"}').decode()
+    assert parse_body({"body": body, "isBase64Encoded": True}) == {"title": "t"}
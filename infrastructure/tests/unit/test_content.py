@@ -0,0 +1,69 @@
+import json
+import os
+
+from local.dynamodb import item_size
+from local.events import proxy_event
+from local.object_store import LocalObjectStore
+from utils import dynamodb, object_store
+from utils.cache import goal_cache
+from utils.content import pack_content, unpack_content
+
+SMALL = "Run 5 km three times a week."
+# Repetitive text compresses far below the offload threshold
+COMPRESSIBLE = "Keep a training log. " * 1000
+# Random text barely compresses, so it ends up in the bucket
+INCOMPRESSIBLE = os.urandom(60_000).hex()
+
+
+def test_content_is_stored_by_size():
+    store = LocalObjectStore()
+    object_store.set_client(store)
+    try:
+        assert pack_content("u", "g", SMALL) == {"content": SMALL}
+
+        compressed = pack_content("u", "g", COMPRESSIBLE)
+        offloaded = pack_content("u", "g", INCOMPRESSIBLE)
+        assert list(compressed) == ["contentZ"] and len(compressed["contentZ"]) < 1024
+        assert offloaded["contentSize"] == len(INCOMPRESSIBLE) and store.object_count() == 1
+
+        assert unpack_content(compressed) == {"content": COMPRESSIBLE}
+        assert unpack_content(offloaded) == {"content": INCOMPRESSIBLE}
+        assert unpack_content(offloaded, fetch=False) == {"contentSize": len(INCOMPRESSIBLE), "contentOffloaded": True}
+    finally:
+        object_store.set_client(None)
+
+
+def test_large_goals_round_trip_through_the_handlers(local_client):
+    from create_goal import create_goal
+    from delete_goal import delete_goal
+    from get_all_goals import get_all_goals
+    from get_goal import get_goal
+    from update_goal import update_goal
+    store = LocalObjectStore()
+    object_store.set_client(store)
+
+    def get(goal_id):
+        return json.loads(get_goal.lambda_handler(proxy_event("GET", "/goals/{id}", {"id": goal_id}), None)["body"])
+
+    try:
+        created = create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": "big", "content": INCOMPRESSIBLE}), None)
+        goal_id = json.loads(created["body"])["goalId"]
+        assert get(goal_id)["content"] == INCOMPRESSIBLE
+        listed = json.loads(get_all_goals.lambda_handler(proxy_event("GET", "/goals"), None)["body"])
+
+        goal_cache.clear()
+        update_goal.lambda_handler(proxy_event("PUT", "/goals/{id}", {"id": goal_id}, body={"content": COMPRESSIBLE}), None)
+        stored = local_client.get_item(TableName=dynamodb.get_table_name(), Key={"userId": {"S": "local-user"}, "goalId": {"S": goal_id}})["Item"]
+        objects_after_update = store.object_count()
+        assert get(goal_id)["content"] == COMPRESSIBLE
+
+        too_large = create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": "t", "content": "x" * 2_000_000}), None)
+        delete_goal.lambda_handler(proxy_event("DELETE", "/goals/{id}", {"id": goal_id}), None)
+    finally:
+        object_store.set_client(None)
+
+    assert created["statusCode"] == 200
+    assert listed[0]["contentOffloaded"] is True and "content" not in listed[0]
+    assert "contentRef" not in stored and "content" not in stored and item_size(stored) < 2048
+    assert objects_after_update == 0
+    assert too_large["statusCode"] == 413
@@ -0,0 +1,70 @@
+import pytest
+from botocore.exceptions import ClientError
+from utils.deadline import DeadlineClient, DeadlineExceeded, service_unavailable_response
+
+
+class FakeContext:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+class ThrottledClient:
+    def __init__(self, failures):
+        self.failures = failures
+        self.timeouts = []
+
+    def get_item(self, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "GetItem")
+        return {"Item": {}}
+
+
+def make_client(context, fake):
+    def factory(read_timeout=None):
+        fake.timeouts.append(read_timeout)
+        return fake
+    return DeadlineClient(context, client_factory=factory, sleep=lambda _: None)
+
+
+@pytest.mark.parametrize("remaining_ms, read_timeout", [(1500, 0.5), (2300, 1.0), (4990, 2.0), (8300, 4.0)])
+def test_call_timeout_fits_remaining_time(remaining_ms, read_timeout):
+    fake = ThrottledClient(failures=0)
+    make_client(FakeContext(remaining_ms), fake).get_item(Key={})
+    # Minus the 300 ms safety margin, the connect timeout plus the read timeout must fit: 4.69 s
+    # leaves room for 1 + 2 s, not for 1 + 4 s
+    assert fake.timeouts == [read_timeout]
+
+
+def test_throttling_is_retried_within_budget():
+    fake = ThrottledClient(failures=2)
+    client = make_client(FakeContext(4000), fake)
+    assert client.get_item(Key={}) == {"Item": {}}
+    assert client.retries == 2
+
+
+def test_fails_fast_when_no_time_is_left():
+    fake = ThrottledClient(failures=0)
+    with pytest.raises(DeadlineExceeded):
+        make_client(FakeContext(400), fake).get_item(Key={})
+    assert fake.timeouts == []
+
+
+def test_non_retryable_errors_propagate():
+    class Broken:
+        timeouts = []
+
+        def get_item(self, **kwargs):
+            raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        make_client(FakeContext(4000), Broken()).get_item(Key={})
+
+
+def test_service_unavailable_response():
+    response = service_unavailable_response()
+    assert response["statusCode"] == 503
+    assert response["headers"]["Retry-After"] == "1"
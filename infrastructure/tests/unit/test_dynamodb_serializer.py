@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+import pytest
+from utils.dynamodb import deserialize, from_item, serialize, to_item
+
+
+def test_item_round_trip():
+    item = {
+        "userId": "user-1",
+        "goalId": "goal-1",
+        "done": False,
+        "version": 3,
+        "score": Decimal("1.5"),
+        "tags": {"health", "sport"},
+        "steps": [{"title": "run", "minutes": 30}],
+        "blob": b"\x00\x01",
+        "note": None
+    }
+
+    assert from_item(to_item(item)) == item
+
+
+def test_serialize_uses_dynamodb_wire_types():
+    assert serialize(True) == {"BOOL": True}
+    assert serialize(7) == {"N": "7"}
+    assert serialize({"b", "a"}) == {"SS": ["a", "b"]}
+
+
+def test_integral_numbers_deserialize_to_int():
+    assert deserialize({"N": "42"}) == 42
+    assert isinstance(deserialize({"N": "4.2"}), Decimal)
+
+
+def test_empty_sets_are_rejected():
+    with pytest.raises(TypeError):
+        serialize(set())
@@ -0,0 +1,32 @@
+from utils.etag import is_not_modified, item_etag, list_etag
+from utils.utils import build_response
+
+GOALS = [{"goalId": "g1", "version": 1}, {"goalId": "g2", "version": 3}]
+
+
+def test_etag_changes_with_version():
+    assert item_etag({"goalId": "g1", "version": 1}) != item_etag({"goalId": "g1", "version": 2})
+    assert item_etag({"goalId": "g1"}) == item_etag({"goalId": "g1", "version": 0})
+    # The direct DynamoDB read of GET /goals/{id} renders the same validator in its mapping template
+    assert item_etag({"goalId": "01HZX", "version": 2}) == '"01HZX:2"'
+
+
+def test_list_etag_covers_membership_and_context():
+    etag = list_etag(GOALS, "all")
+    assert list_etag(GOALS[:1], "all") != etag
+    assert list_etag(GOALS, "page", 20) != etag
+    assert list_etag(list(GOALS), "all") == etag
+
+
+def test_if_none_match():
+    etag = item_etag(GOALS[0])
+    assert is_not_modified({"headers": {"If-None-Match": etag}}, etag)
+    assert is_not_modified({"headers": {"if-none-match": f'"other", W/{etag}'}}, etag)
+    assert not is_not_modified({"headers": {"If-None-Match": '"other"'}}, etag)
+    assert not is_not_modified({"headers": None}, etag)
+
+
+def test_not_modified_response_has_no_body():
+    response = build_response(304, None, headers={"ETag": '"abc"'})
+    assert response["body"] == ""
+    assert response["headers"]["Access-Control-Expose-Headers"] == "ETag"
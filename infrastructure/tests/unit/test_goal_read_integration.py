@@ -0,0 +1,170 @@
+import airspeed
+from aws_cdk.assertions import Match, Template
+from app_constructs.api_gateway import GET_ITEM_REQUEST_TEMPLATE, GET_ITEM_RESPONSE_TEMPLATE
+from utils.etag import item_etag
+from utils.write_queue import encode_goal
+import base64
+import json
+import pytest
+import urllib.parse
+
+def get_methods(template: Template) -> list:
+    methods = template.find_resources("AWS::ApiGateway::Method", {"Properties": {"HttpMethod": "GET"}})
+    return [method["Properties"] for method in methods.values()]
+
+
+def test_goal_reads_go_straight_to_dynamodb(synth, config):
+    template = synth(goal_read_integration="dynamodb")
+
+    direct = [method for method in get_methods(template) if method["Integration"]["Type"] == "AWS"]
+    assert len(direct) == 1
+    integration = direct[0]["Integration"]
+    assert "dynamodb:action/GetItem" in json.dumps(integration["Uri"])
+    assert integration["PassthroughBehavior"] == "NEVER"
+    # Binary payloads (application/json is a binary media type) must still go through the templates
+    assert integration["ContentHandling"] == "CONVERT_TO_TEXT"
+    assert {response["ContentHandling"] for response in integration["IntegrationResponses"]} == {"CONVERT_TO_TEXT"}
+    assert integration["RequestTemplates"]["application/json"] == GET_ITEM_REQUEST_TEMPLATE % {"table_name": config.full_table_name}
+    assert [response["StatusCode"] for response in integration["IntegrationResponses"]] == ["200", "500"]
+    assert integration["IntegrationResponses"][0]["ResponseTemplates"]["application/json"] == GET_ITEM_RESPONSE_TEMPLATE
+    assert {response["StatusCode"] for response in direct[0]["MethodResponses"]} == {"200", "304", "307", "404", "500"}
+    # The role API Gateway calls DynamoDB with can only read single items
+    template.has_resource_properties("AWS::IAM::Policy", {
+        "PolicyDocument": {"Statement": [Match.object_like({"Action": "dynamodb:GetItem", "Resource": config.table_arn})]}
+    })
+
+
+def test_goal_reads_use_lambda_by_default(synth):
+    template = synth(goal_read_integration="lambda")
+
+    assert {method["Integration"]["Type"] for method in get_methods(template)} == {"AWS_PROXY"}
+
+
+class MappingTemplateUtil:
+    # $util of API Gateway mapping templates, as far as the GetItem templates use it
+
+    @staticmethod
+    def escapeJavaScript(value: str) -> str:
+        # Apache Commons Lang's StringEscapeUtils.escapeJavaScript, which API Gateway uses
+        escapes = {"'": "\\'", '"': '\\"', "\\": "\\\\", "/": "\\/", "\b": "\\b", "\n": "\\n", "\t": "\\t", "\f": "\\f", "\r": "\\r"}
+        return "".join(escapes.get(char) or (f"\\u{ord(char):04X}" if ord(char) < 32 or ord(char) > 0x7f else char) for char in value)
+
+    @staticmethod
+    def parseJson(value: str):
+        return json.loads(value)
+
+    @staticmethod
+    def base64Decode(value: str) -> str:
+        return base64.b64decode(value).decode("utf-8")
+
+    @staticmethod
+    def urlEncode(value: str) -> str:
+        return urllib.parse.quote_plus(value, safe="*")
+
+
+class MappingTemplateInput:
+
+    def __init__(self, body: str, params: dict):
+        self.body = body
+        self._params = params
+
+    def params(self, name: str) -> str:
+        return self._params.get(name, "")
+
+
+@pytest.fixture
+def render(monkeypatch):
+    # Renders a mapping template with airspeed, a Python implementation of Velocity, given the Java
+    # methods the templates call on strings and maps. Returns (status, headers, body)
+    methods = airspeed.__additional_methods__
+    monkeypatch.setitem(methods, str, {**methods[str], "contains": lambda self, part: part in self, "trim": lambda self: self.strip()})
+    monkeypatch.setitem(methods, dict, {**methods[dict], "containsKey": lambda self, key: key in self})
+
+    def render(template: str, body: str = "", params: dict = None, sub: str = "alice") -> tuple:
+        context = {"stage": "dev", "authorizer": {"claims": {"sub": sub}}, "responseOverride": {"header": {}}}
+        output = airspeed.Template(template).merge({
+            "input": MappingTemplateInput(body, params or {}),
+            "util": MappingTemplateUtil,
+            "context": context
+        })
+        override = context["responseOverride"]
+        return override.get("status", 200), override["header"], output.strip()
+    return render
+
+
+def get_item_response(goal: dict = None, encoded: bool = False) -> str:
+    # The body of a GetItem response, as API Gateway hands it to the response template; encode_goal
+    # writes DynamoDB JSON as on the wire, binary attributes base64-encoded
+    body = json.dumps({"Item": json.loads(encode_goal(goal))} if goal else {})
+    return base64.b64encode(body.encode("utf-8")).decode("ascii") if encoded else body
+
+
+GOAL = {
+    "userId": "alice",
+    "goalId": "01HZX3K5Q8V2M7N4P6R9T1W3Y5",
+    "title": 'Read "Čitanje" & don\'t stop </script> \\ \n',
+    "content": "Twelve books",
+    "createdAt": "2025-01-01T12:00:00.000000",
+    "version": 3
+}
+
+
+def test_get_item_request_uses_the_callers_sub_and_the_path_id(render):
+    goal_id = "01ABC'\"\\"
+
+    _, _, rendered = render(GET_ITEM_REQUEST_TEMPLATE % {"table_name": "goals-test"}, params={"id": goal_id})
+
+    assert json.loads(rendered) == {"TableName": "goals-test", "Key": {"userId": {"S": "alice"}, "goalId": {"S": goal_id}}}
+
+
+@pytest.mark.parametrize("encoded", [False, True])
+def test_stored_goals_render_as_get_goal_does(render, encoded):
+    status, headers, body = render(GET_ITEM_RESPONSE_TEMPLATE, get_item_response(GOAL, encoded))
+
+    assert status == 200
+    assert json.loads(body) == GOAL
+    assert headers == {"ETag": item_etag(GOAL)}
+
+
+def test_goals_without_a_version_get_version_zero_etags(render):
+    goal = {name: value for name, value in GOAL.items() if name != "version"}
+
+    _, headers, _ = render(GET_ITEM_RESPONSE_TEMPLATE, get_item_response(goal))
+
+    assert headers["ETag"] == item_etag(goal) == f'"{GOAL["goalId"]}:0"'
+
+
+@pytest.mark.parametrize("goal", [None, {"userId": "alice", "goalId": "~STATS", "goalCount": 3},
+                                  {"userId": "alice", "goalId": "~T#read#01HZX", "ref": "01HZX"}])
+def test_missing_and_reserved_items_are_not_found(render, goal):
+    status, headers, body = render(GET_ITEM_RESPONSE_TEMPLATE, get_item_response(goal))
+
+    assert status == 404
+    assert json.loads(body) == {"error": "Goal not found or not authorized"}
+    assert "ETag" not in headers
+
+
+@pytest.mark.parametrize("content", [{"contentZ": b"x\x9c"}, {"contentRef": "content/alice/01HZX/1", "contentSize": 70000}])
+def test_compressed_or_offloaded_content_redirects_to_the_lambda_read(render, content):
+    goal = {**{name: value for name, value in GOAL.items() if name != "content"}, **content}
+
+    status, headers, body = render(GET_ITEM_RESPONSE_TEMPLATE, get_item_response(goal), {"v": "1700000000 1"})
+
+    assert status == 307
+    assert headers == {"Location": f"/dev/goals/{GOAL['goalId']}/full?v=1700000000+1"}
+    assert json.loads(body) == {"goalId": GOAL["goalId"]}
+
+
+@pytest.mark.parametrize("if_none_match, status", [
+    (item_etag(GOAL), 304),
+    (f'"other", W/{item_etag(GOAL)}', 304),
+    ("*", 304),
+    (item_etag({**GOAL, "version": 2}), 200),
+    (f'"{GOAL["goalId"]}:33"', 200)
+])
+def test_if_none_match(render, if_none_match, status):
+    rendered_status, headers, body = render(GET_ITEM_RESPONSE_TEMPLATE, get_item_response(GOAL), {"If-None-Match": if_none_match})
+
+    assert rendered_status == status
+    assert headers == {"ETag": item_etag(GOAL)}
+    assert (body == "") == (status == 304)
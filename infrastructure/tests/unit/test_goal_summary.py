@@ -0,0 +1,87 @@
+import json
+
+from local.dynamodb import LocalDynamoDB, seed_goals
+from local.events import proxy_event
+from local.streams import GOAL_FILTERS, LocalStream
+from utils import dynamodb
+from utils.cache import goal_cache
+from utils.summary import pack_shards
+
+
+def test_pack_shards_splits_by_size():
+    entries = [{"goalId": f"{i:04d}", "title": "x" * 100} for i in range(10)]
+
+    shards = pack_shards(entries, max_bytes=500)
+
+    assert [entry for shard in shards for entry in shard] == entries
+    assert len(shards) == 4 and all(shards)
+    assert pack_shards([]) == [[]]
+
+
+def test_summary_view_follows_the_stream(local_client, monkeypatch):
+    from create_goal import create_goal
+    from delete_goal import delete_goal
+    from get_all_goals import get_all_goals
+    from goal_summary import goal_summary
+    from update_goal import update_goal
+    table = dynamodb.get_table_name()
+    # Goals written before the consumer existed are picked up when the summary is first built
+    seed_goals(local_client, table, "local-user", 3)
+    stream = LocalStream(local_client, table, filters=GOAL_FILTERS)
+    # Small shards, so this handful of goals already spans several
+    monkeypatch.setenv("SUMMARY_SHARD_MAX_BYTES", "300")
+
+    def summary(**query):
+        goal_cache.clear()
+        response = get_all_goals.lambda_handler(proxy_event("GET", "/goals", query={"view": "summary", **query}), None)
+        return json.loads(response["body"])
+
+    assert len(summary()) == 3
+
+    ids = []
+    for title in ("first", "second", "third"):
+        response = create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": title, "content": "c" * 5000}), None)
+        ids.append(json.loads(response["body"])["goalId"])
+    update_goal.lambda_handler(proxy_event("PUT", "/goals/{id}", {"id": ids[1]}, body={"title": "renamed"}), None)
+    delete_goal.lambda_handler(proxy_event("DELETE", "/goals/{id}", {"id": ids[0]}), None)
+    # Index and stats writes are filtered out before they reach the consumer
+    assert all(record["dynamodb"]["Keys"]["goalId"]["S"][0] != "~" for record in stream.pending)
+    stream.deliver(goal_summary.lambda_handler)
+
+    local_client.calls.clear()
+    latest = summary(order="desc")
+    shard_reads = local_client.calls["Query"]
+    full = get_all_goals.lambda_handler(proxy_event("GET", "/goals"), None)
+    invalid = get_all_goals.lambda_handler(proxy_event("GET", "/goals", query={"view": "summary", "limit": 5}), None)
+
+    # Seeded goals have UUIDs, which don't sort by time
+    assert [entry["title"] for entry in latest if not entry["title"].startswith("Goal number")] == ["third", "renamed"]
+    assert len(latest) == 5 and all("content" not in entry for entry in latest)
+    assert shard_reads == 1
+    assert sorted(entry["goalId"] for entry in latest) == sorted(goal["goalId"] for goal in json.loads(full["body"]))
+    assert invalid["statusCode"] == 400
+
+
+def test_consumer_reports_the_first_record_of_a_failed_user():
+    from goal_summary import goal_summary
+
+    class FailingClient(LocalDynamoDB):
+        def put_item(self, **kwargs):
+            if kwargs["Item"]["userId"]["S"] == "bob":
+                raise RuntimeError("throttled")
+            return super().put_item(**kwargs)
+
+    def record(sequence, user_id, goal_id):
+        image = {"userId": {"S": user_id}, "goalId": {"S": goal_id}, "title": {"S": "t"}, "version": {"N": "1"}}
+        return {"eventName": "INSERT", "dynamodb": {"Keys": {"userId": image["userId"], "goalId": image["goalId"]},
+                                                    "NewImage": image, "SequenceNumber": sequence}}
+
+    dynamodb.set_client(FailingClient())
+    try:
+        response = goal_summary.lambda_handler({"Records": [
+            record("100", "alice", "A1"), record("200", "bob", "B1"), record("300", "alice", "A2"), record("400", "bob", "B2")
+        ]}, None)
+    finally:
+        dynamodb.set_client(None)
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": "200"}]}
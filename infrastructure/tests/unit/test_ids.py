@@ -0,0 +1,50 @@
+import json
+
+from local.events import DEFAULT_USER_ID, proxy_event
+from utils import dynamodb, ids
+from utils.ids import is_ulid, new_ulid, ulid_timestamp_ms
+
+
+def test_ulids_sort_by_creation_time(monkeypatch):
+    # Forget ids minted by earlier tests, which would hold the clock at their millisecond
+    monkeypatch.setattr(ids, "_last_ms", -1)
+    earlier = new_ulid(1_700_000_000_000)
+    later = new_ulid(1_700_000_000_001)
+
+    assert is_ulid(earlier) and len(earlier) == 26
+    assert earlier < later
+    assert ulid_timestamp_ms(later) == 1_700_000_000_001
+
+
+def test_ulids_minted_in_the_same_millisecond_stay_ordered():
+    ids = [new_ulid(1_800_000_000_000) for _ in range(50)]
+
+    assert ids == sorted(ids) and len(set(ids)) == 50
+    # A clock step backwards doesn't break the order either
+    assert new_ulid(1_799_999_999_999) > ids[-1]
+
+
+def test_latest_goals_query(local_client):
+    from create_goal import create_goal
+    from get_all_goals import get_all_goals
+    titles = [f"goal {i}" for i in range(5)]
+    for title in titles:
+        create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": title, "content": "c"}), None)
+
+    response = get_all_goals.lambda_handler(proxy_event("GET", "/goals", query={"order": "desc", "limit": 2}), None)
+    invalid = get_all_goals.lambda_handler(proxy_event("GET", "/goals", query={"order": "up"}), None)
+
+    assert [goal["title"] for goal in json.loads(response["body"])["items"]] == ["goal 4", "goal 3"]
+    assert local_client.calls["Query"] == 1
+    assert invalid["statusCode"] == 400
+
+
+def test_unpaged_list_is_bounded(local_client, monkeypatch):
+    from get_all_goals import get_all_goals
+    from local.dynamodb import seed_goals
+    monkeypatch.setattr(get_all_goals, "UNPAGED_MAX_GOALS", 3)
+    seed_goals(local_client, dynamodb.get_table_name(), DEFAULT_USER_ID, 5)
+    response = get_all_goals.lambda_handler(proxy_event("GET", "/goals"), None)
+
+    assert len(json.loads(response["body"])) == 3
+    assert local_client.calls["Query"] == 1
@@ -1,8 +1,10 @@
 from dotenv import load_dotenv
 import aws_cdk as cdk
-from aws_cdk.assertions import Template
+from aws_cdk.assertions import Match, Template
 from config.app_config import AppConfig
 from stacks.main_stack.main_stack import MainStack
+from app_constructs.api_gateway import cors_preflight_options
+import json
 import os
 
 # Load the .env file
@@ -28,4 +30,118 @@ def test_main_stack_synthesizes():
     # Example assertion: is the DynamoDB table created?
     template.has_resource_properties("AWS::DynamoDB::Table", {
         "TableName": config.full_table_name
-    })
\ No newline at end of file
+    })
+
+
+def test_cursor_signing_key_stays_out_of_the_template(synth):
+    template = synth()
+
+    for function in template.find_resources("AWS::Lambda::Function", {"Properties": {"Layers": Match.any_value()}}).values():
+        variables = function["Properties"]["Environment"]["Variables"]
+        assert "CURSOR_SIGNING_KEY" not in variables
+        assert variables["CURSOR_SIGNING_KEY_PARAMETER"] == config.cursor_signing_key_parameter
+    template.has_resource_properties("AWS::IAM::Policy", {
+        "PolicyDocument": {"Statement": Match.array_with([
+            Match.object_like({"Action": "ssm:GetParameter", "Resource": config.cursor_signing_key_parameter_arn})
+        ])}
+    })
+
+
+def test_cors_preflight_keeps_its_mock_template(synth):
+    template = synth()
+
+    # A wildcard binary media type would match body-less OPTIONS requests and skip this template
+    template.has_resource_properties("AWS::ApiGateway::RestApi", {"BinaryMediaTypes": ["application/json"]})
+    preflights = template.find_resources("AWS::ApiGateway::Method", {"Properties": {"HttpMethod": "OPTIONS"}})
+    assert len(preflights) == len(cors_preflight_options())
+    for preflight in preflights.values():
+        integration = preflight["Properties"]["Integration"]
+        assert integration["Type"] == "MOCK"
+        assert integration["RequestTemplates"] == {"application/json": "{ statusCode: 200 }"}
+
+
+def test_router_mode_deploys_single_goals_function(synth):
+    template = synth(lambda_deployment_mode="router")
+
+    functions = template.find_resources("AWS::Lambda::Function")
+    goal_handlers = [fn["Properties"]["Handler"] for fn in functions.values()
+                     if fn["Properties"].get("Layers")]
+    # The stream consumer is not an API handler and keeps its own function
+    assert goal_handlers == ["goals_router/goals_router.lambda_handler", "goal_summary.lambda_handler"]
+
+
+def test_stage_cache_keys_reads_by_caller(synth):
+    template = synth(api_cache_enabled=True)
+
+    template.has_resource_properties("AWS::ApiGateway::Stage", {
+        "CacheClusterEnabled": True,
+        "MethodSettings": Match.array_with([
+            Match.object_like({"ResourcePath": "/~1goals~1{id}", "HttpMethod": "GET", "CachingEnabled": True})
+        ])
+    })
+    template.has_resource_properties("AWS::ApiGateway::Method", {
+        "HttpMethod": "GET",
+        "Integration": Match.object_like({
+            "CacheKeyParameters": Match.array_with(["method.request.header.Authorization", "method.request.path.id"])
+        })
+    })
+    # Every cached route can answer 304, so a conditional and an unconditional read never share an entry
+    cached = [method["Properties"] for method in template.find_resources("AWS::ApiGateway::Method").values()
+              if method["Properties"]["Integration"].get("CacheKeyParameters")]
+    assert len(cached) == 3
+    for method in cached:
+        assert "method.request.header.If-None-Match" in method["Integration"]["CacheKeyParameters"]
+        assert method["RequestParameters"]["method.request.header.If-None-Match"] is False
+
+
+def test_routes_invoke_aliases_with_scaled_provisioned_concurrency(synth):
+    template = synth(provisioned_concurrency={
+        "GetGoal": {"min": 2, "max": 10, "schedules": [{"cron": "cron(0 7 ? * MON-FRI *)", "min": 4, "max": 20}]}
+    })
+
+    aliases = template.find_resources("AWS::Lambda::Alias")
+    assert len(aliases) == 9 and {alias["Properties"]["Name"] for alias in aliases.values()} == {"live"}
+    template.has_resource_properties("AWS::Lambda::Alias", {
+        "ProvisionedConcurrencyConfig": {"ProvisionedConcurrentExecutions": 2}
+    })
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "MinCapacity": 2,
+        "MaxCapacity": 10,
+        "ScalableDimension": "lambda:function:ProvisionedConcurrency",
+        "ScheduledActions": [Match.object_like({
+            "Schedule": "cron(0 7 ? * MON-FRI *)",
+            "ScalableTargetAction": {"MinCapacity": 4, "MaxCapacity": 20}
+        })]
+    })
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalingPolicy", {
+        "TargetTrackingScalingPolicyConfiguration": Match.object_like({
+            "TargetValue": 0.7,
+            "PredefinedMetricSpecification": {"PredefinedMetricType": "LambdaProvisionedConcurrencyUtilization"}
+        })
+    })
+    # API Gateway may only invoke the aliases, never $LATEST
+    permissions = template.find_resources("AWS::Lambda::Permission", {"Properties": {"Principal": "apigateway.amazonaws.com"}})
+    assert permissions and all("LiveAlias" in json.dumps(permission["Properties"]["FunctionName"]) for permission in permissions.values())
+
+
+def test_queue_mode_drains_creates_through_goal_writer(synth):
+    template = synth(create_goal_mode="queue")
+
+    queues = template.find_resources("AWS::SQS::Queue")
+    assert len(queues) == 2
+    template.has_resource_properties("AWS::SQS::Queue", {
+        "VisibilityTimeout": 180,
+        "RedrivePolicy": Match.object_like({"maxReceiveCount": 5})
+    })
+    template.has_resource_properties("AWS::Lambda::EventSourceMapping", {
+        "BatchSize": 100,
+        "FunctionResponseTypes": ["ReportBatchItemFailures"],
+        "ScalingConfig": {"MaximumConcurrency": config.goal_write_max_concurrency}
+    })
+    functions = {fn["Properties"]["Handler"]: fn["Properties"] for fn in template.find_resources("AWS::Lambda::Function").values()
+                 if fn["Properties"].get("Layers")}
+    # Only the function behind POST /goals knows the queue
+    assert "GOAL_WRITE_QUEUE_URL" in functions["create_goal.lambda_handler"]["Environment"]["Variables"]
+    assert "GOAL_WRITE_QUEUE_URL" not in functions["get_goal.lambda_handler"]["Environment"]["Variables"]
+    assert "goal_writer.lambda_handler" in functions
+    template.has_resource_properties("AWS::CloudWatch::Alarm", {"AlarmName": Match.string_like_regexp("GoalWriteDeadLetters")})
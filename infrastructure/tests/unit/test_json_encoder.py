@@ -0,0 +1,19 @@
+import json
+from decimal import Decimal
+
+import pytest
+from utils.json_encoder import ENCODERS
+from utils.utils import build_response
+
+GOAL = {"goalId": "g-1", "version": Decimal("2"), "score": Decimal("0.5"), "tags": {"b", "a"}, "blob": b"hi"}
+
+
+@pytest.mark.parametrize("name", sorted(ENCODERS))
+def test_encoders_handle_dynamodb_types(name):
+    assert json.loads(ENCODERS[name]([GOAL])) == [
+        {"goalId": "g-1", "version": 2, "score": 0.5, "tags": ["a", "b"], "blob": "aGk="}
+    ]
+
+
+def test_build_response_serializes_decimals():
+    assert json.loads(build_response(200, GOAL)["body"])["version"] == 2
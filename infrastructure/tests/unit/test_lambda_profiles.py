@@ -0,0 +1,67 @@
+from aws_cdk.assertions import Template
+from app_constructs.lambda_module import LAMBDA_DEFINITIONS, resolve_profile, router_profile
+from benchmarks.profile_recommender import lambda_profiles, recommend, recommend_profiles
+import pytest
+
+
+def layer_functions(template: Template) -> dict:
+    functions = template.find_resources("AWS::Lambda::Function")
+    return {fn["Properties"]["Handler"]: fn["Properties"] for fn in functions.values() if fn["Properties"].get("Layers")}
+
+
+def test_functions_are_sized_by_their_profiles(synth):
+    functions = layer_functions(synth(lambda_profiles={
+        "GetGoal": {"memory_mb": 192, "reserved_concurrency": 50},
+        "GoalSummary": {"architecture": "x86_64", "ephemeral_storage_mb": 1024}
+    }))
+
+    get_all_goals = functions["get_all_goals.lambda_handler"]
+    assert (get_all_goals["MemorySize"], get_all_goals["Architectures"], get_all_goals["Timeout"]) == (512, ["arm64"], 5)
+    assert get_all_goals["EphemeralStorage"] == {"Size": 512} and "ReservedConcurrentExecutions" not in get_all_goals
+    assert functions["batch_goals.lambda_handler"]["Timeout"] == 10
+    # Environment overrides win over the definitions
+    assert functions["get_goal.lambda_handler"]["MemorySize"] == 192
+    assert functions["get_goal.lambda_handler"]["ReservedConcurrentExecutions"] == 50
+    assert functions["goal_summary.lambda_handler"]["Architectures"] == ["x86_64"]
+    assert functions["goal_summary.lambda_handler"]["EphemeralStorage"] == {"Size": 1024}
+    assert functions["goal_summary.lambda_handler"]["Timeout"] == 30
+
+
+def test_router_gets_the_largest_route_profile(synth):
+    functions = layer_functions(synth(lambda_deployment_mode="router"))
+
+    router = functions["goals_router/goals_router.lambda_handler"]
+    assert (router["MemorySize"], router["Architectures"], router["Timeout"]) == (512, ["arm64"], 10)
+    assert router_profile({"A": {"profile": {"architecture": "x86_64"}}, "B": {}})["architecture"] == "x86_64"
+
+
+def test_invalid_profiles_are_rejected(synth):
+    assert resolve_profile("GetGoal", LAMBDA_DEFINITIONS["GetGoal"].get("profile"))["memory_mb"] == 128
+    with pytest.raises(ValueError, match="memory_mb"):
+        resolve_profile("GetGoal", override={"memory_mb": 64})
+    with pytest.raises(ValueError, match="architecture"):
+        resolve_profile("GetGoal", override={"architecture": "arm"})
+    with pytest.raises(ValueError, match="unknown profile keys"):
+        resolve_profile("GetGoal", override={"memory": 256})
+    with pytest.raises(ValueError, match="LAMBDA_PROFILES"):
+        synth(lambda_profiles={"GoalsRouter": {"memory_mb": 256}})
+    with pytest.raises(ValueError, match="reserved concurrency"):
+        synth(lambda_profiles={"GetGoal": {"reserved_concurrency": 5}},
+              provisioned_concurrency={"GetGoal": {"min": 1, "max": 10}})
+
+
+def test_recommender_picks_the_cheapest_size_within_target():
+    results = {
+        "10": {"GetGoal": {"p95_ms": 1.0}},
+        "1000": {"GetGoal": {"p95_ms": 2.0}, "GetAllGoals": {"p95_ms": 20.0}, "GetAllGoals:all": {"p95_ms": 400.0}}
+    }
+
+    recommendations = recommend_profiles(results, target_ms=100)
+
+    # 2 ms of CPU stays within target even at 128 MB, and arm64 is cheaper for the same time
+    assert lambda_profiles(recommendations)["GetGoal"] == {"memory_mb": 128, "architecture": "arm64"}
+    # The slowest variant of a function decides; 400 ms can't make the target at any size
+    assert recommendations["GetAllGoals"]["meets_target"] is False
+    assert recommendations["GetAllGoals"]["memory_mb"] == 1769
+    assert recommend(20.0, target_ms=100)["memory_mb"] == 512
+    assert recommend(20.0, target_ms=100, arm_factor=2.0)["architecture"] == "x86_64"
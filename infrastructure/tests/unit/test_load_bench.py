@@ -0,0 +1,20 @@
+from benchmarks.load_bench import ROUTES, find_regressions, run_benchmark
+
+
+def test_benchmark_reports_every_route():
+    results = run_benchmark(sizes=(10,), seconds=0, max_requests=5)
+
+    assert list(results["10"]) == list(ROUTES)
+    for stats in results["10"].values():
+        assert stats["samples"] == 5
+        assert 0 < stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+
+
+def test_find_regressions_applies_threshold_and_jitter_floor():
+    baseline = {"100": {"GetGoal": {"p95_ms": 1.0}, "CreateGoal": {"p95_ms": 0.01}, "DeleteGoal": {"p95_ms": 1.0}}}
+    current = {"100": {"GetGoal": {"p95_ms": 1.5}, "CreateGoal": {"p95_ms": 0.03}, "DeleteGoal": {"p95_ms": 1.1}},
+               "1000": {"GetGoal": {"p95_ms": 9.0}}}
+
+    regressions = find_regressions(baseline, current, threshold=0.25)
+
+    assert [(r["size"], r["route"], r["change"]) for r in regressions] == [("100", "GetGoal", 0.5)]
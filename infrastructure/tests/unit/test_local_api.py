@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from app_constructs.api_gateway import API_ROUTES
+
+
+@pytest.fixture
+def api(local_client):
+    from local.api import LocalApi, RouteTable
+    return LocalApi(RouteTable(), quiet=True)
+
+
+def test_route_table_covers_every_api_route(api):
+    for route in API_ROUTES:
+        path = route["path"].replace("{id}", "abc")
+        assert api.routes.match(path)[0] == route["path"]
+    # Literal resources take precedence over {id}, as in API Gateway
+    assert api.routes.match("/goals/batch") == ("/goals/batch", {})
+    assert api.routes.match("/goals/abc") == ("/goals/{id}", {"id": "abc"})
+
+
+def test_requests_reach_the_handlers(api):
+    status, _, body = api.handle("POST", "/goals", {"Authorization": "alice"}, b'{"title": "t", "content": "c"}')
+    goal = json.loads(body)
+    assert status == 200 and goal["userId"] == "alice"
+
+    status, headers, body = api.handle("GET", f"/goals/{goal['goalId']}", {"authorization": "alice"}, b"")
+    assert status == 200 and json.loads(body) == goal and "ETag" in headers
+
+    status, _, _ = api.handle("GET", f"/goals/{goal['goalId']}", {"Authorization": "mallory"}, b"")
+    assert status == 404
+
+    status, _, body = api.handle("GET", "/goals?limit=1", {"Authorization": "alice"}, b"")
+    assert status == 200 and [item["goalId"] for item in json.loads(body)["items"]] == [goal["goalId"]]
+
+
+def test_gateway_responses(api):
+    assert api.handle("GET", "/goals", {}, b"")[0] == 401
+    assert api.handle("GET", "/goals/batch", {"Authorization": "alice"}, b"")[0] == 403
+    assert api.handle("GET", "/nope", {"Authorization": "alice"}, b"")[0] == 403
+
+    status, headers, _ = api.handle("OPTIONS", "/goals/abc", {}, b"")
+    assert status == 204
+    assert headers["Access-Control-Allow-Methods"] == "OPTIONS,GET,PUT,DELETE"
+
+
+def test_jwt_claims_are_decoded():
+    from local.api import claims_from_authorization
+    import base64
+    payload = base64.urlsafe_b64encode(json.dumps({"sub": "u-1", "email": "a@b.c", "exp": 1}).encode()).decode().rstrip("=")
+
+    claims = claims_from_authorization(f"Bearer header.{payload}.signature")
+
+    assert claims == {"sub": "u-1", "email": "a@b.c", "exp": "1"}
@@ -0,0 +1,95 @@
+import pytest
+
+from local.dynamodb import LocalDynamoDB
+from utils.dynamodb import from_item, to_item
+
+TABLE = "goals-test"
+
+
+@pytest.fixture
+def client():
+    client = LocalDynamoDB()
+    for i in range(30):
+        client.put_item(TableName=TABLE, Item=to_item({"userId": "u1", "goalId": f"g{i:02d}", "title": f"t{i}"}))
+    client.put_item(TableName=TABLE, Item=to_item({"userId": "u2", "goalId": "g00", "title": "other"}))
+    return client
+
+
+def _ids(response):
+    return [item["goalId"]["S"] for item in response["Items"]]
+
+
+def test_query_pages_with_limit_and_exclusive_start_key(client):
+    first = client.query(TableName=TABLE, KeyConditionExpression="userId = :u",
+                         ExpressionAttributeValues=to_item({":u": "u1"}), Limit=20)
+    second = client.query(TableName=TABLE, KeyConditionExpression="userId = :u",
+                          ExpressionAttributeValues=to_item({":u": "u1"}), Limit=20,
+                          ExclusiveStartKey=first["LastEvaluatedKey"])
+
+    assert _ids(first) == [f"g{i:02d}" for i in range(20)]
+    assert first["LastEvaluatedKey"] == to_item({"userId": "u1", "goalId": "g19"})
+    assert _ids(second) == [f"g{i:02d}" for i in range(20, 30)]
+    assert "LastEvaluatedKey" not in second
+
+
+def test_query_sort_key_conditions_and_direction(client):
+    values = to_item({":u": "u1", ":lo": "g05", ":hi": "g08", ":p": "g1"})
+    between = client.query(TableName=TABLE, KeyConditionExpression="userId = :u AND goalId BETWEEN :lo AND :hi",
+                           ExpressionAttributeValues=values)
+    prefix = client.query(TableName=TABLE, KeyConditionExpression="userId = :u AND begins_with(goalId, :p)",
+                          ExpressionAttributeValues=values, ScanIndexForward=False, Limit=3)
+    below = client.query(TableName=TABLE, KeyConditionExpression="#u = :u AND goalId < :lo",
+                         ExpressionAttributeNames={"#u": "userId"}, ExpressionAttributeValues=values, Select="COUNT")
+
+    assert _ids(between) == ["g05", "g06", "g07", "g08"]
+    assert _ids(prefix) == ["g19", "g18", "g17"]
+    assert below["Count"] == 5 and "Items" not in below
+
+
+def test_conditional_update_with_counters(client):
+    key = to_item({"userId": "u1", "goalId": "g01"})
+    response = client.update_item(
+        TableName=TABLE, Key=key,
+        UpdateExpression="SET #t = :t, #v = if_not_exists(#v, :zero) + :one ADD hits :one REMOVE missing",
+        ConditionExpression="attribute_exists(goalId)",
+        ExpressionAttributeNames={"#t": "title", "#v": "version"},
+        ExpressionAttributeValues=to_item({":t": "new", ":zero": 0, ":one": 1}),
+        ReturnValues="ALL_NEW"
+    )
+    assert from_item(response["Attributes"]) == {"userId": "u1", "goalId": "g01", "title": "new", "version": 1, "hits": 1}
+
+    with pytest.raises(client.exceptions.ConditionalCheckFailedException) as error:
+        client.update_item(TableName=TABLE, Key=to_item({"userId": "u1", "goalId": "nope"}),
+                           UpdateExpression="SET title = :t", ConditionExpression="attribute_exists(goalId)",
+                           ExpressionAttributeValues=to_item({":t": "x"}))
+    assert error.value.response["Error"]["Code"] == "ConditionalCheckFailedException"
+    assert "Item" not in client.get_item(TableName=TABLE, Key=to_item({"userId": "u1", "goalId": "nope"}))
+
+
+def test_batch_operations_and_stream_listener(client):
+    events = []
+    client.add_listener(lambda table, name, old, new: events.append(name))
+
+    client.batch_write_item(RequestItems={TABLE: [
+        {"PutRequest": {"Item": to_item({"userId": "u3", "goalId": "a"})}},
+        {"DeleteRequest": {"Key": to_item({"userId": "u1", "goalId": "g00"})}}
+    ]})
+    found = client.batch_get_item(RequestItems={TABLE: {"Keys": [
+        to_item({"userId": "u3", "goalId": "a"}),
+        to_item({"userId": "u1", "goalId": "g00"})
+    ]}})
+
+    assert events == ["INSERT", "REMOVE"]
+    assert [from_item(item) for item in found["Responses"][TABLE]] == [{"userId": "u3", "goalId": "a"}]
+    assert client.item_count(TABLE) == 31
+
+
+def test_transaction_is_all_or_nothing(client):
+    with pytest.raises(client.exceptions.TransactionCanceledException):
+        client.transact_write_items(TransactItems=[
+            {"Put": {"TableName": TABLE, "Item": to_item({"userId": "u1", "goalId": "new"})}},
+            {"Delete": {"TableName": TABLE, "Key": to_item({"userId": "u1", "goalId": "missing"}),
+                        "ConditionExpression": "attribute_exists(goalId)"}}
+        ])
+
+    assert "Item" not in client.get_item(TableName=TABLE, Key=to_item({"userId": "u1", "goalId": "new"}))
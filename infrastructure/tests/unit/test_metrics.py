@@ -0,0 +1,42 @@
+import json
+
+from utils import metrics
+from utils.metrics import MetricsLogger, current_metrics, instrument
+
+
+def test_flush_writes_embedded_metric_format():
+    lines = []
+    logger = MetricsLogger("GetGoal", namespace="GoalsApi-test", emit=lines.append)
+    logger.put("DynamoDBLatency", 4.2, "Milliseconds")
+    logger.put("DynamoDBLatency", 3.1, "Milliseconds")
+    logger.put("ItemCount", 1, "Count")
+    logger.flush()
+
+    record = json.loads(lines[0])
+    directive = record["_aws"]["CloudWatchMetrics"][0]
+    assert directive["Namespace"] == "GoalsApi-test"
+    assert directive["Dimensions"] == [["Route"]]
+    assert {"Name": "ItemCount", "Unit": "Count"} in directive["Metrics"]
+    assert record["Route"] == "GetGoal"
+    assert record["DynamoDBLatency"] == [4.2, 3.1]
+    assert record["ItemCount"] == 1
+
+
+def test_instrument_records_handler_metrics(monkeypatch):
+    lines = []
+    monkeypatch.setattr(metrics, "_cold_start", True)
+
+    @instrument("GetAllGoals", emit=lines.append)
+    def handler(event, context):
+        current_metrics().put("ItemCount", 3, "Count")
+        return {"statusCode": 200, "body": "[1,2,3]"}
+
+    handler({}, None)
+    handler({}, None)
+
+    first, second = (json.loads(line) for line in lines)
+    assert first["ColdStart"] == 1 and second["ColdStart"] == 0
+    assert first["ItemCount"] == 3
+    assert first["ResponseSize"] == 7
+    assert first["2xx"] == 1
+    assert "HandlerLatency" in first
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+from utils import tracing
+from utils.errors import HttpError, NotFound
+from utils.middleware import Reply, goal_handler, register_middleware
+from utils import middleware
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = tracing.InMemoryExporter()
+    monkeypatch.setattr(tracing, "_exporter", exporter)
+    monkeypatch.delenv("_X_AMZN_TRACE_ID", raising=False)
+    return exporter
+
+
+def _event(body=None, claims=None):
+    return {
+        "requestContext": {"authorizer": {"claims": claims or {"sub": "user-1"}}},
+        "pathParameters": {"id": "goal-1"},
+        "body": body
+    }
+
+
+def test_pipeline_records_stage_spans(exporter):
+    @goal_handler("CreateGoal", parse_json_body=True)
+    def handler(request):
+        with tracing.span("DynamoDB", namespace="aws"):
+            pass
+        return Reply(200, {"user": request.user_id, "title": request.body["title"], "id": request.path_id})
+
+    response = handler(_event(json.dumps({"title": "t"})), None)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == {"user": "user-1", "title": "t", "id": "goal-1"}
+    root, = exporter.documents
+    assert root["name"] == "CreateGoal"
+    assert root["annotations"] == {"route": "CreateGoal", "status": 200}
+    assert [span["name"] for span in root["subsegments"]] == ["auth", "parse", "handler", "serialize"]
+    assert exporter.spans("DynamoDB")[0]["namespace"] == "aws"
+
+
+@pytest.mark.parametrize("goal_id, status", [("01HZX", 200), ("~STATS", 404), ("~T#run#01HZX", 404), (None, 404)])
+def test_goal_id_is_not_found_under_the_reserved_prefix(exporter, goal_id, status):
+    @goal_handler("GetGoal")
+    def handler(request):
+        return Reply(200, {"id": request.goal_id})
+
+    response = handler({**_event(), "pathParameters": {"id": goal_id} if goal_id else None}, None)
+
+    assert response["statusCode"] == status
+    if status == 200:
+        assert json.loads(response["body"]) == {"id": goal_id}
+
+
+@pytest.mark.parametrize("event, raised, status", [
+    ({"requestContext": {}}, None, 401),
+    (_event("not json"), None, 400),
+    (_event("{}"), NotFound("Goal not found"), 404),
+    (_event("{}"), HttpError("Conflict", status_code=409), 409),
+    (_event("{}"), RuntimeError("boom"), 500)
+])
+def test_errors_map_to_status_codes(exporter, event, raised, status):
+    @goal_handler("UpdateGoal", parse_json_body=True)
+    def handler(request):
+        if raised:
+            raise raised
+        return Reply(200, {})
+
+    response = handler(event, None)
+
+    assert response["statusCode"] == status
+    assert exporter.documents[0]["annotations"]["status"] == status
+    if status == 500:
+        assert json.loads(response["body"]) == {"error": "Internal server error"}
+        assert exporter.documents[0]["fault"] is True
+
+
+def test_registered_middleware_wraps_handler(exporter, monkeypatch):
+    monkeypatch.setattr(middleware, "_global_middlewares", [])
+    calls = []
+
+    def add_header(request, call_next):
+        calls.append(request.route)
+        reply = call_next(request)
+        reply.headers["X-Route"] = request.route
+        return reply
+
+    register_middleware(add_header)
+
+    @goal_handler("GetGoal")
+    def handler(request):
+        return Reply(200, {})
+
+    response = handler(_event(), None)
+
+    assert calls == ["GetGoal"]
+    assert response["headers"]["X-Route"] == "GetGoal"
+
+
+def test_trace_joins_lambda_trace_header(exporter, monkeypatch):
+    monkeypatch.setenv("_X_AMZN_TRACE_ID", "Root=1-5759e988-bd862e3fe1be46a994272793;Parent=53995c3f42cd8ad8;Sampled=1")
+
+    @goal_handler("GetGoal")
+    def handler(request):
+        return Reply(200, {})
+
+    handler(_event(), None)
+
+    document = exporter.documents[0]
+    assert document["trace_id"] == "1-5759e988-bd862e3fe1be46a994272793"
+    assert document["parent_id"] == "53995c3f42cd8ad8"
+    assert document["type"] == "subsegment"
@@ -0,0 +1,77 @@
+import pytest
+from utils import parameters
+from utils.pagination import InvalidPageRequest, decode_cursor, encode_cursor, parse_limit, parse_order
+
+USER_ID = "user-1"
+LAST_KEY = {"userId": USER_ID, "goalId": "goal-42"}
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(LAST_KEY, USER_ID)
+    assert decode_cursor(cursor, USER_ID) == LAST_KEY
+
+
+def test_no_cursor_for_last_page():
+    assert encode_cursor(None, USER_ID) is None
+
+
+def test_tampered_cursor_is_rejected():
+    payload, signature = encode_cursor(LAST_KEY, USER_ID).split(".")
+    forged = encode_cursor({"userId": USER_ID, "goalId": "goal-99"}, USER_ID).split(".")[0]
+    with pytest.raises(InvalidPageRequest):
+        decode_cursor(f"{forged}.{signature}", USER_ID)
+
+
+@pytest.mark.parametrize("cursor", ["abc.é", "é.abc", "no-separator"])
+def test_garbled_cursor_is_a_client_error(cursor):
+    with pytest.raises(InvalidPageRequest):
+        decode_cursor(cursor, USER_ID)
+
+
+def test_signing_key_is_read_from_ssm_once(monkeypatch):
+    class ParameterStore:
+        calls = []
+
+        def get_parameter(self, Name: str, WithDecryption: bool = False) -> dict:
+            self.calls.append((Name, WithDecryption))
+            return {"Parameter": {"Name": Name, "Type": "SecureString", "Value": "ssm-signing-key"}}
+
+    monkeypatch.delenv("CURSOR_SIGNING_KEY")
+    monkeypatch.setenv("CURSOR_SIGNING_KEY_PARAMETER", "/goals-api/test/cursor-signing-key")
+    store = ParameterStore()
+    parameters.set_client(store)
+    try:
+        cursor = encode_cursor(LAST_KEY, USER_ID)
+        decoded = decode_cursor(cursor, USER_ID)
+        # Signed with the parameter's value: a key set in the environment takes over and rejects it
+        monkeypatch.setenv("CURSOR_SIGNING_KEY", "test-signing-key")
+        with pytest.raises(InvalidPageRequest):
+            decode_cursor(cursor, USER_ID)
+    finally:
+        parameters.set_client(None)
+
+    assert decoded == LAST_KEY
+    assert store.calls == [("/goals-api/test/cursor-signing-key", True)]
+
+
+def test_cursor_is_bound_to_user():
+    cursor = encode_cursor(LAST_KEY, USER_ID)
+    with pytest.raises(InvalidPageRequest):
+        decode_cursor(cursor, "user-2")
+
+
+@pytest.mark.parametrize("value", ["0", "101", "ten"])
+def test_invalid_limit(value):
+    with pytest.raises(InvalidPageRequest):
+        parse_limit(value)
+
+
+def test_default_limit():
+    assert parse_limit(None) == 20
+
+
+def test_order_maps_to_scan_direction():
+    assert parse_order(None) is True
+    assert parse_order("desc") is False
+    with pytest.raises(InvalidPageRequest):
+        parse_order("newest")
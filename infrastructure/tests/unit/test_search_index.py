@@ -0,0 +1,114 @@
+import json
+
+from local.events import proxy_event
+from utils import dynamodb
+from utils.cache import goal_cache
+from utils.search_index import index_requests, is_goal_id, matches, title_tokens
+
+
+def test_title_tokens_are_normalized_words():
+    assert title_tokens("Čitanje: 12 knjiga, ČITANJE!") == ["citanje", "12", "knjiga"]
+    assert title_tokens("") == []
+    # Stored titles predating validation may not be strings; they still index
+    assert title_tokens(123) == ["123"] and title_tokens(None) == []
+    assert not is_goal_id("~T#run#01J") and is_goal_id("01HZX")
+
+
+def test_query_words_match_title_word_prefixes():
+    assert matches("Run 5 km every week", ["run", "wee"])
+    assert not matches("Run 5 km every week", ["walk"])
+
+
+def test_index_requests_move_only_changed_words():
+    requests = index_requests("u", "g1", old_title="Read books", new_title="Read papers")
+
+    assert [next(iter(request)) for request in requests] == ["DeleteRequest", "PutRequest"]
+    assert requests[0]["DeleteRequest"]["Key"]["goalId"] == {"S": "~T#books#g1"}
+    assert requests[1]["PutRequest"]["Item"]["ref"] == {"S": "g1"}
+
+
+def test_search_follows_create_update_and_delete(local_client):
+    from create_goal import create_goal
+    from delete_goal import delete_goal
+    from get_all_goals import get_all_goals
+    from get_goal import get_goal
+    from search_goals import search_goals
+    from update_goal import update_goal
+
+    def search(q):
+        response = search_goals.lambda_handler(proxy_event("GET", "/goals/search", query={"q": q}), None)
+        return [goal["title"] for goal in json.loads(response["body"])["items"]]
+
+    ids = {}
+    for title in ("Run a marathon", "Running shoes", "Read books"):
+        response = create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": title, "content": "c"}), None)
+        ids[title] = json.loads(response["body"])["goalId"]
+
+    assert search("run") == ["Run a marathon", "Running shoes"]
+    assert search("RUN mar") == ["Run a marathon"]
+    queries = local_client.calls["Query"]
+
+    update_goal.lambda_handler(proxy_event("PUT", "/goals/{id}", {"id": ids["Read books"]}, body={"title": "Run daily"}), None)
+    delete_goal.lambda_handler(proxy_event("DELETE", "/goals/{id}", {"id": ids["Running shoes"]}), None)
+    assert search("run") == ["Run a marathon", "Run daily"]
+    assert search("books") == []
+
+    listed = get_all_goals.lambda_handler(proxy_event("GET", "/goals"), None)
+    index_item = get_goal.lambda_handler(proxy_event("GET", "/goals/{id}", {"id": f"~T#run#{ids['Run a marathon']}"}), None)
+    empty = search_goals.lambda_handler(proxy_event("GET", "/goals/search", query={"q": "  "}), None)
+
+    # Each search is one query over the matching index keys
+    assert queries == 2
+    assert sorted(goal["title"] for goal in json.loads(listed["body"])) == ["Run a marathon", "Run daily"]
+    assert index_item["statusCode"] == 404
+    assert empty["statusCode"] == 400
+
+
+def test_titles_that_are_not_strings_are_rejected_before_the_write(local_client):
+    from batch_goals import batch_goals
+    from create_goal import create_goal
+    from update_goal import update_goal
+    created = create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": 123, "content": "c"}), None)
+    goal = json.loads(create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": "Read", "content": "c"}), None)["body"])
+    writes = dict(local_client.calls)
+    updated = update_goal.lambda_handler(proxy_event("PUT", "/goals/{id}", {"id": goal["goalId"]}, body={"title": ["Read"]}), None)
+    batch = batch_goals.lambda_handler(proxy_event("POST", "/goals/batch", body={"operations": [
+        {"action": "create", "title": {"en": "Run"}, "content": "c"}]}), None)
+
+    assert created["statusCode"] == 400 and updated["statusCode"] == 400
+    assert json.loads(created["body"]) == {"error": "title must be a string"}
+    assert json.loads(batch["body"])["results"][0]["status"] == 400
+    # Only the valid goal was written
+    assert dict(local_client.calls) == writes
+    assert writes["PutItem"] == 1
+
+
+def test_a_failed_index_write_does_not_fail_the_committed_goal_write(local_client, monkeypatch):
+    from batch_goals import batch_goals
+    from create_goal import create_goal
+    from delete_goal import delete_goal
+    from get_all_goals import get_all_goals
+    from update_goal import update_goal
+    batch_write_item = local_client.batch_write_item
+
+    def index_unavailable(RequestItems, **kwargs):
+        keys = [(request.get("PutRequest") or {}).get("Item") or request["DeleteRequest"]["Key"]
+                for requests in RequestItems.values() for request in requests]
+        if any(key["goalId"]["S"].startswith("~T#") for key in keys):
+            raise RuntimeError("ProvisionedThroughputExceededException")
+        return batch_write_item(RequestItems=RequestItems, **kwargs)
+
+    monkeypatch.setattr(local_client, "batch_write_item", index_unavailable)
+    created = create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": "Run a marathon", "content": "c"}), None)
+    goal_id = json.loads(created["body"])["goalId"]
+    updated = update_goal.lambda_handler(proxy_event("PUT", "/goals/{id}", {"id": goal_id}, body={"title": "Run daily"}), None)
+    batch = batch_goals.lambda_handler(proxy_event("POST", "/goals/batch", body={"operations": [
+        {"action": "create", "title": "Read", "content": "c"}]}), None)
+    deleted = delete_goal.lambda_handler(proxy_event("DELETE", "/goals/{id}", {"id": goal_id}), None)
+    goal_cache.clear()
+    listed = json.loads(get_all_goals.lambda_handler(proxy_event("GET", "/goals"), None)["body"])
+
+    assert [response["statusCode"] for response in (created, updated, batch, deleted)] == [200, 200, 200, 200]
+    assert json.loads(batch["body"])["results"][0]["status"] == 201
+    # Every write happened once; only the index entries are missing
+    assert [goal["title"] for goal in listed] == ["Read"]
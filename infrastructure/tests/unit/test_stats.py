@@ -0,0 +1,82 @@
+import json
+
+from local.dynamodb import seed_goals
+from local.events import proxy_event
+from local.streams import GOAL_FILTERS, LocalStream
+from utils import dynamodb
+
+
+def _handlers():
+    from batch_goals import batch_goals
+    from create_goal import create_goal
+    from delete_goal import delete_goal
+    from goal_stats import goal_stats
+    from goal_summary import goal_summary
+    return create_goal, delete_goal, batch_goals, goal_stats, goal_summary
+
+
+def test_goal_count_follows_the_stream_and_is_read_in_one_call(local_client):
+    create_goal, delete_goal, batch_goals, goal_stats, goal_summary = _handlers()
+    stream = LocalStream(local_client, dynamodb.get_table_name(), filters=GOAL_FILTERS)
+
+    def count():
+        return json.loads(goal_stats.lambda_handler(proxy_event("GET", "/goals/stats"), None)["body"])["goalCount"]
+
+    goal_ids = []
+    for i in range(3):
+        response = create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": f"goal {i}", "content": "c"}), None)
+        goal_ids.append(json.loads(response["body"])["goalId"])
+    stream.deliver(goal_summary.lambda_handler)
+    assert count() == 3
+
+    delete_goal.lambda_handler(proxy_event("DELETE", "/goals/{id}", {"id": goal_ids[0]}), None)
+    missing = delete_goal.lambda_handler(proxy_event("DELETE", "/goals/{id}", {"id": goal_ids[0]}), None)
+    batch_goals.lambda_handler(proxy_event("POST", "/goals/batch", body={"operations": [
+        {"action": "create", "title": "t", "content": "c"},
+        {"action": "delete", "goalId": goal_ids[1]},
+        {"action": "delete", "goalId": "never-existed"}
+    ]}), None)
+    stream.deliver(goal_summary.lambda_handler)
+
+    local_client.calls.clear()
+    assert count() == 2
+
+    assert missing["statusCode"] == 404
+    assert dict(local_client.calls) == {"GetItem": 1}
+
+
+def test_a_failed_counter_write_is_retried_with_the_stream(local_client, monkeypatch):
+    create_goal, delete_goal, _, goal_stats, goal_summary = _handlers()
+    stream = LocalStream(local_client, dynamodb.get_table_name(), filters=GOAL_FILTERS)
+    update_item = local_client.update_item
+    failures = []
+
+    def unavailable_once(**kwargs):
+        if not failures:
+            failures.append(kwargs["Key"])
+            raise RuntimeError("ProvisionedThroughputExceededException")
+        return update_item(**kwargs)
+
+    goals = [json.loads(create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": title, "content": "c"}), None)["body"])
+             for title in ("Run a marathon", "Read books")]
+    stream.deliver(goal_summary.lambda_handler)
+    deleted = delete_goal.lambda_handler(proxy_event("DELETE", "/goals/{id}", {"id": goals[0]["goalId"]}), None)
+    monkeypatch.setattr(local_client, "update_item", unavailable_once)
+    invocations = stream.deliver(goal_summary.lambda_handler)
+    stats = json.loads(goal_stats.lambda_handler(proxy_event("GET", "/goals/stats"), None)["body"])
+
+    # The delete itself never touches the counter; the consumer's failed write was redone
+    assert deleted["statusCode"] == 200
+    assert failures and invocations == 2
+    assert stats == {"goalCount": 1}
+
+
+def test_first_read_counts_goals_written_before_the_counter(local_client):
+    _, _, _, goal_stats, _ = _handlers()
+    seed_goals(local_client, dynamodb.get_table_name(), "local-user", 25)
+    first = goal_stats.lambda_handler(proxy_event("GET", "/goals/stats"), None)
+    queries = local_client.calls["Query"]
+    second = goal_stats.lambda_handler(proxy_event("GET", "/goals/stats"), None)
+
+    assert json.loads(first["body"]) == json.loads(second["body"]) == {"goalCount": 25}
+    assert queries == 1 and local_client.calls["Query"] == 1
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from local.events import proxy_event
+from utils import dynamodb
+from utils.cache import goal_cache
+
+
+def create(title: str, content: str, user_id: str = "alice") -> dict:
+    from create_goal import create_goal
+    response = create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": title, "content": content}, user_id=user_id), None)
+    return json.loads(response["body"])
+
+
+def stored(client, goal_id: str, user_id: str = "alice"):
+    return client.get_item(TableName=dynamodb.get_table_name(), Key={"userId": {"S": user_id}, "goalId": {"S": goal_id}}).get("Item")
+
+
+@pytest.mark.parametrize("goal_id, user_id", [("01HZZZZZZZZZZZZZZZZZZZZZZZ", "alice"), (None, "bob")])
+def test_update_of_a_missing_or_foreign_goal_is_not_found(local_client, goal_id, user_id):
+    from update_goal import update_goal
+    goal = create("Run a marathon", "42 km")
+    goal_id = goal_id or goal["goalId"]
+
+    response = update_goal.lambda_handler(proxy_event("PUT", "/goals/{id}", {"id": goal_id}, body={"title": "Walk"}, user_id=user_id), None)
+
+    assert response["statusCode"] == 404
+    assert json.loads(response["body"]) == {"error": "Goal not found or not authorized"}
+    # The conditional update created nothing for the caller and left the owner's goal alone
+    assert stored(local_client, goal_id, user_id) is None
+    assert stored(local_client, goal["goalId"])["title"] == {"S": "Run a marathon"}
+
+
+def test_update_returns_the_updated_goal(local_client):
+    from get_goal import get_goal
+    from update_goal import update_goal
+    goal = create("Run a marathon", "42 km")
+
+    response = update_goal.lambda_handler(proxy_event("PUT", "/goals/{id}", {"id": goal["goalId"]}, body={"title": "Run an ultra"}, user_id="alice"), None)
+    body = json.loads(response["body"])
+    goal_cache.clear()
+    read = get_goal.lambda_handler(proxy_event("GET", "/goals/{id}", {"id": goal["goalId"]}, user_id="alice"), None)
+
+    assert response["statusCode"] == 200
+    assert body == {**goal, "title": "Run an ultra", "version": 2}
+    assert body == json.loads(read["body"]) and response["headers"]["ETag"] == read["headers"]["ETag"]
+
+
+@pytest.mark.parametrize("goal_id, user_id", [("01HZZZZZZZZZZZZZZZZZZZZZZZ", "alice"), (None, "bob")])
+def test_delete_of_a_missing_or_foreign_goal_is_not_found(local_client, goal_id, user_id):
+    from delete_goal import delete_goal
+    goal = create("Run a marathon", "42 km")
+    goal_id = goal_id or goal["goalId"]
+
+    response = delete_goal.lambda_handler(proxy_event("DELETE", "/goals/{id}", {"id": goal_id}, user_id=user_id), None)
+
+    assert response["statusCode"] == 404
+    assert json.loads(response["body"]) == {"error": "Goal not found or not authorized"}
+    assert stored(local_client, goal["goalId"]) is not None
+
+
+def test_delete_returns_the_deleted_goal(local_client):
+    from delete_goal import delete_goal
+    goal = create("Run a marathon", "42 km")
+
+    response = delete_goal.lambda_handler(proxy_event("DELETE", "/goals/{id}", {"id": goal["goalId"]}, user_id="alice"), None)
+    again = delete_goal.lambda_handler(proxy_event("DELETE", "/goals/{id}", {"id": goal["goalId"]}, user_id="alice"), None)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == {"message": "Goal successfully deleted", "goal": goal}
+    assert stored(local_client, goal["goalId"]) is None
+    assert again["statusCode"] == 404
+
+
+def test_delete_is_one_conditional_write(local_client):
+    from delete_goal import delete_goal
+    goal = create("Run a marathon", "42 km")
+    before = dict(local_client.calls)
+
+    response = delete_goal.lambda_handler(proxy_event("DELETE", "/goals/{id}", {"id": goal["goalId"]}, user_id="alice"), None)
+    calls = {name: count - before.get(name, 0) for name, count in local_client.calls.items() if count != before.get(name, 0)}
+
+    assert response["statusCode"] == 200
+    # No read before the delete; the search index entries of the title follow in one batch, and
+    # the goal counter follows from the table stream
+    assert calls == {"DeleteItem": 1, "BatchWriteItem": 1}
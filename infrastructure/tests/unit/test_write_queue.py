@@ -0,0 +1,89 @@
+import json
+import os
+
+from local.dynamodb import LocalDynamoDB
+from local.events import proxy_event
+from local.object_store import LocalObjectStore
+from local.queues import LocalQueue
+from local.streams import GOAL_FILTERS, LocalStream
+from utils import dynamodb, object_store, write_queue
+from utils.cache import goal_cache
+
+COMPRESSIBLE = "Keep a training log. " * 1000
+INCOMPRESSIBLE = os.urandom(60_000).hex()
+
+
+def test_queued_creates_are_written_by_the_consumer(local_client, monkeypatch):
+    from create_goal import create_goal
+    from goal_stats import goal_stats
+    from goal_summary import goal_summary
+    from goal_writer import goal_writer
+    from get_goal import get_goal
+    from search_goals import search_goals
+    queue = LocalQueue()
+    stream = LocalStream(local_client, dynamodb.get_table_name(), filters=GOAL_FILTERS)
+    object_store.set_client(LocalObjectStore())
+    write_queue.set_client(queue)
+    monkeypatch.setenv("GOAL_WRITE_QUEUE_URL", queue.url)
+
+    def get(goal_id):
+        goal_cache.clear()
+        return get_goal.lambda_handler(proxy_event("GET", "/goals/{id}", {"id": goal_id}), None)
+
+    try:
+        responses = [create_goal.lambda_handler(proxy_event("POST", "/goals", body={"title": title, "content": content}), None)
+                     for title, content in (("Run a marathon", "42 km"), ("Training log", COMPRESSIBLE), ("Big plan", INCOMPRESSIBLE))]
+        goal_ids = [json.loads(response["body"])["goalId"] for response in responses]
+        before = get(goal_ids[0])["statusCode"]
+        first_message = dict(queue.pending[0], receiveCount=0)
+        invocations = queue.deliver(goal_writer.lambda_handler)
+
+        goals = [json.loads(get(goal_id)["body"]) for goal_id in goal_ids]
+        # SQS delivers at least once: a duplicate neither fails nor counts the goal again
+        queue.pending.append(first_message)
+        queue.deliver(goal_writer.lambda_handler)
+        stream.deliver(goal_summary.lambda_handler)
+        stats = json.loads(goal_stats.lambda_handler(proxy_event("GET", "/goals/stats"), None)["body"])
+        found = json.loads(search_goals.lambda_handler(proxy_event("GET", "/goals/search", query={"q": "marathon"}), None)["body"])
+    finally:
+        object_store.set_client(None)
+        write_queue.set_client(None)
+
+    assert [response["statusCode"] for response in responses] == [202, 202, 202]
+    assert before == 404 and invocations == 1
+    assert [goal["content"] for goal in goals] == ["42 km", COMPRESSIBLE, INCOMPRESSIBLE]
+    assert stats == {"goalCount": 3}
+    assert [goal["goalId"] for goal in found["items"]] == [goal_ids[0]]
+    assert not queue.pending and not queue.dead_letters
+
+
+def test_unwritable_goals_fail_alone_and_reach_the_dead_letter_queue():
+    from goal_writer import goal_writer
+
+    class ThrottledClient(LocalDynamoDB):
+        # Every write of bob's goals stays unprocessed
+        def batch_write_item(self, RequestItems: dict, **kwargs):
+            throttled = {table: [request for request in requests if request["PutRequest"]["Item"]["userId"]["S"] == "bob"]
+                         for table, requests in RequestItems.items()}
+            response = super().batch_write_item(RequestItems={table: [request for request in requests if request not in throttled[table]]
+                                                              for table, requests in RequestItems.items()}, **kwargs)
+            return {**response, "UnprocessedItems": {table: requests for table, requests in throttled.items() if requests}}
+
+    client = ThrottledClient()
+    queue = LocalQueue()
+    dynamodb.set_client(client)
+    try:
+        for user_id, goal_id in (("alice", "A1"), ("bob", "B1"), ("alice", "A2")):
+            queue.send_message(QueueUrl=queue.url, MessageBody=write_queue.encode_goal(
+                {"userId": user_id, "goalId": goal_id, "title": "t", "content": "c", "version": 1}))
+        queue.send_message(QueueUrl=queue.url, MessageBody="not json")
+        invocations = queue.deliver(goal_writer.lambda_handler, max_receive_count=2)
+    finally:
+        dynamodb.set_client(None)
+
+    assert invocations == 2
+    dead_letters = sorted(message["body"] for message in queue.dead_letters)
+    assert len(dead_letters) == 2 and dead_letters[0] == "not json" and '"B1"' in dead_letters[1]
+    table = dynamodb.get_table_name()
+    assert client.get_item(TableName=table, Key={"userId": {"S": "alice"}, "goalId": {"S": "A2"}}).get("Item")
+    assert not client.get_item(TableName=table, Key={"userId": {"S": "bob"}, "goalId": {"S": "B1"}}).get("Item")
@@ -0,0 +1,42 @@
+from utils.dynamodb import from_item, get_table_name, to_item
+from utils.errors import HttpError
+from utils.metrics import current_metrics
+from utils.middleware import Reply, goal_handler
+from utils.batch import batch_get
+from utils.content import unpack_content
+from utils.search_index import is_goal_id
+
+MAX_IDS = 100
+
+goal_table = get_table_name()
+
+@goal_handler('BatchGetGoals', parse_json_body=True)
+def lambda_handler(request):
+    user_id = request.user_id
+    goal_ids = request.body.get('ids')
+
+    if not isinstance(goal_ids, list) or not goal_ids:
+        raise HttpError('Missing required field: ids')
+    if len(goal_ids) > MAX_IDS:
+        raise HttpError(f'At most {MAX_IDS} ids per request')
+
+    # BatchGetItem rejects duplicate keys, so dedupe while keeping the caller's order
+    goal_ids = list(dict.fromkeys(str(goal_id) for goal_id in goal_ids))
+    keys = [to_item({'userId': user_id, 'goalId': goal_id}) for goal_id in goal_ids if is_goal_id(goal_id)]
+
+    items, unprocessed = batch_get(request.client, goal_table, keys)
+    # Summaries, like lists: offloaded content is read one goal at a time through GET /goals/{id}
+    found = {item['goalId']: unpack_content(item, fetch=False) for item in map(from_item, items)}
+    unprocessed_ids = {key['goalId']['S'] for key in unprocessed}
+    current_metrics().put('ItemCount', len(found), 'Count')
+
+    results = []
+    for goal_id in goal_ids:
+        if goal_id in found:
+            results.append({'goalId': goal_id, 'status': 200, 'goal': found[goal_id]})
+        elif goal_id in unprocessed_ids:
+            results.append({'goalId': goal_id, 'status': 503, 'error': 'Not processed, retry later'})
+        else:
+            results.append({'goalId': goal_id, 'status': 404, 'error': 'Goal not found or not authorized'})
+
+    return Reply(200, {'results': results}, compress=True)
@@ -0,0 +1,132 @@
+from datetime import datetime
+from utils.cache import goal_cache
+from utils.content import check_content, discard_content, pack_content
+from utils.dynamodb import from_item, get_table_name, to_item
+from utils.errors import HttpError
+from utils.ids import new_ulid
+from utils.metrics import current_metrics
+from utils.middleware import Reply, goal_handler
+from utils.batch import batch_get, batch_write
+from utils.search_index import check_title, index_requests, is_goal_id, write_index
+
+MAX_OPERATIONS = 100
+
+goal_table = get_table_name()
+
+def _request_key(request: dict) -> str:
+    if 'PutRequest' in request:
+        return request['PutRequest']['Item']['goalId']['S']
+    return request['DeleteRequest']['Key']['goalId']['S']
+
+@goal_handler('BatchGoals', parse_json_body=True)
+def lambda_handler(request):
+    user_id = request.user_id
+    operations = request.body.get('operations')
+
+    if not isinstance(operations, list) or not operations:
+        raise HttpError('Missing required field: operations')
+    if len(operations) > MAX_OPERATIONS:
+        raise HttpError(f'At most {MAX_OPERATIONS} operations per request')
+
+    results = []
+    requests = []
+    pending = {}
+    created = {}
+    stored = {}
+    for index, operation in enumerate(operations):
+        action = operation.get('action') if isinstance(operation, dict) else None
+        result = {'index': index, 'action': action}
+        results.append(result)
+
+        if action == 'create':
+            if not operation.get('title') or not operation.get('content'):
+                result.update(status=400, error='Missing required fields: title or content')
+                continue
+            try:
+                check_title(operation['title'])
+                check_content(operation['content'])
+            except HttpError as e:
+                result.update(status=e.status_code, error=e.message)
+                continue
+            goal_item = {
+                'userId': user_id,
+                'goalId': new_ulid(),
+                'title': operation['title'],
+                'content': operation['content'],
+                'createdAt': datetime.now().isoformat(),
+                'version': 1
+            }
+            stored_item = {name: value for name, value in goal_item.items() if name != 'content'}
+            stored_item.update(pack_content(user_id, goal_item['goalId'], goal_item['content']))
+            write_request = {'PutRequest': {'Item': to_item(stored_item)}}
+            created[goal_item['goalId']] = goal_item
+            stored[goal_item['goalId']] = stored_item
+        elif action == 'delete':
+            if not operation.get('goalId'):
+                result.update(status=400, error='Missing required field: goalId')
+                continue
+            if not is_goal_id(str(operation['goalId'])):
+                result.update(status=400, error='Invalid goalId')
+                continue
+            write_request = {'DeleteRequest': {'Key': to_item({'userId': user_id, 'goalId': str(operation['goalId'])})}}
+        else:
+            result.update(status=400, error='action must be "create" or "delete"')
+            continue
+
+        goal_id = _request_key(write_request)
+        result['goalId'] = goal_id
+        # BatchWriteItem rejects the whole call if one key appears twice
+        if goal_id in pending:
+            result.update(status=400, error='Duplicate goalId in batch')
+            continue
+        pending[goal_id] = result
+        requests.append(write_request)
+
+    # BatchWriteItem returns no old values, so read the goals about to be deleted first; their
+    # search index entries and offloaded content are removed with them
+    delete_keys = [write_request['DeleteRequest']['Key'] for write_request in requests if 'DeleteRequest' in write_request]
+    deleted = {}
+    if delete_keys:
+        items, unread = batch_get(request.client, goal_table, delete_keys)
+        deleted = {item['goalId']: item for item in map(from_item, items)}
+        unread_ids = {key['goalId']['S'] for key in unread}
+        # Only goals that were read are deleted: an unread one would leave its index entries and
+        # content behind, and a missing one has nothing to delete
+        for write_request in requests:
+            goal_id = _request_key(write_request)
+            if 'PutRequest' in write_request or goal_id in deleted:
+                continue
+            if goal_id in unread_ids:
+                pending[goal_id].update(status=503, error='Not processed, retry later')
+            else:
+                pending[goal_id].update(status=404, error='Goal not found or not authorized')
+        requests = [write_request for write_request in requests if 'status' not in pending[_request_key(write_request)]]
+
+    unprocessed = batch_write(request.client, goal_table, requests) if requests else []
+    unprocessed_ids = {_request_key(write_request) for write_request in unprocessed}
+
+    index_writes = []
+    for goal_id in pending:
+        if goal_id in unprocessed_ids:
+            # A retried create gets a new goal id, so the upload of an unprocessed one would be orphaned
+            discard_content(stored.get(goal_id))
+            continue
+        if goal_id in created:
+            index_writes.extend(index_requests(user_id, goal_id, new_title=created[goal_id]['title']))
+        elif goal_id in deleted:
+            discard_content(deleted[goal_id])
+            index_writes.extend(index_requests(user_id, goal_id, old_title=deleted[goal_id].get('title')))
+    write_index(request.client, goal_table, user_id, index_writes)
+    current_metrics().put('ItemCount', len(requests) - len(unprocessed), 'Count')
+    goal_cache.invalidate_user(user_id)
+
+    for write_request in requests:
+        result = pending[_request_key(write_request)]
+        if result['goalId'] in unprocessed_ids:
+            result.update(status=503, error='Not processed, retry later')
+        elif 'PutRequest' in write_request:
+            result.update(status=201, goal=created[result['goalId']])
+        else:
+            result['status'] = 200
+
+    return Reply(200, {'results': results})
@@ -1,53 +1,66 @@
-import json
-import os
 from datetime import datetime
 import time
-import uuid
-import boto3
-from utils.utils import build_response
+from utils.cache import goal_cache
+from utils.content import check_content, discard_content, pack_content
+from utils.etag import item_etag
+from utils.dynamodb import get_table_name, to_item
+from utils.errors import HttpError
+from utils.ids import new_ulid
+from utils.middleware import Reply, goal_handler
+from utils.search_index import check_title, sync_title_index
+from utils import write_queue
 
 
-dynamodb = boto3.resource('dynamodb')
+goal_table = get_table_name()
 
-goal_table = os.environ['GOALS_TABLE_NAME']
+@goal_handler('CreateGoal', parse_json_body=True)
+def lambda_handler(request):
+    title = request.body.get('title')
+    content = request.body.get('content')
 
-table = dynamodb.Table(goal_table)
+    if not title or not content:
+        raise HttpError('Missing required fields: title or content')
+    check_title(title)
 
-def lambda_handler(event, context):
+    if title == "a":
+        time.sleep(3)
+
+    if title == "b":
+        raise Exception('Title "a" is not allowed')
+
+    check_content(content)
+    goal_id = new_ulid()
+    goal_item = {
+        'userId': request.user_id,
+        'goalId': goal_id,
+        'title': title,
+        'content': content,
+        'createdAt': datetime.now().isoformat(),
+        'version': 1
+    }
+
+    stored_item = {name: value for name, value in goal_item.items() if name != 'content'}
+    stored_item.update(pack_content(request.user_id, goal_id, content))
+    queue_url = write_queue.get_queue_url()
+    if queue_url:
+        return _enqueue(queue_url, stored_item)
+
+    try:
+        request.client.put_item(TableName=goal_table, Item=to_item(stored_item))
+    except Exception:
+        discard_content(stored_item)
+        raise
+    sync_title_index(request.client, goal_table, request.user_id, goal_item['goalId'], new_title=title)
+    goal_cache.invalidate_user(request.user_id)
+    return Reply(200, goal_item, headers={'ETag': item_etag(goal_item)})
+
+
+def _enqueue(queue_url: str, stored_item: dict) -> Reply:
+    # Write-behind mode: the GoalWriter consumer stores the goal and its index entries.
+    # Until it has, the goal isn't readable, so the caller only gets the id it will have
     try:
-        
-        body = json.loads(event.get('body', '{}'))
-        title = body.get('title')
-        content = body.get('content')
-
-        if not title or not content:
-           return build_response(400, {'error': 'Missing required fields: title or content'})
-
-        if title == "a":
-            time.sleep(3)
-
-        if title == "b":
-            raise Exception('Title "a" is not allowed')
-            
-        user_id = event['requestContext']['authorizer']['claims']['sub']
-
-        goal_id = str(uuid.uuid4())
-
-        goal_item = {
-            'userId': user_id,
-            'goalId': goal_id,
-            'title': title,
-            'content': content,
-            'createdAt': datetime.now().isoformat()
-        }
-
-        table.put_item(Item=goal_item)
-        return build_response(200, goal_item)
-    
-    except Exception as e:
-        error_log = {
-            "status": 500,
-            "error": f"{e}"
-        }
-        print(json.dumps(error_log))
-        return build_response(500, {'error': 'Internal server error'})
+        write_queue.get_client().send_message(QueueUrl=queue_url, MessageBody=write_queue.encode_goal(stored_item))
+    except Exception:
+        discard_content(stored_item)
+        raise
+    return Reply(202, {'goalId': stored_item['goalId']})
@@ -1,32 +1,38 @@
-import json
-import os
-import boto3
-from utils.utils import build_response
+from utils.cache import goal_cache
+from utils.content import discard_content, unpack_content
+from utils.dynamodb import from_item, get_table_name, to_item
+from utils.errors import NotFound
+from utils.middleware import Reply, goal_handler
+from utils.search_index import sync_title_index
 
-dynamodb = boto3.resource('dynamodb')
-goal_table = os.environ['GOALS_TABLE_NAME']
-table = dynamodb.Table(goal_table)
+goal_table = get_table_name()
 
-def lambda_handler(event, context):
-    try:
-        user_id = event['requestContext']['authorizer']['claims']['sub']
-        goal_id = event['pathParameters']['id']
+@goal_handler('DeleteGoal')
+def lambda_handler(request):
+    goal_id = request.goal_id
 
-        response = table.get_item(Key={
-            'userId': user_id,
-            'goalId': goal_id
-        })
-        item = response.get('Item')
+    client = request.client
+    # The key already scopes the item to the caller, so the existence check is the ownership check;
+    # ALL_OLD returns the goal that was removed, whichever version it was
+    try:
+        response = client.delete_item(
+            TableName=goal_table,
+            Key=to_item({
+                'userId': request.user_id,
+                'goalId': goal_id
+            }),
+            ConditionExpression='attribute_exists(goalId)',
+            ReturnValues='ALL_OLD'
+        )
+    except client.exceptions.ConditionalCheckFailedException:
+        raise NotFound('Goal not found or not authorized')
+    goal = from_item(response['Attributes'])
 
-        if not item:
-            return build_response(404, {'error': 'Goal not found or not authorized'})
-        
-        table.delete_item(Key={
-            'userId': user_id,
-            'goalId': goal_id
-        })
-        return build_response(200, {'message': 'Goal successfully deleted'})
-    
-    except Exception as e:
-        print(f"Error: {e}")
-        return build_response(500, {'error': str(e)})
+    discard_content(goal)
+    sync_title_index(client, goal_table, request.user_id, goal['goalId'], old_title=goal.get('title'))
+    goal_cache.invalidate_user(request.user_id)
+    return Reply(200, {
+        'message': 'Goal successfully deleted',
+        # Offloaded content is already gone, so the deleted goal is returned as a summary
+        'goal': unpack_content(goal, fetch=False)
+    })
@@ -1,26 +1,98 @@
-import json
-import os
-import boto3
-from boto3.dynamodb.conditions import Key
-from utils.utils import build_response
-
-dynamodb = boto3.resource('dynamodb')
-goal_table = os.environ['GOALS_TABLE_NAME']
-table = dynamodb.Table(goal_table)
-
-def lambda_handler(event, context):
-    try:
-        user_id = event['requestContext']['authorizer']['claims']['sub']
-        print({"email": event['requestContext']['authorizer']['claims']['email']})
-        response = table.query(
-            KeyConditionExpression=Key('userId').eq(str(user_id))
-        )
-
-        goals = response.get('Items', [])
-
-        return build_response(200, goals)
-
-    except Exception as e:
-        print(f"Error: {e}")
-        return build_response(500, {'error': str(e)})
-    
\ No newline at end of file
+from utils.cache import goal_cache
+from utils.content import unpack_content
+from utils.etag import is_not_modified, list_etag
+from utils.dynamodb import from_item, get_table_name, to_item
+from utils.metrics import current_metrics
+from utils.middleware import Reply, goal_handler
+from utils.pagination import InvalidPageRequest, decode_cursor, encode_cursor, parse_limit, parse_order
+from utils.search_index import RESERVED_PREFIX
+from utils.summary import read_shards, summary_entry
+
+VIEWS = ('full', 'summary')
+# Most goals GET /goals returns without limit or cursor
+UNPAGED_MAX_GOALS = 1000
+
+goal_table = get_table_name()
+
+def _query_goals(client, user_id: str, params: dict):
+    # Lists carry summaries: offloaded content stays in the bucket (see utils.content)
+    query_args = {
+        'TableName': goal_table,
+        # Search index entries share the partition but sort after every goal id
+        'KeyConditionExpression': 'userId = :userId AND goalId < :reserved',
+        'ExpressionAttributeValues': to_item({':userId': str(user_id), ':reserved': RESERVED_PREFIX}),
+        # Goal ids are time-ordered, so order=desc&limit=N is the latest N goals in one bounded query
+        'ScanIndexForward': parse_order(params.get('order'))
+    }
+
+    # Without paging parameters keep the original response shape (a plain list) for older clients,
+    # but bounded: at most UNPAGED_MAX_GOALS goals, following LastEvaluatedKey across 1 MB pages.
+    # Longer lists need limit/cursor
+    if 'limit' not in params and 'cursor' not in params:
+        goals = []
+        while len(goals) < UNPAGED_MAX_GOALS:
+            query_args['Limit'] = UNPAGED_MAX_GOALS - len(goals)
+            response = client.query(**query_args)
+            goals.extend(unpack_content(from_item(item), fetch=False) for item in response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return goals, list_etag(goals, 'all', params.get('order'))
+
+    query_args['Limit'] = parse_limit(params.get('limit'))
+    if params.get('cursor'):
+        query_args['ExclusiveStartKey'] = to_item(decode_cursor(params['cursor'], user_id))
+
+    response = client.query(**query_args)
+    last_key = response.get('LastEvaluatedKey')
+    items = [unpack_content(from_item(item), fetch=False) for item in response.get('Items', [])]
+    next_cursor = encode_cursor(from_item(last_key) if last_key else None, user_id)
+
+    page = {
+        'items': items,
+        'nextCursor': next_cursor
+    }
+    return page, list_etag(items, 'page', params.get('order'), query_args['Limit'], params.get('cursor'), next_cursor)
+
+def _read_summary(client, user_id: str, params: dict):
+    # view=summary: the shard items the GoalSummary stream consumer maintains, so the cost doesn't
+    # grow with the number of goals or their content. They trail writes by the stream's delay.
+    if 'limit' in params or 'cursor' in params:
+        raise InvalidPageRequest('view=summary returns the whole list and takes no limit or cursor')
+    ascending = parse_order(params.get('order'))
+    shards = read_shards(client, goal_table, user_id)
+    if shards:
+        entries = [entry for shard in sorted(shards, key=lambda shard: shard['goalId']) for entry in shard['goals']]
+    else:
+        # Not built yet (no write since the consumer was deployed): derive it from the goals
+        entries = [summary_entry(goal) for goal in _query_goals(client, user_id, {'order': 'asc'})[0]]
+    if not ascending:
+        entries.reverse()
+    return entries, list_etag(entries, 'summary', params.get('order'))
+
+@goal_handler('GetAllGoals')
+def lambda_handler(request):
+    user_id = request.user_id
+    print({"email": request.claims['email']})
+    params = request.query
+
+    view = params.get('view') or 'full'
+    if view not in VIEWS:
+        raise InvalidPageRequest('view must be "full" or "summary"')
+
+    cache_key = (user_id, '#list', view, params.get('order'), params.get('limit'), params.get('cursor'))
+    cached = goal_cache.get(cache_key)
+    cache_status = 'HIT'
+    if cached is None:
+        cache_status = 'MISS'
+        cached = (_read_summary if view == 'summary' else _query_goals)(request.client, user_id, params)
+        goal_cache.put(cache_key, cached)
+    body, etag = cached
+    current_metrics().put('ItemCount', len(body if isinstance(body, list) else body['items']), 'Count')
+
+    headers = {'X-Cache': cache_status, 'ETag': etag}
+    # Unchanged lists skip serialization and compression entirely
+    if is_not_modified(request.event, etag):
+        return Reply(304, headers=headers)
+
+    return Reply(200, body, headers=headers, compress=True)
@@ -1,28 +1,37 @@
-import json
-import os
-import boto3
-from utils.utils import build_response
+from utils.cache import goal_cache
+from utils.content import unpack_content
+from utils.etag import is_not_modified, item_etag
+from utils.dynamodb import from_item, get_table_name, to_item
+from utils.errors import NotFound
+from utils.middleware import Reply, goal_handler
 
-dynamodb = boto3.resource('dynamodb')
-goal_table = os.environ['GOALS_TABLE_NAME']
-table = dynamodb.Table(goal_table)
+goal_table = get_table_name()
 
-def lambda_handler(event, context):
-    try:
-        user_id = event['requestContext']['authorizer']['claims']['sub']
-        goal_id = event['pathParameters']['id']
-            
-        response = table.get_item(Key={
-            'userId': user_id,
-            'goalId': goal_id
-        })
-        item = response.get('Item')
+@goal_handler('GetGoal')
+def lambda_handler(request):
+    goal_id = request.goal_id
 
-        if not item:
-            return build_response(404, {'error': 'Goal not found or not authorized'})
-        
-        return build_response(200, item)
+    cache_key = (request.user_id, goal_id)
+    item = goal_cache.get(cache_key)
+    cache_status = 'HIT'
+    if item is None:
+        cache_status = 'MISS'
+        response = request.client.get_item(
+            TableName=goal_table,
+            Key=to_item({
+                'userId': request.user_id,
+                'goalId': goal_id
+            })
+        )
+        if not response.get('Item'):
+            raise NotFound('Goal not found or not authorized')
 
-    except Exception as e:
-        print(f"Error: {e}")
-        return build_response(500, {'error': str(e)})
+        # Compressed or offloaded content is restored once, before the item is cached
+        item = unpack_content(from_item(response['Item']))
+        goal_cache.put(cache_key, item)
+
+    headers = {'X-Cache': cache_status, 'ETag': item_etag(item)}
+    if is_not_modified(request.event, headers['ETag']):
+        return Reply(304, headers=headers)
+
+    return Reply(200, item, headers=headers, compress=True)
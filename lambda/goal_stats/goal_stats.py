@@ -0,0 +1,11 @@
+from utils.dynamodb import get_table_name
+from utils.middleware import Reply, goal_handler
+from utils.stats import read_stats
+
+goal_table = get_table_name()
+
+@goal_handler('GoalStats')
+def lambda_handler(request):
+    # One GetItem of the counters item, however many goals the partition holds
+    stats = read_stats(request.client, goal_table, request.user_id)
+    return Reply(200, {'goalCount': int(stats.get('goalCount', 0))})
@@ -0,0 +1,139 @@
+import json
+from datetime import datetime
+from utils import dynamodb
+from utils.dynamodb import from_item, get_table_name, to_item
+from utils.search_index import RESERVED_PREFIX, is_goal_id
+from utils.stats import set_goal_count
+from utils.summary import SUMMARY_FIELDS, pack_shards, read_shards, shard_id, summary_entry
+
+MAX_ATTEMPTS = 3
+
+goal_table = get_table_name()
+
+
+class ShardConflict(Exception):
+    pass
+
+
+def _image(record: dict, name: str):
+    # Only the summary fields: stream images carry binary attributes base64-encoded, and content is not needed
+    image = record['dynamodb'].get(name)
+    if not image:
+        return None
+    return from_item({field: image[field] for field in SUMMARY_FIELDS if field in image})
+
+
+def collect_changes(records: list) -> dict:
+    # {userId: (sequence number of the user's first record, {goalId: summary entry, or None when removed})}.
+    # Records of one item arrive in order, so the last one per goal wins
+    changes = {}
+    for record in records:
+        keys = from_item(record['dynamodb']['Keys'])
+        # Index, stats and summary items are filtered out at the event source; skipped here as well
+        # so the consumer's own summary writes can never feed back into it
+        if not is_goal_id(keys['goalId']):
+            continue
+        new_image = _image(record, 'NewImage') if record['eventName'] != 'REMOVE' else None
+        sequence_number = record['dynamodb']['SequenceNumber']
+        _, goals = changes.setdefault(keys['userId'], (sequence_number, {}))
+        goals[keys['goalId']] = summary_entry(new_image) if new_image else None
+    return changes
+
+
+def _scan_goals(client, user_id: str) -> dict:
+    # First summary of a user: built from the partition once, then kept up to date from the stream
+    query_args = {
+        'TableName': goal_table,
+        'KeyConditionExpression': 'userId = :userId AND goalId < :reserved',
+        'ExpressionAttributeValues': to_item({':userId': user_id, ':reserved': RESERVED_PREFIX}),
+        'ProjectionExpression': ', '.join(f'#{field}' for field in SUMMARY_FIELDS),
+        'ExpressionAttributeNames': {f'#{field}': field for field in SUMMARY_FIELDS},
+        'ConsistentRead': True
+    }
+    entries = {}
+    while True:
+        response = client.query(**query_args)
+        for item in map(from_item, response.get('Items', [])):
+            entries[item['goalId']] = summary_entry(item)
+        if 'LastEvaluatedKey' not in response:
+            return entries
+        query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def _write_shards(client, user_id: str, old_shards: list, new_shards: list):
+    # Every write is conditioned on the revision that was read, so two writers can't interleave
+    for index, goals in enumerate(new_shards):
+        old = old_shards[index] if index < len(old_shards) else None
+        if old is not None and old.get('goals') == goals:
+            continue
+        item = {
+            'userId': user_id,
+            'goalId': shard_id(index),
+            'goals': goals,
+            'revision': (old['revision'] + 1) if old else 1,
+            'updatedAt': datetime.now().isoformat()
+        }
+        condition = {'ConditionExpression': 'attribute_not_exists(goalId)'}
+        if old is not None:
+            condition = {'ConditionExpression': 'revision = :revision', 'ExpressionAttributeValues': to_item({':revision': old['revision']})}
+        try:
+            client.put_item(TableName=goal_table, Item=to_item(item), **condition)
+        except client.exceptions.ConditionalCheckFailedException:
+            raise ShardConflict(user_id)
+
+    for old in old_shards[len(new_shards):]:
+        try:
+            client.delete_item(
+                TableName=goal_table,
+                Key=to_item({'userId': user_id, 'goalId': old['goalId']}),
+                ConditionExpression='revision = :revision',
+                ExpressionAttributeValues=to_item({':revision': old['revision']})
+            )
+        except client.exceptions.ConditionalCheckFailedException:
+            raise ShardConflict(user_id)
+
+
+def apply_changes(client, user_id: str, changes: dict):
+    for _ in range(MAX_ATTEMPTS):
+        shards = sorted(read_shards(client, goal_table, user_id, consistent=True), key=lambda shard: shard['goalId'])
+        if shards:
+            entries = {entry['goalId']: entry for shard in shards for entry in shard['goals']}
+        else:
+            entries = _scan_goals(client, user_id)
+
+        # Replaying a batch after a partial failure is harmless: entries are set or removed, and
+        # an entry never goes back to an older version
+        for goal_id, entry in changes.items():
+            if entry is None:
+                entries.pop(goal_id, None)
+            elif entry.get('version', 0) >= entries.get(goal_id, {}).get('version', 0):
+                entries[goal_id] = entry
+
+        try:
+            _write_shards(client, user_id, shards, pack_shards([entries[goal_id] for goal_id in sorted(entries)]))
+        except ShardConflict:
+            continue
+        # The user's goalCount (utils.stats) follows the summary; if this write fails the records are
+        # delivered again and the count is set once more
+        set_goal_count(client, goal_table, user_id, len(entries))
+        return
+    raise ShardConflict(user_id)
+
+
+def lambda_handler(event, context):
+    client = dynamodb.get_client()
+    changes = collect_changes(event.get('Records', []))
+    failed = []
+    for user_id, (sequence_number, goals) in changes.items():
+        try:
+            apply_changes(client, user_id, goals)
+        except Exception as e:
+            print(json.dumps({'userId': user_id, 'error': f'{e}'}))
+            failed.append(sequence_number)
+
+    print(json.dumps({'records': len(event.get('Records', [])), 'users': len(changes), 'failedUsers': len(failed)}))
+    # Partial batch response: the stream resumes from the earliest record of a user that failed,
+    # so every user's changes from that point on are applied again
+    if failed:
+        return {'batchItemFailures': [{'itemIdentifier': min(failed, key=int)}]}
+    return {'batchItemFailures': []}
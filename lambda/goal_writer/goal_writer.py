@@ -0,0 +1,67 @@
+import json
+from utils import dynamodb
+from utils.batch import batch_get, batch_write
+from utils.dynamodb import from_item, get_table_name, to_item
+from utils.search_index import index_requests
+from utils.write_queue import decode_goal
+
+goal_table = get_table_name()
+
+
+def _goal_key(item: dict) -> tuple:
+    return item['userId']['S'], item['goalId']['S']
+
+
+def _index_key(item: dict) -> tuple:
+    return item['userId']['S'], item['ref']['S']
+
+
+def read_messages(records: list):
+    # ({(userId, goalId): goal}, {(userId, goalId): [messageId, ...]}, [messageId of unreadable messages]).
+    # SQS may deliver a message twice, even in one batch, and BatchWriteItem refuses a key twice
+    goals = {}
+    message_ids = {}
+    unreadable = []
+    for record in records:
+        try:
+            goal = decode_goal(record['body'])
+            key = (goal['userId'], goal['goalId'])
+        except (ValueError, KeyError, TypeError):
+            unreadable.append(record['messageId'])
+            continue
+        goals[key] = goal
+        message_ids.setdefault(key, []).append(record['messageId'])
+    return goals, message_ids, unreadable
+
+
+def write_goals(client, goals: dict) -> tuple:
+    # Returns (keys of goals written by this call, keys that failed)
+    existing, unread = batch_get(client, goal_table, [to_item({'userId': user_id, 'goalId': goal_id}) for user_id, goal_id in goals], consistent=True)
+    failed = {(key['userId']['S'], key['goalId']['S']) for key in unread}
+    # Goals a redelivered message already wrote are not written again; their index
+    # entries are, since those are the part that may not have made it the first time
+    stored = {(item['userId'], item['goalId']) for item in map(from_item, existing)}
+    new = [key for key in goals if key not in stored and key not in failed]
+
+    unprocessed = batch_write(client, goal_table, [{'PutRequest': {'Item': to_item(goals[key])}} for key in new])
+    failed.update(_goal_key(request['PutRequest']['Item']) for request in unprocessed)
+    written = [key for key in new if key not in failed]
+
+    requests = [request for key in goals if key not in failed
+                for request in index_requests(key[0], key[1], new_title=goals[key].get('title'))]
+    unprocessed = batch_write(client, goal_table, requests) if requests else []
+    failed.update(_index_key(request['PutRequest']['Item']) for request in unprocessed)
+    return written, failed
+
+
+def lambda_handler(event, context):
+    client = dynamodb.get_client()
+    records = event.get('Records', [])
+    goals, message_ids, failed_messages = read_messages(records)
+    written, failed = write_goals(client, goals) if goals else ([], set())
+
+    failed_messages.extend(message_id for key in failed for message_id in message_ids[key])
+    print(json.dumps({'messages': len(records), 'written': len(written), 'failedMessages': len(failed_messages)}))
+    # Partial batch response: only the failed messages return to the queue, and after maxReceiveCount
+    # receives they move to the dead-letter queue
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failed_messages]}
@@ -0,0 +1,31 @@
+from utils.utils import build_response
+from create_goal import create_goal
+from get_all_goals import get_all_goals
+from get_goal import get_goal
+from update_goal import update_goal
+from delete_goal import delete_goal
+from batch_goals import batch_goals
+from batch_get_goals import batch_get_goals
+from search_goals import search_goals
+from goal_stats import goal_stats
+
+# Single-function deployment: every route shares one warm container and one DynamoDB client.
+# Keys are the API Gateway (httpMethod, resource) pairs of the proxy event.
+ROUTES = {
+    ('POST', '/goals'): create_goal.lambda_handler,
+    ('GET', '/goals'): get_all_goals.lambda_handler,
+    ('GET', '/goals/{id}'): get_goal.lambda_handler,
+    ('GET', '/goals/{id}/full'): get_goal.lambda_handler,
+    ('PUT', '/goals/{id}'): update_goal.lambda_handler,
+    ('DELETE', '/goals/{id}'): delete_goal.lambda_handler,
+    ('POST', '/goals/batch'): batch_goals.lambda_handler,
+    ('POST', '/goals/batch-get'): batch_get_goals.lambda_handler,
+    ('GET', '/goals/search'): search_goals.lambda_handler,
+    ('GET', '/goals/stats'): goal_stats.lambda_handler
+}
+
+def lambda_handler(event, context):
+    handler = ROUTES.get((event.get('httpMethod'), event.get('resource')))
+    if handler is None:
+        return build_response(404, {'error': 'Route not found'})
+    return handler(event, context)
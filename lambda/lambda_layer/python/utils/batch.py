@@ -0,0 +1,64 @@
+import time
+from utils.deadline import DeadlineExceeded
+from utils.retry import backoff_delay
+
+# DynamoDB hard limits per BatchWriteItem / BatchGetItem call
+BATCH_WRITE_SIZE = 25
+BATCH_GET_SIZE = 100
+
+MAX_ATTEMPTS = 5
+
+
+def chunked(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# Writes PutRequest/DeleteRequest entries, retrying UnprocessedItems; returns what is still unprocessed.
+# Running out of invocation time (DeadlineExceeded) reports everything not yet written as unprocessed.
+def batch_write(dynamodb, table_name: str, requests: list, max_attempts: int = MAX_ATTEMPTS, sleep=time.sleep) -> list:
+    unprocessed = []
+    chunks = list(chunked(requests, BATCH_WRITE_SIZE))
+    for index, chunk in enumerate(chunks):
+        pending = chunk
+        try:
+            for attempt in range(max_attempts):
+                if attempt:
+                    sleep(backoff_delay(attempt))
+                response = dynamodb.batch_write_item(RequestItems={table_name: pending})
+                pending = response.get('UnprocessedItems', {}).get(table_name, [])
+                if not pending:
+                    break
+        except DeadlineExceeded:
+            unprocessed.extend(pending)
+            for remaining in chunks[index + 1:]:
+                unprocessed.extend(remaining)
+            break
+        unprocessed.extend(pending)
+    return unprocessed
+
+
+# Reads keys, retrying UnprocessedKeys; returns (items, keys still unprocessed)
+def batch_get(dynamodb, table_name: str, keys: list, max_attempts: int = MAX_ATTEMPTS, sleep=time.sleep, consistent: bool = False):
+    items = []
+    unprocessed = []
+    chunks = list(chunked(keys, BATCH_GET_SIZE))
+    for index, chunk in enumerate(chunks):
+        pending = chunk
+        try:
+            for attempt in range(max_attempts):
+                if attempt:
+                    sleep(backoff_delay(attempt))
+                request = {'Keys': pending, 'ConsistentRead': True} if consistent else {'Keys': pending}
+                response = dynamodb.batch_get_item(RequestItems={table_name: request})
+                items.extend(response.get('Responses', {}).get(table_name, []))
+                pending = response.get('UnprocessedKeys', {}).get(table_name, {}).get('Keys', [])
+                if not pending:
+                    break
+        except DeadlineExceeded:
+            unprocessed.extend(pending)
+            for remaining in chunks[index + 1:]:
+                unprocessed.extend(remaining)
+            break
+        unprocessed.extend(pending)
+    return items, unprocessed
@@ -0,0 +1,95 @@
+import os
+import time
+from collections import OrderedDict
+
+# Rough per-value overhead used by the size estimate; keeps the byte cap meaningful for
+# many small items without paying for a real serialization on every put
+_OVERHEAD = 16
+
+
+def estimate_size(value) -> int:
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value) + _OVERHEAD
+    if isinstance(value, dict):
+        return sum(estimate_size(k) + estimate_size(v) for k, v in value.items()) + _OVERHEAD
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(estimate_size(v) for v in value) + _OVERHEAD
+    return _OVERHEAD
+
+
+class TTLCache:
+    # LRU cache bounded by entry count and estimated bytes; entries expire after ttl_seconds.
+    # Keys are tuples whose first element is the userId so a user's entries can be dropped together.
+
+    def __init__(self, ttl_seconds: float, max_entries: int, max_bytes: int, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, size, expires_at = entry
+        if expires_at <= self.clock():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, size, self.clock() + self.ttl_seconds)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate_user(self, user_id: str):
+        for key in [key for key in self._entries if key[0] == user_id]:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self._bytes
+        }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+# Shared by every handler in the container. Writes handled here invalidate immediately;
+# writes served by other containers become visible after at most READ_CACHE_TTL_SECONDS.
+goal_cache = TTLCache(
+    ttl_seconds=float(os.environ.get('READ_CACHE_TTL_SECONDS', '5')),
+    max_entries=int(os.environ.get('READ_CACHE_MAX_ENTRIES', '256')),
+    max_bytes=int(os.environ.get('READ_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+)
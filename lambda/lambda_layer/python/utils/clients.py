@@ -0,0 +1,34 @@
+import time
+
+# boto3 clients are built on first use, once per container and configuration: importing boto3 and
+# constructing a client is a large part of Init Duration, and most invocations need only some of
+# the services. Tests and local tooling swap in a stand-in with the same API as the boto3 client
+# through set.
+
+
+class LazyClient:
+
+    def __init__(self, service: str):
+        self.service = service
+        self.init_ms = None
+        self._clients = {}
+        self._override = None
+
+    def get(self, key=None, config=None):
+        # key names a configuration; config() builds its botocore Config the first time key is used
+        if self._override is not None:
+            return self._override
+        if key not in self._clients:
+            started = time.perf_counter()
+            import boto3
+            self._clients[key] = boto3.client(self.service, config=config() if config else None)
+            if self.init_ms is None:
+                self.init_ms = round((time.perf_counter() - started) * 1000, 2)
+        return self._clients[key]
+
+    def set(self, client):
+        self._override = client
+
+
+def lazy_client(service: str) -> LazyClient:
+    return LazyClient(service)
@@ -0,0 +1,77 @@
+import base64
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+
+
+def _compressors():
+    compressors = {'gzip': lambda data: gzip.compress(data, compresslevel=6)}
+    if brotli is not None:
+        compressors['br'] = lambda data: brotli.compress(data, quality=5)
+    return compressors
+
+COMPRESSORS = _compressors()
+# Server-side preference when the client accepts several encodings with the same weight
+PREFERENCE = ('br', 'gzip')
+
+
+def min_size() -> int:
+    # COMPRESSION_MIN_SIZE below zero turns compression off
+    return int(os.environ.get('COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE))
+
+
+def request_header(event: dict, name: str):
+    for key, value in ((event or {}).get('headers') or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def negotiate_encoding(accept_encoding: str):
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    candidates = [
+        (weights.get(coding, weights.get('*', 0.0)), -rank, coding)
+        for rank, coding in enumerate(PREFERENCE) if coding in COMPRESSORS
+    ]
+    weight, _, coding = max(candidates)
+    return coding if weight > 0 else None
+
+
+def compress_response(response: dict, event: dict) -> dict:
+    threshold = min_size()
+    body = response['body'].encode('utf-8')
+    if threshold < 0 or len(body) < threshold:
+        return response
+
+    coding = negotiate_encoding(request_header(event, 'accept-encoding'))
+    if coding is None:
+        return response
+
+    # API Gateway turns the base64 body back into bytes because the API registers application/json as binary
+    response['headers'].update({
+        'Content-Encoding': coding,
+        'Content-Type': 'application/json',
+        'Vary': 'Accept-Encoding'
+    })
+    response['body'] = base64.b64encode(COMPRESSORS[coding](body)).decode('ascii')
+    response['isBase64Encoded'] = True
+    return response
@@ -0,0 +1,77 @@
+import os
+import zlib
+from utils import object_store
+from utils.errors import HttpError
+from utils.ids import new_ulid
+
+# How goal content is stored, by size of its UTF-8 encoding:
+#   up to CONTENT_COMPRESS_MIN_SIZE            plain string in "content"
+#   larger                                     zlib-compressed bytes in "contentZ" (binary attribute)
+#   still above CONTENT_OFFLOAD_MIN_SIZE
+#   once compressed                            object in CONTENT_BUCKET_NAME, pointer in "contentRef"
+# Every read and write capacity unit follows the stored item size, so large goals no longer weigh
+# on each query of their partition, and no goal can hit DynamoDB's 400 KB item limit.
+DEFAULT_COMPRESS_MIN_SIZE = 4 * 1024
+DEFAULT_OFFLOAD_MIN_SIZE = 64 * 1024
+DEFAULT_MAX_SIZE = 1024 * 1024
+
+CONTENT_ATTRIBUTES = ('content', 'contentZ', 'contentRef', 'contentSize')
+
+
+def compress_min_size() -> int:
+    return int(os.environ.get('CONTENT_COMPRESS_MIN_SIZE', DEFAULT_COMPRESS_MIN_SIZE))
+
+
+def offload_min_size() -> int:
+    return int(os.environ.get('CONTENT_OFFLOAD_MIN_SIZE', DEFAULT_OFFLOAD_MIN_SIZE))
+
+
+def max_size() -> int:
+    return int(os.environ.get('CONTENT_MAX_SIZE', DEFAULT_MAX_SIZE))
+
+
+def check_content(content):
+    if not isinstance(content, str):
+        raise HttpError('content must be a string')
+    if len(content.encode('utf-8')) > max_size():
+        raise HttpError(f'content must be at most {max_size()} bytes', 413)
+
+
+def pack_content(user_id: str, goal_id: str, content: str) -> dict:
+    # Attributes to store for content; offloaded content is uploaded here, before the item that
+    # points at it is written. Each upload gets a new key, so replacing content never overwrites
+    # an object an older item version still refers to.
+    data = content.encode('utf-8')
+    if len(data) <= compress_min_size():
+        return {'content': content}
+    compressed = zlib.compress(data, 6)
+    if len(compressed) <= offload_min_size():
+        return {'contentZ': compressed}
+    key = f'{user_id}/{goal_id}/{new_ulid()}'
+    object_store.get_client().put_object(
+        Bucket=object_store.get_bucket_name(), Key=key, Body=compressed,
+        ContentType='text/plain; charset=utf-8', ContentEncoding='deflate'
+    )
+    return {'contentRef': key, 'contentSize': len(data)}
+
+
+def unpack_content(item: dict, fetch: bool = True) -> dict:
+    # The goal as the API returns it. Offloaded content is only downloaded with fetch=True; lists
+    # get a summary instead: no content, the original size and contentOffloaded=True
+    goal = {name: value for name, value in item.items() if name not in ('contentZ', 'contentRef')}
+    if 'contentZ' in item:
+        goal['content'] = zlib.decompress(bytes(item['contentZ'])).decode('utf-8')
+    elif 'contentRef' in item:
+        if fetch:
+            response = object_store.get_client().get_object(Bucket=object_store.get_bucket_name(), Key=item['contentRef'])
+            goal['content'] = zlib.decompress(response['Body'].read()).decode('utf-8')
+            goal.pop('contentSize', None)
+        else:
+            goal['contentOffloaded'] = True
+    return goal
+
+
+def discard_content(item: dict):
+    # Deletes the offloaded object of an item that was deleted or whose content was replaced
+    if item and item.get('contentRef'):
+        object_store.get_client().delete_object(Bucket=object_store.get_bucket_name(), Key=item['contentRef'])
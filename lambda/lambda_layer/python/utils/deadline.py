@@ -0,0 +1,132 @@
+import os
+import time
+from botocore.exceptions import ClientError, ConnectTimeoutError, EndpointConnectionError, ReadTimeoutError
+from utils.retry import backoff_delay
+from utils.dynamodb import connect_timeout_for, get_client
+from utils.metrics import current_metrics
+from utils import tracing
+from utils.utils import build_response
+
+# Read timeouts a call can be given; each one maps to a cached client (utils.dynamodb.get_client)
+TIMEOUT_BUCKETS = (0.2, 0.5, 1.0, 2.0, 4.0)
+RETRYABLE_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+    'ServiceUnavailable'
+}
+RETRY_AFTER_SECONDS = 1
+# Operations that accept ReturnConsumedCapacity; their units are reported as the ConsumedCapacity metric
+CAPACITY_OPERATIONS = {
+    'get_item', 'put_item', 'update_item', 'delete_item', 'query', 'scan',
+    'batch_get_item', 'batch_write_item', 'transact_get_items', 'transact_write_items'
+}
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def safety_margin_ms() -> int:
+    # Time kept back for serializing and returning the response after the last DynamoDB call
+    return int(os.environ.get('DEADLINE_SAFETY_MARGIN_MS', '300'))
+
+
+def _capacity_units(response: dict) -> float:
+    consumed = response.get('ConsumedCapacity') or []
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return sum(entry.get('CapacityUnits', 0) for entry in consumed)
+
+
+def call_budget(read_timeout: float) -> float:
+    # Longest a call with this read timeout can take: connecting, then waiting for the response
+    return connect_timeout_for(read_timeout) + read_timeout
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES
+    return isinstance(error, (ConnectTimeoutError, ReadTimeoutError, EndpointConnectionError))
+
+
+class DeadlineClient:
+    # Drop-in for the DynamoDB client inside one invocation. Each call gets a read timeout that, with
+    # its connect timeout, fits in what is left of the Lambda timeout, and retryable failures are
+    # retried only while another attempt (plus backoff) still fits; otherwise DeadlineExceeded is
+    # raised well before Lambda kills the invocation, so the handler can answer 503 instead of API
+    # Gateway returning an opaque 502.
+
+    def __init__(self, context, client_factory=get_client, sleep=time.sleep):
+        self.context = context
+        self.client_factory = client_factory
+        self.sleep = sleep
+        self.attempts = 0
+        self.retries = 0
+        self._last_client = None
+
+    @property
+    def exceptions(self):
+        # Modeled exception classes are shared by all clients of a service, so any of them will do
+        return (self._last_client or self.client_factory()).exceptions
+
+    def remaining_seconds(self):
+        if self.context is None:
+            return None
+        return (self.context.get_remaining_time_in_millis() - safety_margin_ms()) / 1000
+
+    def _timeout_for(self, remaining):
+        fitting = [bucket for bucket in TIMEOUT_BUCKETS if call_budget(bucket) <= remaining]
+        if not fitting:
+            raise DeadlineExceeded('Not enough time left for a DynamoDB call')
+        return fitting[-1]
+
+    def __getattr__(self, operation):
+        if operation.startswith('_'):
+            raise AttributeError(operation)
+
+        def call(**kwargs):
+            metrics = current_metrics()
+            if operation in CAPACITY_OPERATIONS:
+                kwargs.setdefault('ReturnConsumedCapacity', 'TOTAL')
+            attempt = 0
+            while True:
+                remaining = self.remaining_seconds()
+                client = self.client_factory() if remaining is None else self.client_factory(self._timeout_for(remaining))
+                self._last_client = client
+                self.attempts += 1
+                started = time.perf_counter()
+                try:
+                    with tracing.span('DynamoDB', namespace='aws') as call_span:
+                        if call_span is not None:
+                            call_span.aws = {'operation': operation, 'table_name': kwargs.get('TableName'), 'retries': attempt}
+                        response = getattr(client, operation)(**kwargs)
+                    metrics.put('DynamoDBLatency', round((time.perf_counter() - started) * 1000, 3), 'Milliseconds')
+                    if operation in CAPACITY_OPERATIONS:
+                        metrics.put('ConsumedCapacity', _capacity_units(response), 'Count')
+                    return response
+                except Exception as error:
+                    metrics.put('DynamoDBLatency', round((time.perf_counter() - started) * 1000, 3), 'Milliseconds')
+                    if not _is_retryable(error):
+                        raise
+                    attempt += 1
+                    delay = backoff_delay(attempt)
+                    remaining = self.remaining_seconds()
+                    if remaining is not None and remaining - delay < call_budget(TIMEOUT_BUCKETS[0]):
+                        raise DeadlineExceeded(f'{operation} did not succeed before the deadline') from error
+                    if remaining is None and attempt >= 3:
+                        raise
+                    self.retries += 1
+                    metrics.put('DynamoDBRetries', 1, 'Count')
+                    self.sleep(delay)
+        return call
+
+
+def deadline_client(context) -> DeadlineClient:
+    return DeadlineClient(context)
+
+
+def service_unavailable_response() -> dict:
+    return build_response(503, {'error': 'Service temporarily unavailable, retry later'},
+                          headers={'Retry-After': str(RETRY_AFTER_SECONDS)})
@@ -0,0 +1,104 @@
+import json
+import os
+from decimal import Decimal
+from utils.clients import lazy_client
+
+# Low-level clients only (utils.clients). The boto3 resource layer is not used: it is much heavier
+# to import and construct, which shows up directly in Init Duration. Handlers work with plain
+# Python values and convert at the boundary with to_item/from_item.
+_dynamodb = lazy_client('dynamodb')
+set_client = _dynamodb.set
+
+
+def connect_timeout_for(read_timeout: float) -> float:
+    # Connecting gets its own timeout on top of read_timeout; a call can take up to both
+    return min(read_timeout, 1.0)
+
+
+def get_client(read_timeout: float = None):
+    # read_timeout picks a client configured for that per-call budget (see utils.deadline);
+    # those clients leave retries to the caller. Without it boto3's default timeouts and retries apply.
+    logged = _dynamodb.init_ms is not None
+    client = _dynamodb.get(read_timeout, config=None if read_timeout is None else lambda: _timeout_config(read_timeout))
+    if not logged and _dynamodb.init_ms is not None:
+        print(json.dumps({"dynamodbClientInitMs": _dynamodb.init_ms}))
+    return client
+
+
+def _timeout_config(read_timeout: float):
+    from botocore.config import Config
+    return Config(
+        connect_timeout=connect_timeout_for(read_timeout),
+        read_timeout=read_timeout,
+        retries={'total_max_attempts': 1}
+    )
+
+
+def client_init_duration_ms():
+    return _dynamodb.init_ms
+
+
+def get_table_name() -> str:
+    return os.environ['GOALS_TABLE_NAME']
+
+
+def serialize(value) -> dict:
+    if value is None:
+        return {'NULL': True}
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, str):
+        return {'S': value}
+    if isinstance(value, (int, float, Decimal)):
+        return {'N': str(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {'B': bytes(value)}
+    if isinstance(value, dict):
+        return {'M': {k: serialize(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {'L': [serialize(v) for v in value]}
+    if isinstance(value, (set, frozenset)):
+        if not value:
+            raise TypeError('DynamoDB does not support empty sets')
+        if all(isinstance(v, str) for v in value):
+            return {'SS': sorted(value)}
+        if all(isinstance(v, (bytes, bytearray)) for v in value):
+            return {'BS': sorted(bytes(v) for v in value)}
+        if all(isinstance(v, (int, float, Decimal)) and not isinstance(v, bool) for v in value):
+            return {'NS': [str(v) for v in value]}
+        raise TypeError('Sets must contain only strings, numbers or bytes')
+    raise TypeError(f'Unsupported type for DynamoDB: {type(value).__name__}')
+
+
+def _number(value: str):
+    try:
+        return int(value)
+    except ValueError:
+        return Decimal(value)
+
+
+def deserialize(attribute: dict):
+    (kind, value), = attribute.items()
+    if kind == 'S' or kind == 'B' or kind == 'BOOL':
+        return value
+    if kind == 'N':
+        return _number(value)
+    if kind == 'NULL':
+        return None
+    if kind == 'M':
+        return {k: deserialize(v) for k, v in value.items()}
+    if kind == 'L':
+        return [deserialize(v) for v in value]
+    if kind == 'SS' or kind == 'BS':
+        return set(value)
+    if kind == 'NS':
+        return {_number(v) for v in value}
+    raise TypeError(f'Unsupported DynamoDB attribute type: {kind}')
+
+
+def to_item(values: dict) -> dict:
+    return {k: serialize(v) for k, v in values.items()}
+
+
+def from_item(item: dict) -> dict:
+    return {k: deserialize(v) for k, v in item.items()}
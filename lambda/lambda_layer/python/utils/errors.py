@@ -0,0 +1,14 @@
+class HttpError(Exception):
+    # Raised from handler logic to short-circuit with a specific status; mapped by utils.middleware
+    status_code = 400
+
+    def __init__(self, message: str, status_code: int = None, headers: dict = None):
+        super().__init__(message)
+        self.message = message
+        if status_code is not None:
+            self.status_code = status_code
+        self.headers = headers
+
+
+class NotFound(HttpError):
+    status_code = 404
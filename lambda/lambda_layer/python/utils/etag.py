@@ -0,0 +1,34 @@
+import hashlib
+from utils.compression import request_header
+
+# Strong validators derived from stored versions instead of hashing serialized bodies:
+# every write bumps the item's numeric "version", so (goalId, version) pairs identify content.
+# A goal's ETag is that pair as is, "<goalId>:<version>", because the direct DynamoDB read of
+# GET /goals/{id} (app_constructs/api_gateway.py) builds it in a mapping template, which can't hash.
+
+
+def _quoted(digest: str) -> str:
+    return f'"{digest[:32]}"'
+
+
+def item_etag(item: dict) -> str:
+    return f'"{item["goalId"]}:{item.get("version", 0)}"'
+
+
+def list_etag(items: list, *context) -> str:
+    digest = hashlib.sha256()
+    # The context (paging parameters, next cursor) keeps different views of the same items apart
+    for part in context:
+        digest.update(f"{part}\x1e".encode('utf-8'))
+    for item in items:
+        digest.update(f"{item['goalId']}:{item.get('version', 0)}\x1f".encode('utf-8'))
+    return _quoted(digest.hexdigest())
+
+
+def is_not_modified(event: dict, etag: str) -> bool:
+    header = request_header(event, 'if-none-match')
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    # If-None-Match uses the weak comparison, so W/ prefixed validators still match
+    return '*' in candidates or any(candidate.removeprefix('W/') == etag for candidate in candidates)
@@ -0,0 +1,44 @@
+import os
+import time
+
+# ULIDs (https://github.com/ulid/spec): 48-bit millisecond timestamp + 80 random bits, Crockford
+# base32, 26 characters. As the goalId sort key they make a user's partition creation-ordered, so
+# "latest N" is a bounded reverse query. Ids minted in the same millisecond by this container
+# increment the random part, keeping them ordered too.
+ENCODING = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+LENGTH = 26
+
+_last_ms = -1
+_last_random = 0
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, index = divmod(value, 32)
+        chars.append(ENCODING[index])
+    return ''.join(reversed(chars))
+
+
+def new_ulid(timestamp_ms: int = None) -> str:
+    global _last_ms, _last_random
+    if timestamp_ms is None:
+        timestamp_ms = int(time.time() * 1000)
+    if timestamp_ms <= _last_ms:
+        timestamp_ms = _last_ms
+        random_part = (_last_random + 1) % (1 << 80)
+    else:
+        random_part = int.from_bytes(os.urandom(10), 'big')
+    _last_ms, _last_random = timestamp_ms, random_part
+    return _encode(timestamp_ms, 10) + _encode(random_part, 16)
+
+
+def is_ulid(value: str) -> bool:
+    return isinstance(value, str) and len(value) == LENGTH and all(char in ENCODING for char in value)
+
+
+def ulid_timestamp_ms(value: str) -> int:
+    timestamp = 0
+    for char in value[:10]:
+        timestamp = timestamp * 32 + ENCODING.index(char)
+    return timestamp
@@ -0,0 +1,49 @@
+import base64
+import json
+import os
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    # Types DynamoDB hands back that neither json nor orjson serialize on their own
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode('ascii')
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def stdlib_dumps(body) -> str:
+    return json.dumps(body, default=_default, separators=(',', ':'))
+
+
+def orjson_dumps(body) -> str:
+    return orjson.dumps(body, default=_default).decode('utf-8')
+
+
+ENCODERS = {'stdlib': stdlib_dumps}
+if orjson is not None:
+    ENCODERS['orjson'] = orjson_dumps
+
+# Fastest available encoder unless JSON_ENCODER or set_encoder() picks another one
+_encoder = ENCODERS.get(os.environ.get('JSON_ENCODER', 'orjson'), ENCODERS.get('orjson', stdlib_dumps))
+
+
+def set_encoder(encoder):
+    global _encoder
+    _encoder = ENCODERS[encoder] if isinstance(encoder, str) else encoder
+
+
+def get_encoder():
+    return _encoder
+
+
+def dumps(body) -> str:
+    return _encoder(body)
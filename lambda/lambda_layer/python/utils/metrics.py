@@ -0,0 +1,94 @@
+import functools
+import json
+import os
+import time
+
+# CloudWatch Embedded Metric Format: each flush prints one JSON log line that CloudWatch Logs turns
+# into metrics, so no PutMetricData calls (or their latency) on the request path.
+# https://docs.aws.amazon.com/AmazonCloudWatch/latest/monitoring/CloudWatch_Embedded_Metric_Format_Specification.html
+MAX_VALUES_PER_METRIC = 100
+
+_cold_start = True
+_current = None
+
+
+class MetricsLogger:
+
+    def __init__(self, route: str, namespace: str = None, emit=print):
+        self.route = route
+        self.namespace = namespace or os.environ.get('METRICS_NAMESPACE', 'GoalsApi')
+        self.emit = emit
+        self._metrics = {}
+        self._properties = {}
+
+    def put(self, name: str, value, unit: str = 'None'):
+        unit_name, values = self._metrics.setdefault(name, (unit, []))
+        if len(values) < MAX_VALUES_PER_METRIC:
+            values.append(value)
+
+    def set_property(self, key: str, value):
+        self._properties[key] = value
+
+    def values(self, name: str) -> list:
+        return self._metrics.get(name, (None, []))[1]
+
+    def flush(self):
+        if not self._metrics:
+            return
+        record = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': self.namespace,
+                    'Dimensions': [['Route']],
+                    'Metrics': [{'Name': name, 'Unit': unit} for name, (unit, _) in self._metrics.items()]
+                }]
+            },
+            'Route': self.route
+        }
+        record.update(self._properties)
+        for name, (_, values) in self._metrics.items():
+            record[name] = values[0] if len(values) == 1 else values
+        self.emit(json.dumps(record, default=str))
+        self._metrics = {}
+
+
+class _NullMetrics(MetricsLogger):
+    # Used outside an instrumented handler (scripts, tests) so callers never need a None check
+
+    def __init__(self):
+        super().__init__('none')
+
+    def put(self, name, value, unit='None'):
+        pass
+
+
+def current_metrics() -> MetricsLogger:
+    return _current or _NullMetrics()
+
+
+def instrument(route: str, emit=print):
+    # Records HandlerLatency, ResponseSize, ColdStart and the status class for one route and flushes
+    # everything recorded during the invocation (DynamoDB timings, item counts...) as a single EMF line
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            global _cold_start, _current
+            metrics = MetricsLogger(route, emit=emit)
+            _current = metrics
+            metrics.put('ColdStart', 1 if _cold_start else 0, 'Count')
+            _cold_start = False
+            started = time.perf_counter()
+            try:
+                response = handler(event, context)
+                metrics.put('ResponseSize', len(response.get('body') or ''), 'Bytes')
+                metrics.put(f"{str(response.get('statusCode', 500))[0]}xx", 1, 'Count')
+                return response
+            finally:
+                metrics.put('HandlerLatency', round((time.perf_counter() - started) * 1000, 3), 'Milliseconds')
+                if context is not None:
+                    metrics.set_property('requestId', getattr(context, 'aws_request_id', None))
+                metrics.flush()
+                _current = None
+        return wrapper
+    return decorator
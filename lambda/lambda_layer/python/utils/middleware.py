@@ -0,0 +1,124 @@
+import functools
+import json
+from utils import tracing
+from utils.deadline import DeadlineExceeded, deadline_client, service_unavailable_response
+from utils.errors import HttpError, NotFound
+from utils.metrics import instrument
+from utils.search_index import is_goal_id
+from utils.utils import build_response, parse_body
+
+# Shared request pipeline for the goal handlers:
+#
+#   instrument (EMF metrics) -> trace -> auth -> parse -> [middlewares] -> handler -> serialize
+#
+# Handlers receive a Request and return a Reply (or raise HttpError); everything else - claims
+# extraction, body parsing, error mapping, response building - lives here and is timed as a span.
+
+_global_middlewares = []
+
+
+class Request:
+
+    def __init__(self, route: str, event: dict, context):
+        self.route = route
+        self.event = event
+        self.context = context
+        self.claims = {}
+        self.user_id = None
+        self.body = None
+        self.path_parameters = event.get('pathParameters') or {}
+        self.query = event.get('queryStringParameters') or {}
+        self.client = deadline_client(context)
+
+    @property
+    def path_id(self):
+        return self.path_parameters.get('id')
+
+    @property
+    def goal_id(self):
+        # path_id of the /goals/{id} routes. Sort keys under the reserved prefix are search index,
+        # stats and summary items, so they are answered as a goal that doesn't exist
+        if not is_goal_id(self.path_id):
+            raise NotFound('Goal not found or not authorized')
+        return self.path_id
+
+
+class Reply:
+
+    def __init__(self, status_code: int, body=None, headers: dict = None, compress: bool = False):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        # Compressible replies go through Accept-Encoding negotiation (utils.compression)
+        self.compress = compress
+
+
+def register_middleware(middleware):
+    # middleware(request, call_next) -> Reply; runs for every handler, outermost first
+    _global_middlewares.append(middleware)
+
+
+def _authenticate(request: Request):
+    try:
+        request.claims = request.event['requestContext']['authorizer']['claims']
+        request.user_id = request.claims['sub']
+    except (KeyError, TypeError):
+        raise HttpError('Unauthorized', status_code=401)
+
+
+def _parse(request: Request):
+    try:
+        request.body = parse_body(request.event)
+    except ValueError:
+        raise HttpError('Request body must be valid JSON')
+    if not isinstance(request.body, dict):
+        raise HttpError('Request body must be a JSON object')
+
+
+def _chain(handler, middlewares):
+    call = handler
+    for middleware in reversed(middlewares):
+        call = functools.partial(middleware, call_next=call)
+    return call
+
+
+def _log_error(request: Request, error: Exception):
+    print(json.dumps({
+        "status": 500,
+        "route": request.route,
+        "error": f"{error}"
+    }))
+
+
+def goal_handler(route: str, parse_json_body: bool = False, middlewares: tuple = ()):
+    def decorator(handler):
+        @instrument(route)
+        @functools.wraps(handler)
+        def lambda_handler(event, context):
+            with tracing.trace(route) as root:
+                request = Request(route, event, context)
+                try:
+                    with tracing.span('auth'):
+                        _authenticate(request)
+                    root.annotations['route'] = route
+                    if parse_json_body:
+                        with tracing.span('parse'):
+                            _parse(request)
+                    with tracing.span('handler'):
+                        reply = _chain(handler, [*_global_middlewares, *middlewares])(request)
+                except HttpError as e:
+                    reply = Reply(e.status_code, {'error': e.message}, e.headers)
+                except DeadlineExceeded as e:
+                    root.record_exception(e, fault=False)
+                    return service_unavailable_response()
+                except Exception as e:
+                    root.record_exception(e)
+                    _log_error(request, e)
+                    reply = Reply(500, {'error': 'Internal server error'})
+
+                root.annotations['status'] = reply.status_code
+                with tracing.span('serialize'):
+                    return build_response(reply.status_code, reply.body, reply.headers,
+                                          event=event if reply.compress else None)
+        return lambda_handler
+    return decorator
@@ -0,0 +1,11 @@
+import os
+from utils.clients import lazy_client
+
+# Most invocations never touch offloaded content, so boto3's S3 client stays out of their Init Duration
+_s3 = lazy_client('s3')
+get_client = _s3.get
+set_client = _s3.set
+
+
+def get_bucket_name() -> str:
+    return os.environ['CONTENT_BUCKET_NAME']
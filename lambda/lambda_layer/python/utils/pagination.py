@@ -0,0 +1,77 @@
+import base64
+import hashlib
+import hmac
+import json
+from utils.errors import HttpError
+from utils.parameters import get_secret
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Sort key order; goal ids are ULIDs, so ascending is oldest first
+ORDERS = {'asc': True, 'desc': False}
+
+
+class InvalidPageRequest(HttpError, ValueError):
+    status_code = 400
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _signature(user_id: str, payload: str) -> str:
+    secret = get_secret('CURSOR_SIGNING_KEY').encode('utf-8')
+    # The caller's id is part of the MAC so a cursor can't be replayed by another user
+    message = f"{user_id}.{payload}".encode('utf-8')
+    return _b64encode(hmac.new(secret, message, hashlib.sha256).digest())
+
+
+def encode_cursor(last_evaluated_key: dict, user_id: str):
+    if not last_evaluated_key:
+        return None
+    payload = _b64encode(json.dumps(last_evaluated_key, separators=(',', ':'), sort_keys=True).encode('utf-8'))
+    return f"{payload}.{_signature(user_id, payload)}"
+
+
+def decode_cursor(cursor: str, user_id: str) -> dict:
+    try:
+        payload, signature = cursor.split('.', 1)
+    except ValueError:
+        raise InvalidPageRequest('Malformed cursor')
+
+    # Compared as bytes: compare_digest rejects str arguments with non-ASCII characters
+    if not hmac.compare_digest(signature.encode('utf-8'), _signature(user_id, payload).encode('utf-8')):
+        raise InvalidPageRequest('Invalid cursor')
+
+    try:
+        key = json.loads(_b64decode(payload))
+    except (ValueError, TypeError):
+        raise InvalidPageRequest('Malformed cursor')
+
+    if not isinstance(key, dict) or key.get('userId') != user_id:
+        raise InvalidPageRequest('Invalid cursor')
+    return key
+
+
+def parse_limit(value, default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    if value is None or value == '':
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise InvalidPageRequest('limit must be an integer')
+    if limit < 1 or limit > maximum:
+        raise InvalidPageRequest(f'limit must be between 1 and {maximum}')
+    return limit
+
+
+def parse_order(value, default: str = 'asc') -> bool:
+    # Returns the ScanIndexForward flag for ?order=asc|desc
+    order = value or default
+    if order not in ORDERS:
+        raise InvalidPageRequest('order must be "asc" or "desc"')
+    return ORDERS[order]
@@ -0,0 +1,30 @@
+import os
+from utils.clients import lazy_client
+
+# Secrets the functions need are SSM SecureString parameters; the environment only carries their
+# names. Each value is fetched once per container, on first use, and kept for its lifetime, so a
+# rotated value reaches a function when its containers are replaced (e.g. by the next deployment).
+
+# Only invocations that sign or check a pagination cursor need SSM
+_ssm = lazy_client('ssm')
+_values = {}
+get_client = _ssm.get
+
+
+def set_client(client):
+    # Values cached from the previous client are dropped with it
+    _ssm.set(client)
+    _values.clear()
+
+
+def get_secret(env_var: str) -> str:
+    # The value itself in env_var (tests, local/ and benchmarks/), else the SecureString named by
+    # <env_var>_PARAMETER
+    value = os.environ.get(env_var)
+    if value:
+        return value
+    name = os.environ[f'{env_var}_PARAMETER']
+    if name not in _values:
+        response = get_client().get_parameter(Name=name, WithDecryption=True)
+        _values[name] = response['Parameter']['Value']
+    return _values[name]
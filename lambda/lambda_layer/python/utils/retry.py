@@ -0,0 +1,9 @@
+import random
+
+BACKOFF_BASE_SECONDS = 0.05
+BACKOFF_CAP_SECONDS = 1.0
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE_SECONDS, cap: float = BACKOFF_CAP_SECONDS) -> float:
+    # "Full jitter": spreads retries of concurrent callers instead of synchronising them
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
@@ -0,0 +1,100 @@
+import json
+import re
+import unicodedata
+from utils.batch import batch_write
+from utils.dynamodb import to_item
+from utils.errors import HttpError
+
+# Title search index kept in the goals table itself. For every normalized word of a goal's title
+# there is one item in the owner's partition:
+#
+#   userId = <user>, goalId = "~T#<token>#<goalId>", ref = <goalId>
+#
+# so a prefix search is a begins_with query over just the matching keys. Sort keys starting with
+# RESERVED_PREFIX are never goals; goal ids (ULIDs, older UUIDs) always sort below it, which is what
+# lets get_all_goals skip them with `goalId < "~"`.
+RESERVED_PREFIX = '~'
+INDEX_PREFIX = '~T#'
+MAX_TOKENS = 16
+MAX_TOKEN_LENGTH = 32
+
+_WORD = re.compile(r'\w+')
+
+
+def check_title(title):
+    # Called before the goal is written: indexing it afterwards must not fail on a title that isn't text
+    if not isinstance(title, str):
+        raise HttpError('title must be a string')
+
+
+def normalize(text) -> str:
+    # Case- and accent-insensitive: "Čitanje" and "citanje" index the same
+    if not isinstance(text, str):
+        text = '' if text is None else str(text)
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def title_tokens(title: str) -> list:
+    tokens = []
+    for word in _WORD.findall(normalize(title)):
+        token = word[:MAX_TOKEN_LENGTH]
+        if token not in tokens:
+            tokens.append(token)
+        if len(tokens) == MAX_TOKENS:
+            break
+    return tokens
+
+
+def is_goal_id(goal_id) -> bool:
+    return isinstance(goal_id, str) and bool(goal_id) and not goal_id.startswith(RESERVED_PREFIX)
+
+
+def token_prefix(token: str) -> str:
+    return f'{INDEX_PREFIX}{token}'
+
+
+def index_key(user_id: str, token: str, goal_id: str) -> dict:
+    return to_item({'userId': user_id, 'goalId': f'{INDEX_PREFIX}{token}#{goal_id}'})
+
+
+def matches(title: str, query_tokens: list) -> bool:
+    # Every query word must start some word of the title ("run wee" matches "Run 5 km every week")
+    words = title_tokens(title)
+    return all(any(word.startswith(token) for word in words) for token in query_tokens)
+
+
+def index_requests(user_id: str, goal_id: str, old_title: str = None, new_title: str = None) -> list:
+    # BatchWriteItem requests moving the goal's index entries from old_title's words to new_title's
+    old_tokens = title_tokens(old_title) if old_title else []
+    new_tokens = title_tokens(new_title) if new_title else []
+    requests = [
+        {'DeleteRequest': {'Key': index_key(user_id, token, goal_id)}}
+        for token in old_tokens if token not in new_tokens
+    ]
+    for token in new_tokens:
+        if token not in old_tokens:
+            item = index_key(user_id, token, goal_id)
+            item['ref'] = {'S': goal_id}
+            requests.append({'PutRequest': {'Item': item}})
+    return requests
+
+
+def write_index(client, table_name: str, user_id: str, requests: list) -> list:
+    # Called once the goal write has committed, so a failure here must not turn into an error
+    # response (a retried create would make a second goal): it is logged and the unwritten
+    # requests are returned
+    if not requests:
+        return []
+    try:
+        return batch_write(client, table_name, requests)
+    except Exception as e:
+        print(json.dumps({'userId': user_id, 'indexWrites': len(requests), 'error': f'{e}'}))
+        return requests
+
+
+def sync_title_index(client, table_name: str, user_id: str, goal_id: str, old_title: str = None, new_title: str = None) -> list:
+    # Written after the goal itself. The index is only a hint - search re-checks every hit against
+    # the goal's current title - so an entry left behind by a failed call is filtered out, and a
+    # missing one only hides the goal from search until its title is next written.
+    return write_index(client, table_name, user_id, index_requests(user_id, goal_id, old_title, new_title))
@@ -0,0 +1,68 @@
+from datetime import datetime
+from utils.dynamodb import from_item, to_item
+from utils.search_index import RESERVED_PREFIX
+
+# Per-user counters in one item of the user's partition, under the reserved sort-key prefix so
+# goal lists never see it; reading the count is a single GetItem. goalCount is derived from the
+# table stream: the GoalSummary consumer sets it from the goals it holds for the user, so a failed
+# counter write is retried with the stream records instead of leaving the count off. It trails goal
+# writes by the stream's delay.
+STATS_GOAL_ID = f'{RESERVED_PREFIX}STATS'
+MAX_RECONCILE_ATTEMPTS = 3
+
+
+def stats_key(user_id: str) -> dict:
+    return to_item({'userId': user_id, 'goalId': STATS_GOAL_ID})
+
+
+def set_goal_count(client, table_name: str, user_id: str, count: int):
+    # A plain SET, so applying the same stream records again writes the same count
+    client.update_item(
+        TableName=table_name,
+        Key=stats_key(user_id),
+        UpdateExpression='SET goalCount = :count, countedAt = :now',
+        ExpressionAttributeValues=to_item({':count': count, ':now': datetime.now().isoformat()})
+    )
+
+
+def count_goals(client, table_name: str, user_id: str) -> int:
+    # Full COUNT query over the goals of the partition: only used to reconcile the counter
+    query_args = {
+        'TableName': table_name,
+        'KeyConditionExpression': 'userId = :userId AND goalId < :reserved',
+        'ExpressionAttributeValues': to_item({':userId': user_id, ':reserved': RESERVED_PREFIX}),
+        'Select': 'COUNT',
+        'ConsistentRead': True
+    }
+    count = 0
+    while True:
+        response = client.query(**query_args)
+        count += response['Count']
+        if 'LastEvaluatedKey' not in response:
+            return count
+        query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def read_stats(client, table_name: str, user_id: str) -> dict:
+    # A partition the stream consumer hasn't counted yet (no goal written since the counter
+    # existed) is counted once here and marked with countedAt; every later read is the single GetItem
+    for _ in range(MAX_RECONCILE_ATTEMPTS):
+        response = client.get_item(TableName=table_name, Key=stats_key(user_id), ConsistentRead=True)
+        stats = from_item(response['Item']) if response.get('Item') else {}
+        if 'countedAt' in stats:
+            return stats
+
+        counted = count_goals(client, table_name, user_id)
+        try:
+            # Fails if the stream consumer set the counter meanwhile; its count is then read instead
+            client.update_item(
+                TableName=table_name,
+                Key=stats_key(user_id),
+                UpdateExpression='SET goalCount = :counted, countedAt = :now',
+                ConditionExpression='attribute_not_exists(countedAt)',
+                ExpressionAttributeValues=to_item({':counted': counted, ':now': datetime.now().isoformat()})
+            )
+            return {'goalCount': counted}
+        except client.exceptions.ConditionalCheckFailedException:
+            continue
+    return stats
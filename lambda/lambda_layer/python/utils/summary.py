@@ -0,0 +1,64 @@
+import json
+import os
+from utils.dynamodb import from_item, to_item
+from utils.search_index import RESERVED_PREFIX
+
+# Per-user list summary kept by the GoalSummary stream consumer: one entry per goal with the fields
+# the list view renders, packed in goalId order into shard items
+#
+#   userId = <user>, goalId = "~SUMMARY#0000", goals = [{goalId, title, createdAt, version}, ...], revision
+#
+# so GET /goals?view=summary reads one item (a few for very large partitions) instead of every goal
+# with its content. A new shard starts when one would exceed SUMMARY_SHARD_MAX_BYTES, well below the
+# 400 KB item limit. Shard 0 always exists once a user's summary has been built, even if empty.
+SUMMARY_PREFIX = f'{RESERVED_PREFIX}SUMMARY#'
+SUMMARY_FIELDS = ('goalId', 'title', 'createdAt', 'version')
+DEFAULT_SHARD_MAX_BYTES = 300 * 1024
+
+
+def shard_max_bytes() -> int:
+    return int(os.environ.get('SUMMARY_SHARD_MAX_BYTES', DEFAULT_SHARD_MAX_BYTES))
+
+
+def shard_id(index: int) -> str:
+    return f'{SUMMARY_PREFIX}{index:04d}'
+
+
+def summary_entry(goal: dict) -> dict:
+    return {field: goal[field] for field in SUMMARY_FIELDS if field in goal}
+
+
+def entry_size(entry: dict) -> int:
+    # Close enough to DynamoDB's accounting of a map in a list: names, values and a little overhead
+    return len(json.dumps(entry, default=str).encode('utf-8')) + 8
+
+
+def pack_shards(entries: list, max_bytes: int = None) -> list:
+    # Splits entries (already in goalId order) into shard-sized lists; always at least one
+    max_bytes = max_bytes or shard_max_bytes()
+    shards = [[]]
+    size = 0
+    for entry in entries:
+        entry_bytes = entry_size(entry)
+        if shards[-1] and size + entry_bytes > max_bytes:
+            shards.append([])
+            size = 0
+        shards[-1].append(entry)
+        size += entry_bytes
+    return shards
+
+
+def read_shards(client, table_name: str, user_id: str, consistent: bool = False) -> list:
+    query_args = {
+        'TableName': table_name,
+        'KeyConditionExpression': 'userId = :userId AND begins_with(goalId, :prefix)',
+        'ExpressionAttributeValues': to_item({':userId': user_id, ':prefix': SUMMARY_PREFIX}),
+        'ConsistentRead': consistent
+    }
+    shards = []
+    while True:
+        response = client.query(**query_args)
+        shards.extend(from_item(item) for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return shards
+        query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
@@ -0,0 +1,177 @@
+import json
+import os
+import socket
+import time
+from contextlib import contextmanager
+
+# Minimal tracer producing AWS X-Ray segment documents. Inside Lambda the function segment is
+# created by the service, so each invocation is exported as one subsegment tree attached to it via
+# _X_AMZN_TRACE_ID; locally a fresh trace id is generated. No X-Ray SDK import on the cold path.
+
+_exporter = None
+_active = []
+
+
+def _new_id() -> str:
+    return os.urandom(8).hex()
+
+
+def _new_trace_id() -> str:
+    return f"1-{int(time.time()):08x}-{os.urandom(12).hex()}"
+
+
+def _parse_trace_header(header: str) -> dict:
+    fields = {}
+    for part in (header or '').split(';'):
+        key, _, value = part.partition('=')
+        if key:
+            fields[key.strip()] = value.strip()
+    return fields
+
+
+class Span:
+
+    def __init__(self, name: str, namespace: str = None):
+        self.name = name
+        self.namespace = namespace
+        self.id = _new_id()
+        self.start_time = time.time()
+        self.end_time = None
+        self.children = []
+        self.annotations = {}
+        self.metadata = {}
+        self.aws = {}
+        self.fault = False
+        self.error = False
+        self.cause = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_time or time.time()) - self.start_time) * 1000
+
+    def close(self):
+        self.end_time = time.time()
+
+    def record_exception(self, error: Exception, fault: bool = True):
+        self.fault = fault
+        self.error = not fault
+        self.cause = {'exceptions': [{'id': _new_id(), 'type': type(error).__name__, 'message': str(error)}]}
+
+    def to_document(self) -> dict:
+        document = {
+            'name': self.name,
+            'id': self.id,
+            'start_time': self.start_time,
+            'end_time': self.end_time or time.time()
+        }
+        if self.namespace:
+            document['namespace'] = self.namespace
+        if self.annotations:
+            document['annotations'] = self.annotations
+        if self.metadata:
+            document['metadata'] = {'default': self.metadata}
+        if self.aws:
+            document['aws'] = self.aws
+        if self.fault:
+            document['fault'] = True
+        if self.error:
+            document['error'] = True
+        if self.cause:
+            document['cause'] = self.cause
+        if self.children:
+            document['subsegments'] = [child.to_document() for child in self.children]
+        return document
+
+
+class InMemoryExporter:
+    # Keeps exported documents in a list; for tests and local runs
+
+    def __init__(self):
+        self.documents = []
+
+    def export(self, document: dict):
+        self.documents.append(document)
+
+    def spans(self, name: str) -> list:
+        found = []
+        pending = list(self.documents)
+        while pending:
+            document = pending.pop(0)
+            if document['name'] == name:
+                found.append(document)
+            pending.extend(document.get('subsegments', []))
+        return found
+
+
+class XRayDaemonExporter:
+    # Sends documents to the X-Ray daemon over UDP (the daemon Lambda runs when active tracing is on)
+    HEADER = json.dumps({'format': 'json', 'version': 1}) + '\n'
+
+    def __init__(self, address: str = None):
+        host, _, port = (address or os.environ.get('AWS_XRAY_DAEMON_ADDRESS', '127.0.0.1:2000')).rpartition(':')
+        self.address = (host, int(port))
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def export(self, document: dict):
+        try:
+            self.socket.sendto((self.HEADER + json.dumps(document, default=str)).encode('utf-8'), self.address)
+        except OSError as e:
+            print(json.dumps({'tracing': 'export failed', 'reason': str(e)}))
+
+
+def set_exporter(exporter):
+    global _exporter
+    _exporter = exporter
+
+
+def get_exporter():
+    global _exporter
+    if _exporter is None:
+        choice = os.environ.get('TRACE_EXPORTER', 'xray')
+        _exporter = XRayDaemonExporter() if choice == 'xray' and 'AWS_LAMBDA_FUNCTION_NAME' in os.environ else None
+    return _exporter
+
+
+def current_span():
+    return _active[-1] if _active else None
+
+
+@contextmanager
+def span(name: str, namespace: str = None):
+    # Child of the active span; a no-op when no trace is active (scripts, unit tests without a trace)
+    parent = current_span()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, namespace)
+    parent.children.append(child)
+    _active.append(child)
+    try:
+        yield child
+    except Exception as e:
+        child.record_exception(e)
+        raise
+    finally:
+        child.close()
+        _active.pop()
+
+
+@contextmanager
+def trace(name: str):
+    root = Span(name)
+    _active.append(root)
+    try:
+        yield root
+    finally:
+        root.close()
+        _active.remove(root)
+        exporter = get_exporter()
+        if exporter is not None:
+            header = _parse_trace_header(os.environ.get('_X_AMZN_TRACE_ID'))
+            if header.get('Sampled', '1') != '0':
+                document = root.to_document()
+                document['trace_id'] = header.get('Root') or _new_trace_id()
+                if header.get('Parent'):
+                    document['type'] = 'subsegment'
+                    document['parent_id'] = header['Parent']
+                exporter.export(document)
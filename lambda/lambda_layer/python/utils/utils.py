@@ -1,16 +1,36 @@
+import base64
 import json
+import time
+from utils.json_encoder import dumps
+from utils.compression import compress_response
+from utils.metrics import current_metrics
 
-def build_response(status_code: int, body: dict, headers: dict = None):
+def build_response(status_code: int, body: dict, headers: dict = None, event: dict = None):
     default_headers = {
         'Access-Control-Allow-Headers': 'Content-Type',
         'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Methods': 'OPTIONS,POST,GET,DELETE'
+        'Access-Control-Allow-Methods': 'OPTIONS,POST,GET,DELETE',
+        'Access-Control-Expose-Headers': 'ETag'
     }
     if headers:
         default_headers.update(headers)
 
-    return {
+    started = time.perf_counter()
+    response = {
         'statusCode': status_code,
         'headers': default_headers,
-        'body': json.dumps(body)
+        # 304 Not Modified must not carry a body
+        'body': '' if status_code == 304 else dumps(body)
     }
+    # Passing the request event opts the response into Accept-Encoding negotiation
+    if event is not None:
+        response = compress_response(response, event)
+    current_metrics().put('SerializeLatency', round((time.perf_counter() - started) * 1000, 3), 'Milliseconds')
+    return response
+
+def parse_body(event: dict):
+    # With application/json registered as a binary media type API Gateway delivers JSON request bodies base64 encoded
+    body = event.get('body') or '{}'
+    if event.get('isBase64Encoded'):
+        body = base64.b64decode(body)
+    return json.loads(body)
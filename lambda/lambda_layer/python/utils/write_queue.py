@@ -0,0 +1,40 @@
+import base64
+import json
+import os
+from utils.clients import lazy_client
+from utils.dynamodb import from_item, to_item
+
+# Write-behind for POST /goals (CREATE_GOAL_MODE=queue). CreateGoal validates the goal, uploads
+# offloaded content and sends the item it would have written to GOAL_WRITE_QUEUE_URL instead;
+# the GoalWriter consumer (lambda/goal_writer) drains the queue with BatchWriteItem, so a burst of
+# creates reaches the table at the pace of the consumer rather than of the callers.
+#
+# Messages carry the stored item in DynamoDB JSON, binary attributes base64-encoded as on the wire.
+# Content above CONTENT_OFFLOAD_MIN_SIZE is already in S3 by then, so a message stays well below
+# SQS's 256 KB limit.
+
+# Only CreateGoal in queue mode needs SQS
+_sqs = lazy_client('sqs')
+get_client = _sqs.get
+set_client = _sqs.set
+
+
+def get_queue_url():
+    # Only set on CreateGoal (or the router) when the stack is deployed with CREATE_GOAL_MODE=queue
+    return os.environ.get('GOAL_WRITE_QUEUE_URL')
+
+
+def encode_goal(item: dict) -> str:
+    attributes = to_item(item)
+    return json.dumps({
+        name: {'B': base64.b64encode(value['B']).decode('ascii')} if 'B' in value else value
+        for name, value in attributes.items()
+    })
+
+
+def decode_goal(body: str) -> dict:
+    attributes = json.loads(body)
+    return from_item({
+        name: {'B': base64.b64decode(value['B'])} if 'B' in value else value
+        for name, value in attributes.items()
+    })
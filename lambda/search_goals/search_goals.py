@@ -0,0 +1,47 @@
+from utils.batch import batch_get
+from utils.content import unpack_content
+from utils.dynamodb import from_item, get_table_name, to_item
+from utils.errors import HttpError
+from utils.metrics import current_metrics
+from utils.middleware import Reply, goal_handler
+from utils.pagination import decode_cursor, encode_cursor, parse_limit
+from utils.search_index import matches, title_tokens, token_prefix
+
+goal_table = get_table_name()
+
+@goal_handler('SearchGoals')
+def lambda_handler(request):
+    user_id = request.user_id
+    params = request.query
+    query_tokens = title_tokens(params.get('q'))
+    if not query_tokens:
+        raise HttpError('q must contain at least one letter or digit')
+
+    # Only the index entries under the most selective word are read; the other words are checked
+    # against the goals' titles below
+    query_args = {
+        'TableName': goal_table,
+        'KeyConditionExpression': 'userId = :userId AND begins_with(goalId, :prefix)',
+        'ExpressionAttributeValues': to_item({':userId': str(user_id), ':prefix': token_prefix(max(query_tokens, key=len))}),
+        'ProjectionExpression': '#ref',
+        'ExpressionAttributeNames': {'#ref': 'ref'},
+        'Limit': parse_limit(params.get('limit'))
+    }
+    if params.get('cursor'):
+        query_args['ExclusiveStartKey'] = to_item(decode_cursor(params['cursor'], user_id))
+
+    response = request.client.query(**query_args)
+    last_key = response.get('LastEvaluatedKey')
+    # A goal with several words under the prefix ("run", "running") has one entry for each
+    goal_ids = list(dict.fromkeys(item['ref'] for item in map(from_item, response.get('Items', []))))
+
+    items, _ = batch_get(request.client, goal_table, [to_item({'userId': user_id, 'goalId': goal_id}) for goal_id in goal_ids])
+    found = {item['goalId']: unpack_content(item, fetch=False) for item in map(from_item, items)}
+    # Entries of deleted goals or of titles that changed since are skipped
+    goals = [found[goal_id] for goal_id in goal_ids if goal_id in found and matches(found[goal_id].get('title'), query_tokens)]
+    current_metrics().put('ItemCount', len(goals), 'Count')
+
+    return Reply(200, {
+        'items': goals,
+        'nextCursor': encode_cursor(from_item(last_key) if last_key else None, user_id)
+    }, compress=True)
@@ -1,52 +1,76 @@
-import json
-import os
-import boto3
-from utils.utils import build_response
+from utils.cache import goal_cache
+from utils.content import CONTENT_ATTRIBUTES, check_content, discard_content, pack_content, unpack_content
+from utils.etag import item_etag
+from utils.dynamodb import from_item, get_table_name, to_item
+from utils.errors import HttpError, NotFound
+from utils.middleware import Reply, goal_handler
+from utils.search_index import check_title, sync_title_index
 
-dynamodb = boto3.resource('dynamodb')
-goal_table = os.environ['GOALS_TABLE_NAME']
-table = dynamodb.Table(goal_table)
+goal_table = get_table_name()
 
-def lambda_handler(event, context):
-    try:
-        user_id = event['requestContext']['authorizer']['claims']['sub']
-        goal_id = event['pathParameters']['id']
-        body = json.loads(event['body'])
-
-        response = table.get_item(Key={
-            'userId': user_id,
-            'goalId': goal_id
-        })
-        item = response.get('Item')
-
-        if not item:
-            return build_response(404, {'error': 'Goal not found or not authorized'})
-        
-        updated_attributes = {}
-        if 'title' in body:
-            updated_attributes['title'] = body['title']
-        if 'content' in body:
-            updated_attributes['content'] = body['content']
-
-        if not updated_attributes:
-            return build_response(400, {'error': 'No fields to update'})
-        
-        update_expression = "SET " + ", ".join(f"{k}=:{k}" for k in updated_attributes)
-        expression_attribute_values = {f":{k}": v for k, v in updated_attributes.items()}
-
-        table.update_item(
-            Key={
-            'userId': user_id,
-            'goalId': goal_id
-            },
-            UpdateExpression = update_expression,
-            ExpressionAttributeValues=expression_attribute_values
-        )
+@goal_handler('UpdateGoal', parse_json_body=True)
+def lambda_handler(request):
+    goal_id = request.goal_id
+
+    updated_attributes = {}
+    if 'title' in request.body:
+        check_title(request.body['title'])
+        updated_attributes['title'] = request.body['title']
+    if 'content' in request.body:
+        updated_attributes['content'] = request.body['content']
+
+    if not updated_attributes:
+        raise HttpError('No fields to update')
 
-        item.update(updated_attributes)
+    stored_attributes = dict(updated_attributes)
+    removed_attributes = []
+    if 'content' in updated_attributes:
+        check_content(updated_attributes['content'])
+        # New content replaces whichever representation the old content had
+        stored_attributes.pop('content')
+        stored_attributes.update(pack_content(request.user_id, goal_id, updated_attributes['content']))
+        removed_attributes = [name for name in CONTENT_ATTRIBUTES if name not in stored_attributes]
 
-        return build_response(200, item)
+    # Every update bumps the version the ETags are derived from
+    update_expression = "SET " + ", ".join(f"#{k}=:{k}" for k in stored_attributes) + ", #version = if_not_exists(#version, :zero) + :one"
+    if removed_attributes:
+        update_expression += " REMOVE " + ", ".join(f"#{k}" for k in removed_attributes)
+    expression_attribute_names = {f"#{k}": k for k in [*stored_attributes, *removed_attributes]}
+    expression_attribute_names['#version'] = 'version'
+    expression_attribute_values = to_item({f":{k}": v for k, v in stored_attributes.items()})
+    expression_attribute_values.update(to_item({':zero': 0, ':one': 1}))
+    client = request.client
+
+    # The key already scopes the item to the caller, so the existence check is the ownership check
+    try:
+        response = client.update_item(
+            TableName=goal_table,
+            Key=to_item({
+                'userId': request.user_id,
+                'goalId': goal_id
+            }),
+            UpdateExpression=update_expression,
+            ConditionExpression='attribute_exists(goalId)',
+            ExpressionAttributeNames=expression_attribute_names,
+            ExpressionAttributeValues=expression_attribute_values,
+            # The old title is needed to move the search index entries; the new item follows
+            # from it exactly, so one call still answers both
+            ReturnValues='ALL_OLD'
+        )
+    except client.exceptions.ConditionalCheckFailedException:
+        discard_content(stored_attributes)
+        raise NotFound('Goal not found or not authorized')
 
-    except Exception as e:
-        print(f"Error: {e}")
-        return build_response(500, {'error': str(e)})
+    old_item = from_item(response['Attributes'])
+    stored_item = {name: value for name, value in old_item.items() if name not in removed_attributes}
+    stored_item.update(stored_attributes, version=old_item.get('version', 0) + 1)
+    if 'content' in updated_attributes:
+        discard_content(old_item)
+        item = {name: value for name, value in stored_item.items() if name not in CONTENT_ATTRIBUTES}
+        item['content'] = updated_attributes['content']
+    else:
+        item = unpack_content(stored_item)
+    if 'title' in updated_attributes:
+        sync_title_index(client, goal_table, request.user_id, item['goalId'], old_item.get('title'), item['title'])
+    goal_cache.invalidate_user(request.user_id)
+    return Reply(200, item, headers={'ETag': item_etag(item)})
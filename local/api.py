@@ -0,0 +1,237 @@
+"""Local HTTP emulator of the goals REST API.
+
+    python local/api.py [--port 3000] [--seed 1000 --seed-user local-user] [--write-behind] [--quiet]
+
+Serves the route table of the APIGateway construct (app_constructs/api_gateway.API_ROUTES) with the
+real handlers (app_constructs/lambda_module.LAMBDA_DEFINITIONS) against the in-memory DynamoDB
+and S3 stand-ins, so the whole request path - routing, authorization, handler, serialization - can be
+exercised and load-tested with ordinary HTTP tools (curl, ab, wrk, k6) on one machine.
+
+Authorization: the Cognito authorizer is emulated, not enforced. A JWT in the Authorization header
+has its claims decoded without verifying the signature; any other value is used as the user id:
+
+    curl -H 'Authorization: alice' localhost:3000/goals
+
+All handlers run in one process and invocations are serialized, which models a single warm
+container per function (or router mode) rather than Lambda's parallel scaling. Table stream records
+are delivered to the GoalSummary consumer right after each invocation instead of asynchronously.
+With --write-behind POST /goals runs as with CREATE_GOAL_MODE=queue: it answers 202 and the
+GoalWriter consumer drains the local queue after each invocation.
+"""
+import argparse
+import base64
+import contextlib
+import importlib
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+project_root = Path(__file__).resolve().parents[1]
+for path in (project_root / 'lambda/lambda_layer/python', project_root / 'lambda', project_root / 'infrastructure', project_root):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from app_constructs.api_gateway import API_ROUTES, cors_preflight_options
+from app_constructs.lambda_module import CONSUMER_DEFINITIONS, LAMBDA_DEFINITIONS
+from local.dynamodb import LocalDynamoDB, seed_goals
+from local.events import LambdaContext, cognito_claims, proxy_event
+from local.object_store import LocalObjectStore
+from local.queues import LocalQueue
+from local.streams import GOAL_FILTERS, LocalStream
+
+DEFAULT_TABLE_NAME = 'goals-local'
+DEFAULT_CONTENT_BUCKET_NAME = 'goal-content-local'
+
+
+def load_handler(function_name: str):
+    definition = LAMBDA_DEFINITIONS.get(function_name) or CONSUMER_DEFINITIONS[function_name]
+    module_name, _, attribute = definition['handler'].rpartition('.')
+    return getattr(importlib.import_module(f"{definition['path']}.{module_name}"), attribute)
+
+
+def claims_from_authorization(header: str):
+    if not header:
+        return None
+    token = header[7:] if header.lower().startswith('bearer ') else header
+    parts = token.split('.')
+    if len(parts) == 3:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(parts[1] + '=' * (-len(parts[1]) % 4)))
+            # The authorizer hands claims to the integration as strings
+            return {name: value if isinstance(value, str) else json.dumps(value) for name, value in payload.items()}
+        except ValueError:
+            pass
+    return cognito_claims(token)
+
+
+class RouteTable:
+
+    def __init__(self, routes: list = API_ROUTES):
+        self.cors = cors_preflight_options()
+        self.methods = {}
+        for route in routes:
+            self.methods.setdefault(route['path'], {})[route['method']] = route['function']
+        self.handlers = {function: load_handler(function) for function in {route['function'] for route in routes}}
+
+    def match(self, path: str):
+        # Returns (resource, path parameters). Literal segments win over {parameters}, as in API Gateway
+        segments = [segment for segment in path.split('/') if segment]
+        best = None
+        for resource in self.methods:
+            template = [segment for segment in resource.split('/') if segment]
+            if len(template) != len(segments):
+                continue
+            parameters = {}
+            literals = 0
+            for expected, actual in zip(template, segments):
+                if expected.startswith('{') and expected.endswith('}'):
+                    parameters[expected[1:-1]] = actual
+                elif expected == actual:
+                    literals += 1
+                else:
+                    break
+            else:
+                if best is None or literals > best[0]:
+                    best = (literals, resource, parameters)
+        return (best[1], best[2]) if best else (None, {})
+
+
+class LocalApi:
+
+    def __init__(self, routes: RouteTable, quiet: bool = False, background: tuple = ()):
+        # background: callables run after every invocation for the work the deployed stack does
+        # asynchronously (stream consumers), so its results are visible to the next request
+        self.routes = routes
+        self.quiet = quiet
+        self.background = background
+        self._devnull = open(os.devnull, 'w') if quiet else None
+        self._lock = threading.Lock()
+
+    def handle(self, method: str, url: str, headers: dict, body: bytes):
+        # Returns (status, headers, body bytes) for one HTTP request
+        parts = urlsplit(url)
+        resource, path_parameters = self.routes.match(parts.path)
+        if resource is None or (method != 'OPTIONS' and method not in self.routes.methods[resource]):
+            return self._json(403, {'message': 'Missing Authentication Token'})
+        if method == 'OPTIONS':
+            cors = self.routes.cors[resource]
+            return 204, {
+                'Access-Control-Allow-Origin': headers.get('Origin', '*'),
+                'Access-Control-Allow-Methods': ','.join(cors['allow_methods']),
+                'Access-Control-Allow-Headers': ','.join(cors['allow_headers']),
+                'Access-Control-Allow-Credentials': 'true'
+            }, b''
+
+        claims = claims_from_authorization(next((v for k, v in headers.items() if k.lower() == 'authorization'), None))
+        if claims is None:
+            return self._json(401, {'message': 'Unauthorized'})
+
+        function = self.routes.methods[resource][method]
+        event = proxy_event(method, resource, path_parameters, dict(parse_qsl(parts.query)), headers=headers, claims=claims)
+        event['path'] = parts.path
+        if body:
+            try:
+                event['body'] = body.decode('utf-8')
+            except UnicodeDecodeError:
+                event['body'] = base64.b64encode(body).decode('ascii')
+                event['isBase64Encoded'] = True
+
+        with self._lock, self._output():
+            try:
+                response = self.routes.handlers[function](event, LambdaContext(function_name=function))
+            except Exception as e:
+                print(json.dumps({'function': function, 'error': f'{e}'}), file=sys.stderr)
+                # What API Gateway answers when the Lambda invocation itself fails
+                return self._json(502, {'message': 'Internal server error'})
+            finally:
+                for work in self.background:
+                    work()
+
+        response_body = response.get('body') or ''
+        payload = base64.b64decode(response_body) if response.get('isBase64Encoded') else response_body.encode('utf-8')
+        return response['statusCode'], dict(response.get('headers') or {}), payload
+
+    def _output(self):
+        return contextlib.redirect_stdout(self._devnull) if self.quiet else contextlib.nullcontext()
+
+    @staticmethod
+    def _json(status: int, body: dict):
+        return status, {'Content-Type': 'application/json'}, json.dumps(body).encode('utf-8')
+
+
+def make_server(api: LocalApi, host: str = '127.0.0.1', port: int = 3000) -> ThreadingHTTPServer:
+
+    class RequestHandler(BaseHTTPRequestHandler):
+        # Keep-alive, so load tools measure the API rather than connection setup
+        protocol_version = 'HTTP/1.1'
+
+        def _dispatch(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            status, headers, payload = api.handle(self.command, self.path, dict(self.headers.items()), body)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_PUT = do_DELETE = do_OPTIONS = _dispatch
+
+        def log_message(self, format, *args):
+            if not api.quiet:
+                super().log_message(format, *args)
+
+    return ThreadingHTTPServer((host, port), RequestHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0, help='number of goals to create for --seed-user')
+    parser.add_argument('--seed-user', default='local-user')
+    parser.add_argument('--write-behind', action='store_true', help='queue goal creates for the GoalWriter consumer')
+    parser.add_argument('--quiet', action='store_true', help='hide request and handler logs')
+    args = parser.parse_args()
+
+    # The handlers read their configuration at import time
+    os.environ.setdefault('GOALS_TABLE_NAME', DEFAULT_TABLE_NAME)
+    os.environ.setdefault('CURSOR_SIGNING_KEY', 'local-signing-key')
+    os.environ.setdefault('CONTENT_BUCKET_NAME', DEFAULT_CONTENT_BUCKET_NAME)
+    from utils import dynamodb, object_store, write_queue
+
+    client = LocalDynamoDB()
+    dynamodb.set_client(client)
+    object_store.set_client(LocalObjectStore())
+    if args.seed:
+        seed_goals(client, dynamodb.get_table_name(), args.seed_user, args.seed)
+
+    background = []
+    if args.write_behind:
+        queue = LocalQueue()
+        write_queue.set_client(queue)
+        os.environ['GOAL_WRITE_QUEUE_URL'] = queue.url
+        writer = load_handler('GoalWriter')
+        background.append(lambda: queue.deliver(writer))
+    # After the writer, so the goals it wrote reach the summary in the same round
+    stream = LocalStream(client, dynamodb.get_table_name(), filters=GOAL_FILTERS)
+    summary_consumer = load_handler('GoalSummary')
+    background.append(lambda: stream.deliver(summary_consumer))
+    api = LocalApi(RouteTable(), quiet=args.quiet, background=tuple(background))
+    server = make_server(api, args.host, args.port)
+    print(f"Serving {len(API_ROUTES)} routes on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
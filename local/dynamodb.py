@@ -0,0 +1,898 @@
+import bisect
+import math
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from decimal import Decimal
+from botocore.exceptions import ClientError
+
+# In-memory stand-in for the low-level DynamoDB client (boto3.client('dynamodb')), good enough to
+# run the handlers without AWS: same call signatures, same attribute-value wire format, the
+# expression language subset the handlers use, and the same paging behaviour (Limit counts
+# evaluated items, 1 MB pages, LastEvaluatedKey). Partitions keep their sort keys in a sorted
+# list so queries cost what they would in DynamoDB - proportional to the page, not the partition.
+#
+#   from local.dynamodb import LocalDynamoDB
+#   from utils import dynamodb
+#   dynamodb.set_client(LocalDynamoDB())
+
+PAGE_SIZE_BYTES = 1024 * 1024
+DEFAULT_KEY_SCHEMA = ('userId', 'goalId')
+
+
+def _client_error(code: str, message: str, operation: str, **extra) -> dict:
+    response = {'Error': {'Code': code, 'Message': message}, 'ResponseMetadata': {'HTTPStatusCode': 400}}
+    response.update(extra)
+    return response
+
+
+class ConditionalCheckFailedException(ClientError):
+    def __init__(self, operation: str, item: dict = None):
+        extra = {'Item': item} if item is not None else {}
+        super().__init__(_client_error('ConditionalCheckFailedException', 'The conditional request failed', operation, **extra), operation)
+
+
+class ResourceNotFoundException(ClientError):
+    def __init__(self, operation: str, table: str):
+        super().__init__(_client_error('ResourceNotFoundException', f'Requested resource not found: Table: {table} not found', operation), operation)
+
+
+class ValidationException(ClientError):
+    def __init__(self, operation: str, message: str):
+        super().__init__(_client_error('ValidationException', message, operation), operation)
+
+
+class TransactionCanceledException(ClientError):
+    def __init__(self, operation: str, reasons: list):
+        super().__init__(_client_error('TransactionCanceledException', 'Transaction cancelled', operation,
+                                       CancellationReasons=reasons), operation)
+
+
+class _Exceptions:
+    # Mirrors client.exceptions on the boto3 client
+    ConditionalCheckFailedException = ConditionalCheckFailedException
+    ResourceNotFoundException = ResourceNotFoundException
+    ValidationException = ValidationException
+    TransactionCanceledException = TransactionCanceledException
+    ClientError = ClientError
+
+
+def _comparable(attribute: dict):
+    (kind, value), = attribute.items()
+    if kind == 'N':
+        return Decimal(value)
+    return value
+
+
+def _normalized(attribute: dict):
+    (kind, value), = attribute.items()
+    if kind == 'N':
+        return kind, Decimal(value)
+    if kind in ('SS', 'BS'):
+        return kind, frozenset(value)
+    if kind == 'NS':
+        return kind, frozenset(Decimal(v) for v in value)
+    if kind == 'M':
+        return kind, tuple(sorted((k, _normalized(v)) for k, v in value.items()))
+    if kind == 'L':
+        return kind, tuple(_normalized(v) for v in value)
+    return kind, value
+
+
+def _format_number(value: Decimal) -> str:
+    return format(value.normalize(), 'f') if value != 0 else '0'
+
+
+def _copy(attribute: dict) -> dict:
+    (kind, value), = attribute.items()
+    if kind == 'M':
+        return {'M': {k: _copy(v) for k, v in value.items()}}
+    if kind == 'L':
+        return {'L': [_copy(v) for v in value]}
+    if kind in ('SS', 'NS', 'BS'):
+        return {kind: list(value)}
+    return {kind: value}
+
+
+def copy_item(item: dict) -> dict:
+    return {name: _copy(value) for name, value in item.items()}
+
+
+def _attribute_size(attribute: dict) -> int:
+    (kind, value), = attribute.items()
+    if kind == 'S':
+        return len(value.encode('utf-8'))
+    if kind == 'B':
+        return len(value)
+    if kind == 'N':
+        return len(value) // 2 + 1
+    if kind in ('BOOL', 'NULL'):
+        return 1
+    if kind == 'M':
+        return 3 + sum(len(k.encode('utf-8')) + _attribute_size(v) for k, v in value.items())
+    if kind == 'L':
+        return 3 + sum(_attribute_size(v) + 1 for v in value)
+    if kind == 'SS':
+        return sum(len(v.encode('utf-8')) for v in value)
+    if kind == 'BS':
+        return sum(len(v) for v in value)
+    return sum(len(v) // 2 + 1 for v in value)
+
+
+def item_size(item: dict) -> int:
+    # DynamoDB's item size: attribute names plus values, as used for the 400 KB limit and capacity
+    return sum(len(name.encode('utf-8')) + _attribute_size(value) for name, value in item.items())
+
+
+# --- expressions -------------------------------------------------------------------------------
+
+_TOKEN = re.compile(r"\s*(?:(<>|<=|>=|[=<>(),+\-\[\].])|(#[A-Za-z0-9_]+)|(:[A-Za-z0-9_]+)|([A-Za-z_][A-Za-z0-9_]*)|(\d+))")
+
+
+class _Parser:
+    # Recursive-descent parser for condition, key condition, update and projection expressions.
+    # Produces tuples: ('cmp', op, a, b), ('between', x, lo, hi), ('in', x, options), ('and'|'or', a, b),
+    # ('not', a), ('call', name, args); operands are ('path', path), ('value', attribute) or ('call', ...)
+
+    def __init__(self, expression: str, names: dict, values: dict):
+        self.names = names or {}
+        self.values = values or {}
+        self.tokens = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = _TOKEN.match(expression, position)
+            if not match or match.end() == position:
+                raise ValueError(f'Invalid expression near: {expression[position:]!r}')
+            self.tokens.append(next(group for group in match.groups() if group is not None))
+            position = match.end()
+        self.position = 0
+
+    def peek(self, offset: int = 0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        if token is None:
+            raise ValueError('Unexpected end of expression')
+        self.position += 1
+        return token
+
+    def expect(self, token: str):
+        found = self.take()
+        if found.upper() != token:
+            raise ValueError(f'Expected {token!r}, found {found!r}')
+
+    def done(self) -> bool:
+        return self.position >= len(self.tokens)
+
+    def path(self) -> tuple:
+        elements = [self._name(self.take())]
+        while self.peek() in ('.', '['):
+            if self.take() == '.':
+                elements.append(self._name(self.take()))
+            else:
+                elements.append(int(self.take()))
+                self.expect(']')
+        return tuple(elements)
+
+    def _name(self, token: str) -> str:
+        if token.startswith('#'):
+            if token not in self.names:
+                raise ValueError(f'Undefined expression attribute name {token}')
+            return self.names[token]
+        return token
+
+    def operand(self):
+        token = self.peek()
+        if token.startswith(':'):
+            self.take()
+            if token not in self.values:
+                raise ValueError(f'Undefined expression attribute value {token}')
+            return ('value', self.values[token])
+        if self.peek(1) == '(' and not token.startswith('#'):
+            return self.call()
+        return ('path', self.path())
+
+    def call(self):
+        name = self.take()
+        self.expect('(')
+        args = [self.operand()]
+        while self.peek() == ',':
+            self.take()
+            args.append(self.operand())
+        self.expect(')')
+        return ('call', name, args)
+
+    def condition(self):
+        node = self._conjunction()
+        while self.peek() and self.peek().upper() == 'OR':
+            self.take()
+            node = ('or', node, self._conjunction())
+        return node
+
+    def _conjunction(self):
+        node = self._negation()
+        while self.peek() and self.peek().upper() == 'AND':
+            self.take()
+            node = ('and', node, self._negation())
+        return node
+
+    def _negation(self):
+        if self.peek() and self.peek().upper() == 'NOT':
+            self.take()
+            return ('not', self._negation())
+        if self.peek() == '(':
+            self.take()
+            node = self.condition()
+            self.expect(')')
+            return node
+        left = self.operand()
+        if left[0] == 'call' and left[1] != 'size':
+            return left
+        token = self.take()
+        if token in ('=', '<>', '<', '<=', '>', '>='):
+            return ('cmp', token, left, self.operand())
+        if token.upper() == 'BETWEEN':
+            low = self.operand()
+            self.expect('AND')
+            return ('between', left, low, self.operand())
+        if token.upper() == 'IN':
+            self.expect('(')
+            options = [self.operand()]
+            while self.peek() == ',':
+                self.take()
+                options.append(self.operand())
+            self.expect(')')
+            return ('in', left, options)
+        raise ValueError(f'Unexpected token {token!r}')
+
+    def update(self) -> list:
+        actions = []
+        while not self.done():
+            clause = self.take().upper()
+            if clause not in ('SET', 'REMOVE', 'ADD', 'DELETE'):
+                raise ValueError(f'Unknown update clause {clause!r}')
+            while True:
+                path = self.path()
+                if clause == 'SET':
+                    self.expect('=')
+                    value = self.operand()
+                    if self.peek() in ('+', '-'):
+                        value = ('arith', self.take(), value, self.operand())
+                    actions.append(('SET', path, value))
+                elif clause == 'REMOVE':
+                    actions.append(('REMOVE', path, None))
+                else:
+                    actions.append((clause, path, self.operand()))
+                if self.peek() != ',':
+                    break
+                self.take()
+        return actions
+
+    def projection(self) -> list:
+        paths = [self.path()]
+        while self.peek() == ',':
+            self.take()
+            paths.append(self.path())
+        return paths
+
+
+def _resolve(item: dict, path: tuple):
+    value = item.get(path[0])
+    for element in path[1:]:
+        if value is None:
+            return None
+        if isinstance(element, int):
+            items = value.get('L')
+            value = items[element] if items is not None and element < len(items) else None
+        else:
+            value = (value.get('M') or {}).get(element)
+    return value
+
+
+def _assign(item: dict, path: tuple, value):
+    if len(path) == 1:
+        if value is None:
+            item.pop(path[0], None)
+        else:
+            item[path[0]] = value
+        return
+    parent = _resolve(item, path[:-1])
+    if parent is None:
+        raise ValueError('The document path provided in the update expression is invalid for update')
+    last = path[-1]
+    if isinstance(last, int):
+        items = parent['L']
+        if value is None:
+            if last < len(items):
+                del items[last]
+        elif last < len(items):
+            items[last] = value
+        else:
+            items.append(value)
+    elif value is None:
+        parent['M'].pop(last, None)
+    else:
+        parent['M'][last] = value
+
+
+def _operand(node, item: dict):
+    kind = node[0]
+    if kind == 'value':
+        return node[1]
+    if kind == 'path':
+        return _resolve(item, node[1])
+    if kind == 'arith':
+        _, operator, left, right = node
+        left, right = _operand(left, item), _operand(right, item)
+        if not left or not right or 'N' not in left or 'N' not in right:
+            raise ValueError('An operand in the update expression has an incorrect data type')
+        result = Decimal(left['N']) + Decimal(right['N']) if operator == '+' else Decimal(left['N']) - Decimal(right['N'])
+        return {'N': _format_number(result)}
+    _, name, args = node
+    if name == 'if_not_exists':
+        existing = _operand(args[0], item)
+        return existing if existing is not None else _operand(args[1], item)
+    if name == 'list_append':
+        left, right = _operand(args[0], item), _operand(args[1], item)
+        return {'L': (left or {'L': []})['L'] + (right or {'L': []})['L']}
+    if name == 'size':
+        value = _operand(args[0], item)
+        if value is None:
+            return None
+        (value_kind, raw), = value.items()
+        return {'N': str(len(raw.encode('utf-8')) if value_kind == 'S' else len(raw))}
+    raise ValueError(f'Invalid function name: {name}')
+
+
+def _compare(operator: str, left, right) -> bool:
+    if left is None or right is None:
+        return operator == '<>' and (left is None) != (right is None)
+    if operator == '=':
+        return _normalized(left) == _normalized(right)
+    if operator == '<>':
+        return _normalized(left) != _normalized(right)
+    left_kind, right_kind = next(iter(left)), next(iter(right))
+    if left_kind != right_kind or left_kind not in ('S', 'N', 'B'):
+        return False
+    a, b = _comparable(left), _comparable(right)
+    return {'<': a < b, '<=': a <= b, '>': a > b, '>=': a >= b}[operator]
+
+
+def _evaluate(node, item: dict) -> bool:
+    kind = node[0]
+    if kind == 'and':
+        return _evaluate(node[1], item) and _evaluate(node[2], item)
+    if kind == 'or':
+        return _evaluate(node[1], item) or _evaluate(node[2], item)
+    if kind == 'not':
+        return not _evaluate(node[1], item)
+    if kind == 'cmp':
+        return _compare(node[1], _operand(node[2], item), _operand(node[3], item))
+    if kind == 'between':
+        value = _operand(node[1], item)
+        return _compare('>=', value, _operand(node[2], item)) and _compare('<=', value, _operand(node[3], item))
+    if kind == 'in':
+        value = _operand(node[1], item)
+        return any(_compare('=', value, _operand(option, item)) for option in node[2])
+    _, name, args = node
+    if name == 'attribute_exists':
+        return _operand(args[0], item) is not None
+    if name == 'attribute_not_exists':
+        return _operand(args[0], item) is None
+    if name == 'attribute_type':
+        value = _operand(args[0], item)
+        return value is not None and next(iter(value)) == _operand(args[1], item)['S']
+    if name == 'begins_with':
+        value, prefix = _operand(args[0], item), _operand(args[1], item)
+        return bool(value and prefix) and next(iter(value)) == next(iter(prefix)) in ('S', 'B') \
+            and _comparable(value).startswith(_comparable(prefix))
+    if name == 'contains':
+        value, needle = _operand(args[0], item), _operand(args[1], item)
+        if not value or not needle:
+            return False
+        (value_kind, raw), = value.items()
+        if value_kind == 'S':
+            return 'S' in needle and needle['S'] in raw
+        if value_kind == 'L':
+            return any(_compare('=', element, needle) for element in raw)
+        if value_kind in ('SS', 'NS', 'BS'):
+            return _normalized(needle)[1] in _normalized(value)[1]
+        return False
+    raise ValueError(f'Invalid function name: {name}')
+
+
+def _flatten_and(node) -> list:
+    if node[0] == 'and':
+        return _flatten_and(node[1]) + _flatten_and(node[2])
+    return [node]
+
+
+# --- storage -----------------------------------------------------------------------------------
+
+class _Partition:
+
+    def __init__(self):
+        self.keys = []
+        self.items = {}
+
+    def put(self, sort_key, item: dict):
+        if sort_key not in self.items:
+            bisect.insort(self.keys, sort_key)
+        self.items[sort_key] = item
+
+    def delete(self, sort_key):
+        if self.items.pop(sort_key, None) is not None:
+            del self.keys[bisect.bisect_left(self.keys, sort_key)]
+
+
+class _Table:
+
+    def __init__(self, name: str, hash_key: str, range_key: str = None):
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.partitions = {}
+
+    def key_of(self, item: dict, operation: str) -> tuple:
+        names = (self.hash_key, self.range_key) if self.range_key else (self.hash_key,)
+        for name in names:
+            if name not in item:
+                raise ValidationException(operation, f'One of the required keys was not given a value: {name}')
+        return _comparable(item[self.hash_key]), _comparable(item[self.range_key]) if self.range_key else None
+
+    def key_attributes(self, item: dict) -> dict:
+        names = (self.hash_key, self.range_key) if self.range_key else (self.hash_key,)
+        return {name: _copy(item[name]) for name in names}
+
+    def get(self, key: tuple):
+        partition = self.partitions.get(key[0])
+        return partition.items.get(key[1]) if partition else None
+
+    def put(self, key: tuple, item: dict):
+        self.partitions.setdefault(key[0], _Partition()).put(key[1], item)
+
+    def delete(self, key: tuple):
+        partition = self.partitions.get(key[0])
+        if partition:
+            partition.delete(key[1])
+            if not partition.items:
+                del self.partitions[key[0]]
+
+    def __len__(self):
+        return sum(len(partition.items) for partition in self.partitions.values())
+
+
+def _read_units(size: int, consistent: bool) -> float:
+    units = max(1, math.ceil(size / 4096))
+    return float(units if consistent else units / 2)
+
+
+def _write_units(size: int) -> float:
+    return float(max(1, math.ceil(size / 1024)))
+
+
+class LocalDynamoDB:
+
+    exceptions = _Exceptions
+
+    def __init__(self, key_schemas: dict = None, default_key_schema: tuple = DEFAULT_KEY_SCHEMA, latency: float = 0.0):
+        # key_schemas: {table_name: (hash_key, range_key)}. Unknown tables are created on first use
+        # with default_key_schema unless it is None, in which case they raise ResourceNotFoundException.
+        # latency: seconds slept per call, to approximate a network round trip.
+        self.default_key_schema = default_key_schema
+        self.latency = latency
+        self.calls = Counter()
+        self.listeners = []
+        self._tables = {}
+        self._lock = threading.RLock()
+        for name, schema in (key_schemas or {}).items():
+            self.create_table(name, *schema)
+
+    def create_table(self, name: str, hash_key: str, range_key: str = None):
+        with self._lock:
+            self._tables[name] = _Table(name, hash_key, range_key)
+
+    def item_count(self, table_name: str) -> int:
+        return len(self._table(table_name, 'DescribeTable'))
+
+    def add_listener(self, listener):
+        # listener(table_name, event_name, old_image, new_image) after every committed write; used
+        # to emulate DynamoDB Streams. event_name is INSERT, MODIFY or REMOVE.
+        self.listeners.append(listener)
+
+    def _table(self, name: str, operation: str) -> _Table:
+        table = self._tables.get(name)
+        if table is None:
+            if self.default_key_schema is None:
+                raise ResourceNotFoundException(operation, name)
+            table = self._tables[name] = _Table(name, *self.default_key_schema)
+        return table
+
+    def _begin(self, operation: str):
+        self.calls[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _notify(self, table: _Table, old: dict, new: dict):
+        if not self.listeners or (old is None and new is None):
+            return
+        event_name = 'INSERT' if old is None else 'REMOVE' if new is None else 'MODIFY'
+        for listener in self.listeners:
+            listener(table.name, event_name, old and copy_item(old), new and copy_item(new))
+
+    def _parse(self, operation: str, expression: str, kwargs: dict, method: str):
+        try:
+            parser = _Parser(expression, kwargs.get('ExpressionAttributeNames'), kwargs.get('ExpressionAttributeValues'))
+            result = getattr(parser, method)()
+            if not parser.done():
+                raise ValueError(f'Unexpected token {parser.peek()!r}')
+            return result
+        except ValueError as e:
+            raise ValidationException(operation, f'Invalid expression: {e}')
+
+    def _check(self, operation: str, kwargs: dict, existing: dict):
+        expression = kwargs.get('ConditionExpression')
+        if not expression:
+            return
+        try:
+            passed = _evaluate(self._parse(operation, expression, kwargs, 'condition'), existing or {})
+        except ValueError as e:
+            raise ValidationException(operation, str(e))
+        if not passed:
+            on_failure = kwargs.get('ReturnValuesOnConditionCheckFailure') == 'ALL_OLD' and existing
+            raise ConditionalCheckFailedException(operation, copy_item(existing) if on_failure else None)
+
+    def _project(self, operation: str, item: dict, kwargs: dict) -> dict:
+        expression = kwargs.get('ProjectionExpression')
+        if not expression:
+            return copy_item(item)
+        projected = {}
+        for path in self._parse(operation, expression, kwargs, 'projection'):
+            if path[0] in item:
+                projected[path[0]] = _copy(item[path[0]])
+        return projected
+
+    def _with_capacity(self, response: dict, kwargs: dict, table: str, units: float) -> dict:
+        if kwargs.get('ReturnConsumedCapacity') in ('TOTAL', 'INDEXES'):
+            response['ConsumedCapacity'] = {'TableName': table, 'CapacityUnits': units}
+        return response
+
+    # --- single-item operations ---------------------------------------------------------------
+
+    def get_item(self, TableName: str, Key: dict, **kwargs) -> dict:
+        self._begin('GetItem')
+        with self._lock:
+            table = self._table(TableName, 'GetItem')
+            item = table.get(table.key_of(Key, 'GetItem'))
+            response = {'Item': self._project('GetItem', item, kwargs)} if item is not None else {}
+            size = item_size(item) if item is not None else 0
+            return self._with_capacity(response, kwargs, TableName, _read_units(size, kwargs.get('ConsistentRead', False)))
+
+    def put_item(self, TableName: str, Item: dict, **kwargs) -> dict:
+        self._begin('PutItem')
+        with self._lock:
+            table = self._table(TableName, 'PutItem')
+            key = table.key_of(Item, 'PutItem')
+            if item_size(Item) > 400 * 1024:
+                raise ValidationException('PutItem', 'Item size has exceeded the maximum allowed size')
+            existing = table.get(key)
+            self._check('PutItem', kwargs, existing)
+            new = copy_item(Item)
+            table.put(key, new)
+            self._notify(table, existing, new)
+            response = {'Attributes': copy_item(existing)} if kwargs.get('ReturnValues') == 'ALL_OLD' and existing else {}
+            return self._with_capacity(response, kwargs, TableName, _write_units(item_size(new)))
+
+    def delete_item(self, TableName: str, Key: dict, **kwargs) -> dict:
+        self._begin('DeleteItem')
+        with self._lock:
+            table = self._table(TableName, 'DeleteItem')
+            key = table.key_of(Key, 'DeleteItem')
+            existing = table.get(key)
+            self._check('DeleteItem', kwargs, existing)
+            if existing is not None:
+                table.delete(key)
+                self._notify(table, existing, None)
+            response = {'Attributes': copy_item(existing)} if kwargs.get('ReturnValues') == 'ALL_OLD' and existing else {}
+            return self._with_capacity(response, kwargs, TableName, _write_units(item_size(existing or {})))
+
+    def update_item(self, TableName: str, Key: dict, **kwargs) -> dict:
+        self._begin('UpdateItem')
+        with self._lock:
+            table = self._table(TableName, 'UpdateItem')
+            key = table.key_of(Key, 'UpdateItem')
+            existing = table.get(key)
+            self._check('UpdateItem', kwargs, existing)
+            new, updated = self._apply_update(table, Key, existing, kwargs)
+            if item_size(new) > 400 * 1024:
+                raise ValidationException('UpdateItem', 'Item size to update has exceeded the maximum allowed size')
+            table.put(key, new)
+            self._notify(table, existing, new)
+
+            return_values = kwargs.get('ReturnValues', 'NONE')
+            response = {}
+            if return_values == 'ALL_NEW':
+                response['Attributes'] = copy_item(new)
+            elif return_values == 'ALL_OLD' and existing:
+                response['Attributes'] = copy_item(existing)
+            elif return_values == 'UPDATED_NEW':
+                response['Attributes'] = {name: _copy(new[name]) for name in updated if name in new}
+            elif return_values == 'UPDATED_OLD' and existing:
+                response['Attributes'] = {name: _copy(existing[name]) for name in updated if name in existing}
+            return self._with_capacity(response, kwargs, TableName, _write_units(item_size(new)))
+
+    def _apply_update(self, table: _Table, key: dict, existing: dict, kwargs: dict):
+        new = copy_item(existing) if existing else table.key_attributes(key)
+        updated = set()
+        expression = kwargs.get('UpdateExpression')
+        if not expression:
+            return new, updated
+        key_names = {table.hash_key, table.range_key}
+        try:
+            actions = self._parse('UpdateItem', expression, kwargs, 'update')
+            # Every operand is evaluated against the item as it was before the update
+            values = [(action, path, _operand(node, existing or {}) if node else None) for action, path, node in actions]
+            for action, path, value in values:
+                if path[0] in key_names:
+                    raise ValueError(f'Cannot update attribute {path[0]}. This attribute is part of the key')
+                updated.add(path[0])
+                current = _resolve(new, path)
+                if action == 'SET':
+                    _assign(new, path, _copy(value))
+                elif action == 'REMOVE':
+                    _assign(new, path, None)
+                elif action == 'ADD':
+                    _assign(new, path, self._add(current, value))
+                else:
+                    _assign(new, path, self._delete_from_set(current, value))
+        except ValueError as e:
+            raise ValidationException('UpdateItem', str(e))
+        return new, updated
+
+    @staticmethod
+    def _add(current, value):
+        if current is None:
+            return _copy(value)
+        if 'N' in current and 'N' in value:
+            return {'N': _format_number(Decimal(current['N']) + Decimal(value['N']))}
+        kind = next(iter(value))
+        if kind in ('SS', 'NS', 'BS') and kind in current:
+            merged = list(current[kind])
+            merged.extend(v for v in value[kind] if v not in merged)
+            return {kind: merged}
+        raise ValueError('An operand in the update expression has an incorrect data type')
+
+    @staticmethod
+    def _delete_from_set(current, value):
+        if current is None:
+            return None
+        kind = next(iter(value))
+        if kind not in current:
+            raise ValueError('An operand in the update expression has an incorrect data type')
+        remaining = [v for v in current[kind] if v not in value[kind]]
+        return {kind: remaining} if remaining else None
+
+    # --- reads over many items ----------------------------------------------------------------
+
+    def query(self, TableName: str, KeyConditionExpression: str, **kwargs) -> dict:
+        self._begin('Query')
+        with self._lock:
+            table = self._table(TableName, 'Query')
+            hash_value, start, end = self._key_range(table, KeyConditionExpression, kwargs)
+            partition = table.partitions.get(hash_value)
+            if partition is None:
+                return self._page(table, [], kwargs, TableName)
+
+            keys = partition.keys
+            forward = kwargs.get('ScanIndexForward', True)
+            exclusive_start = kwargs.get('ExclusiveStartKey')
+            if exclusive_start:
+                start_key = table.key_of(exclusive_start, 'Query')[1]
+                if forward:
+                    start = max(start, bisect.bisect_right(keys, start_key))
+                else:
+                    end = min(end, bisect.bisect_left(keys, start_key))
+            indexes = range(start, end) if forward else range(end - 1, start - 1, -1)
+            return self._page(table, (partition.items[keys[index]] for index in indexes), kwargs, TableName)
+
+    def scan(self, TableName: str, **kwargs) -> dict:
+        self._begin('Scan')
+        with self._lock:
+            table = self._table(TableName, 'Scan')
+            everything = [
+                partition.items[key]
+                for _, partition in sorted(table.partitions.items(), key=lambda entry: str(entry[0]))
+                for key in partition.keys
+            ]
+            exclusive_start = kwargs.get('ExclusiveStartKey')
+            if exclusive_start:
+                start_key = table.key_of(exclusive_start, 'Scan')
+                positions = [index for index, item in enumerate(everything) if table.key_of(item, 'Scan') == start_key]
+                everything = everything[positions[0] + 1:] if positions else everything
+            return self._page(table, everything, kwargs, TableName)
+
+    def _key_range(self, table: _Table, expression: str, kwargs: dict):
+        # Turns the key condition into a partition value plus a [start, end) slice of its sorted keys
+        conditions = _flatten_and(self._parse('Query', expression, kwargs, 'condition'))
+        hash_value = None
+        sort_conditions = []
+        for condition in conditions:
+            if condition[0] == 'cmp' and condition[1] == '=' and condition[2] == ('path', (table.hash_key,)):
+                hash_value = _comparable(_operand(condition[3], {}))
+            else:
+                sort_conditions.append(condition)
+        if hash_value is None or len(sort_conditions) > 1:
+            raise ValidationException('Query', 'Query key condition not supported')
+
+        partition = table.partitions.get(hash_value)
+        keys = partition.keys if partition else []
+        if not sort_conditions:
+            return hash_value, 0, len(keys)
+        return (hash_value, *self._sort_range(table, sort_conditions[0], keys))
+
+    @staticmethod
+    def _sort_range(table: _Table, condition, keys: list):
+        sort_path = ('path', (table.range_key,))
+        start, end = 0, len(keys)
+        kind = condition[0]
+        if kind == 'cmp' and condition[2] == sort_path:
+            operator, value = condition[1], _comparable(_operand(condition[3], {}))
+            if operator in ('=', '>=', '>'):
+                start = (bisect.bisect_right if operator == '>' else bisect.bisect_left)(keys, value)
+            if operator in ('=', '<=', '<'):
+                end = (bisect.bisect_left if operator == '<' else bisect.bisect_right)(keys, value)
+            return start, end
+        if kind == 'between' and condition[1] == sort_path:
+            low, high = _comparable(_operand(condition[2], {})), _comparable(_operand(condition[3], {}))
+            return bisect.bisect_left(keys, low), bisect.bisect_right(keys, high)
+        if kind == 'call' and condition[1] == 'begins_with' and condition[2][0] == sort_path:
+            prefix = _comparable(_operand(condition[2][1], {}))
+            # Every key starting with the prefix sorts below prefix + the highest code point / byte
+            upper = prefix + ('\U0010ffff' if isinstance(prefix, str) else b'\xff')
+            return bisect.bisect_left(keys, prefix), bisect.bisect_left(keys, upper)
+        raise ValidationException('Query', 'Query key condition not supported')
+
+    def _page(self, table: _Table, candidates, kwargs: dict, table_name: str) -> dict:
+        limit = kwargs.get('Limit')
+        filter_node = self._parse('Query', kwargs['FilterExpression'], kwargs, 'condition') \
+            if kwargs.get('FilterExpression') else None
+        count_only = kwargs.get('Select') == 'COUNT'
+
+        items = []
+        scanned = 0
+        size = 0
+        last = None
+        exhausted = True
+        for item in candidates:
+            scanned += 1
+            size += item_size(item)
+            last = item
+            if filter_node is None or _evaluate(filter_node, item):
+                items.append(None if count_only else self._project('Query', item, kwargs))
+            if (limit is not None and scanned >= limit) or size >= PAGE_SIZE_BYTES:
+                exhausted = False
+                break
+
+        response = {'Count': len(items), 'ScannedCount': scanned}
+        if not count_only:
+            response['Items'] = items
+        if not exhausted and last is not None:
+            response['LastEvaluatedKey'] = table.key_attributes(last)
+        return self._with_capacity(response, kwargs, table_name, _read_units(size, kwargs.get('ConsistentRead', False)))
+
+    # --- batch operations ---------------------------------------------------------------------
+
+    def batch_get_item(self, RequestItems: dict, **kwargs) -> dict:
+        self._begin('BatchGetItem')
+        if sum(len(request['Keys']) for request in RequestItems.values()) > 100:
+            raise ValidationException('BatchGetItem', 'Too many items requested for the BatchGetItem call')
+        responses = {}
+        capacity = []
+        with self._lock:
+            for table_name, request in RequestItems.items():
+                table = self._table(table_name, 'BatchGetItem')
+                found = []
+                size = 0
+                for key in request['Keys']:
+                    item = table.get(table.key_of(key, 'BatchGetItem'))
+                    if item is not None:
+                        found.append(self._project('BatchGetItem', item, {**kwargs, **request}))
+                        size += item_size(item)
+                responses[table_name] = found
+                capacity.append({'TableName': table_name, 'CapacityUnits': _read_units(size, request.get('ConsistentRead', False))})
+        response = {'Responses': responses, 'UnprocessedKeys': {}}
+        if kwargs.get('ReturnConsumedCapacity') in ('TOTAL', 'INDEXES'):
+            response['ConsumedCapacity'] = capacity
+        return response
+
+    def batch_write_item(self, RequestItems: dict, **kwargs) -> dict:
+        self._begin('BatchWriteItem')
+        if sum(len(requests) for requests in RequestItems.values()) > 25:
+            raise ValidationException('BatchWriteItem', 'Too many items requested for the BatchWriteItem call')
+        capacity = []
+        with self._lock:
+            for table_name, requests in RequestItems.items():
+                table = self._table(table_name, 'BatchWriteItem')
+                keys = [table.key_of(request.get('PutRequest', {}).get('Item') or request['DeleteRequest']['Key'], 'BatchWriteItem')
+                        for request in requests]
+                if len(set(keys)) != len(keys):
+                    raise ValidationException('BatchWriteItem', 'Provided list of item keys contains duplicates')
+                units = 0.0
+                for key, request in zip(keys, requests):
+                    existing = table.get(key)
+                    if 'PutRequest' in request:
+                        new = copy_item(request['PutRequest']['Item'])
+                        table.put(key, new)
+                        self._notify(table, existing, new)
+                        units += _write_units(item_size(new))
+                    else:
+                        if existing is not None:
+                            table.delete(key)
+                            self._notify(table, existing, None)
+                        units += _write_units(item_size(existing or {}))
+                capacity.append({'TableName': table_name, 'CapacityUnits': units})
+        response = {'UnprocessedItems': {}}
+        if kwargs.get('ReturnConsumedCapacity') in ('TOTAL', 'INDEXES'):
+            response['ConsumedCapacity'] = capacity
+        return response
+
+    def transact_write_items(self, TransactItems: list, **kwargs) -> dict:
+        # All-or-nothing: every condition is checked before anything is written
+        self._begin('TransactWriteItems')
+        if len(TransactItems) > 100:
+            raise ValidationException('TransactWriteItems', 'Member must have length less than or equal to 100')
+        with self._lock:
+            reasons = []
+            staged = []
+            for entry in TransactItems:
+                (action, request), = entry.items()
+                table = self._table(request['TableName'], 'TransactWriteItems')
+                key = table.key_of(request.get('Item') or request['Key'], 'TransactWriteItems')
+                existing = table.get(key)
+                try:
+                    self._check('TransactWriteItems', request, existing)
+                    if action == 'Update':
+                        new, _ = self._apply_update(table, request['Key'], existing, request)
+                    elif action == 'Put':
+                        new = copy_item(request['Item'])
+                    elif action == 'Delete':
+                        new = None
+                    else:
+                        new = existing
+                    staged.append((table, key, existing, new, action))
+                    reasons.append({'Code': 'None'})
+                except ConditionalCheckFailedException:
+                    reasons.append({'Code': 'ConditionalCheckFailed', 'Message': 'The conditional request failed'})
+            if any(reason['Code'] != 'None' for reason in reasons):
+                raise TransactionCanceledException('TransactWriteItems', reasons)
+            for table, key, existing, new, action in staged:
+                if action == 'ConditionCheck':
+                    continue
+                if new is None:
+                    table.delete(key)
+                else:
+                    table.put(key, new)
+                self._notify(table, existing, new)
+        return {}
+
+
+def seed_goals(client, table_name: str, user_id: str, count: int) -> list:
+    # Fills one user's partition with goal-shaped items; returns the generated goal ids
+    goal_ids = []
+    for i in range(count):
+        goal_id = str(uuid.uuid4())
+        goal_ids.append(goal_id)
+        client.put_item(TableName=table_name, Item={
+            'userId': {'S': user_id},
+            'goalId': {'S': goal_id},
+            'title': {'S': f'Goal number {i}'},
+            'content': {'S': 'Run 5 km three times a week and keep a training log.'},
+            'createdAt': {'S': '2025-01-01T12:00:00.000000'},
+            'version': {'N': '1'}
+        })
+    return goal_ids
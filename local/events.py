@@ -0,0 +1,70 @@
+import json
+import time
+import uuid
+
+# Builders for the events and context the API Gateway REST (proxy) integration hands the handlers,
+# with the claims the Cognito user pool authorizer adds. Shared by the benchmarks and the local API.
+
+DEFAULT_USER_ID = 'local-user'
+
+
+def cognito_claims(user_id: str = DEFAULT_USER_ID, email: str = None) -> dict:
+    return {
+        'sub': user_id,
+        'email': email or f'{user_id}@example.com',
+        'email_verified': 'true',
+        'cognito:username': user_id,
+        'token_use': 'id',
+        'aud': 'local-client',
+        'iss': 'https://cognito-idp.local/local-pool'
+    }
+
+
+def resource_path(resource: str, path_parameters: dict = None) -> str:
+    path = resource
+    for name, value in (path_parameters or {}).items():
+        path = path.replace('{' + name + '}', str(value))
+    return path
+
+
+def proxy_event(method: str, resource: str, path_parameters: dict = None, query: dict = None, body=None,
+                headers: dict = None, user_id: str = DEFAULT_USER_ID, claims: dict = None,
+                authenticated: bool = True) -> dict:
+    if body is not None and not isinstance(body, str):
+        body = json.dumps(body)
+    query = {k: str(v) for k, v in (query or {}).items()} or None
+    return {
+        'resource': resource,
+        'path': resource_path(resource, path_parameters),
+        'httpMethod': method,
+        'headers': headers or {},
+        'multiValueHeaders': {k: [v] for k, v in (headers or {}).items()},
+        'queryStringParameters': query,
+        'multiValueQueryStringParameters': {k: [v] for k, v in query.items()} if query else None,
+        'pathParameters': path_parameters or None,
+        'stageVariables': None,
+        'requestContext': {
+            'resourcePath': resource,
+            'httpMethod': method,
+            'stage': 'local',
+            'requestId': str(uuid.uuid4()),
+            'requestTimeEpoch': int(time.time() * 1000),
+            'authorizer': {'claims': claims or cognito_claims(user_id)} if authenticated else None
+        },
+        'body': body,
+        'isBase64Encoded': False
+    }
+
+
+class LambdaContext:
+    # The parts of the Lambda context object the handlers use; the remaining time counts down for real
+
+    def __init__(self, function_name: str = 'local', timeout_ms: int = 5000, memory_mb: int = 128):
+        self.function_name = function_name
+        self.memory_limit_in_mb = memory_mb
+        self.aws_request_id = str(uuid.uuid4())
+        self.invoked_function_arn = f'arn:aws:lambda:local:000000000000:function:{function_name}'
+        self._deadline = time.monotonic() + timeout_ms / 1000
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
@@ -0,0 +1,76 @@
+import io
+import threading
+from collections import Counter
+from botocore.exceptions import ClientError
+
+# In-memory stand-in for the parts of the S3 client (boto3.client('s3')) that utils.content uses:
+# put_object, get_object and delete_object, with S3's error shape for missing buckets and keys.
+#
+#   from local.object_store import LocalObjectStore
+#   from utils import object_store
+#   object_store.set_client(LocalObjectStore())
+
+
+def _client_error(code: str, message: str, operation: str) -> dict:
+    return {'Error': {'Code': code, 'Message': message}, 'ResponseMetadata': {'HTTPStatusCode': 404}}
+
+
+class NoSuchKey(ClientError):
+    def __init__(self, operation: str):
+        super().__init__(_client_error('NoSuchKey', 'The specified key does not exist.', operation), operation)
+
+
+class NoSuchBucket(ClientError):
+    def __init__(self, operation: str):
+        super().__init__(_client_error('NoSuchBucket', 'The specified bucket does not exist', operation), operation)
+
+
+class _Exceptions:
+    # Mirrors client.exceptions on the boto3 client
+    NoSuchKey = NoSuchKey
+    NoSuchBucket = NoSuchBucket
+    ClientError = ClientError
+
+
+class LocalObjectStore:
+    exceptions = _Exceptions
+
+    def __init__(self, buckets: tuple = None):
+        # Without explicit buckets any bucket name is accepted and created on first write
+        self.buckets = {name: {} for name in buckets} if buckets else {}
+        self._auto_create = not buckets
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _bucket(self, name: str, operation: str, create: bool = False) -> dict:
+        if name not in self.buckets:
+            if not (create and self._auto_create):
+                raise NoSuchBucket(operation)
+            self.buckets[name] = {}
+        return self.buckets[name]
+
+    def put_object(self, Bucket: str, Key: str, Body=b'', ContentType: str = None, **kwargs) -> dict:
+        self.calls['PutObject'] += 1
+        data = Body.encode('utf-8') if isinstance(Body, str) else bytes(Body.read() if hasattr(Body, 'read') else Body)
+        with self._lock:
+            self._bucket(Bucket, 'PutObject', create=True)[Key] = (data, ContentType or 'binary/octet-stream', dict(kwargs.get('Metadata') or {}))
+        return {}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        self.calls['GetObject'] += 1
+        with self._lock:
+            stored = self._bucket(Bucket, 'GetObject').get(Key)
+        if stored is None:
+            raise NoSuchKey('GetObject')
+        data, content_type, metadata = stored
+        return {'Body': io.BytesIO(data), 'ContentLength': len(data), 'ContentType': content_type, 'Metadata': metadata}
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        # Like S3, deleting a missing key succeeds
+        self.calls['DeleteObject'] += 1
+        with self._lock:
+            self._bucket(Bucket, 'DeleteObject').pop(Key, None)
+        return {}
+
+    def object_count(self, bucket: str = None) -> int:
+        return sum(len(objects) for name, objects in self.buckets.items() if bucket is None or name == bucket)
@@ -0,0 +1,66 @@
+import hashlib
+import uuid
+from botocore.exceptions import ClientError
+
+# In-memory stand-in for an SQS standard queue with a redrive policy, and for the Lambda event source
+# mapping that drains it: send_message as on the boto3 client, and deliver() handing messages to a
+# consumer in batches with partial batch responses. A message that failed max_receive_count times
+# moves to dead_letters, as it would to the dead-letter queue.
+#
+#   queue = LocalQueue()
+#   write_queue.set_client(queue)
+#   ... POST /goals with GOAL_WRITE_QUEUE_URL=queue.url ...
+#   queue.deliver(goal_writer.lambda_handler)
+
+MAX_MESSAGE_BYTES = 256 * 1024
+
+
+class LocalQueue:
+
+    def __init__(self, url: str = 'https://sqs.local/000000000000/goal-writes'):
+        self.url = url
+        self.pending = []
+        self.dead_letters = []
+
+    def send_message(self, QueueUrl: str, MessageBody: str, **kwargs) -> dict:
+        if QueueUrl != self.url:
+            raise ClientError({'Error': {'Code': 'AWS.SimpleQueueService.NonExistentQueue',
+                                         'Message': 'The specified queue does not exist.'}}, 'SendMessage')
+        if len(MessageBody.encode('utf-8')) > MAX_MESSAGE_BYTES:
+            raise ClientError({'Error': {'Code': 'InvalidParameterValue',
+                                         'Message': f'Message must be shorter than {MAX_MESSAGE_BYTES} bytes.'}}, 'SendMessage')
+        message = {'messageId': str(uuid.uuid4()), 'body': MessageBody, 'receiveCount': 0}
+        self.pending.append(message)
+        return {'MessageId': message['messageId'], 'MD5OfMessageBody': hashlib.md5(MessageBody.encode('utf-8')).hexdigest()}
+
+    def deliver(self, handler, batch_size: int = 100, max_receive_count: int = 5) -> int:
+        # Invokes handler until the queue is drained; returns the number of invocations. A failed
+        # message goes back to the end of the queue, like one whose visibility timeout ran out
+        invocations = 0
+        while self.pending:
+            batch = self.pending[:batch_size]
+            del self.pending[:len(batch)]
+            for message in batch:
+                message['receiveCount'] += 1
+            invocations += 1
+            records = [{
+                'messageId': message['messageId'],
+                'receiptHandle': message['messageId'],
+                'body': message['body'],
+                'attributes': {'ApproximateReceiveCount': str(message['receiveCount'])},
+                'eventSource': 'aws:sqs'
+            } for message in batch]
+            try:
+                response = handler({'Records': records}, None) or {}
+                failed = {failure['itemIdentifier'] for failure in response.get('batchItemFailures') or []}
+            except Exception:
+                # The whole batch returns to the queue
+                failed = {message['messageId'] for message in batch}
+            for message in batch:
+                if message['messageId'] not in failed:
+                    continue
+                if message['receiveCount'] >= max_receive_count:
+                    self.dead_letters.append(message)
+                else:
+                    self.pending.append(message)
+        return invocations
@@ -0,0 +1,73 @@
+import time
+
+# DynamoDB Streams for the in-memory client: records every committed write of one table as a
+# NEW_AND_OLD_IMAGES stream record and hands them to a consumer in batches, the way the Lambda
+# event source mapping does, including its filter criteria and partial batch responses.
+#
+#   stream = LocalStream(client, 'goals-local', filters=GOAL_FILTERS)
+#   ... writes ...
+#   stream.deliver(goal_summary.lambda_handler)
+
+
+def _title_exists(record: dict) -> bool:
+    images = record['dynamodb']
+    return 'title' in (images.get('NewImage') or {}) or 'title' in (images.get('OldImage') or {})
+
+
+# The filter criteria of the GoalSummary event source (app_constructs/lambda_module.py)
+GOAL_FILTERS = (_title_exists,)
+
+
+class LocalStream:
+
+    def __init__(self, client, table_name: str, filters: tuple = ()):
+        self.table_name = table_name
+        self.filters = filters
+        self.pending = []
+        self._sequence = 0
+        client.add_listener(self._record)
+
+    def _record(self, table_name: str, event_name: str, old: dict, new: dict):
+        if table_name != self.table_name:
+            return
+        self._sequence += 1
+        image = new or old
+        record = {
+            'eventName': event_name,
+            'eventSource': 'aws:dynamodb',
+            'dynamodb': {
+                'ApproximateCreationDateTime': int(time.time()),
+                'Keys': {name: image[name] for name in ('userId', 'goalId') if name in image},
+                'SequenceNumber': f'{self._sequence:021d}',
+                'StreamViewType': 'NEW_AND_OLD_IMAGES'
+            }
+        }
+        if new is not None:
+            record['dynamodb']['NewImage'] = new
+        if old is not None:
+            record['dynamodb']['OldImage'] = old
+        # Filtered records are dropped for good, as with a filtered event source mapping
+        if not self.filters or any(accepts(record) for accepts in self.filters):
+            self.pending.append(record)
+
+    def deliver(self, handler, batch_size: int = 100, max_attempts: int = 3) -> int:
+        # Invokes handler until the stream is drained; a reported failure retries the batch from
+        # that record. Returns the number of invocations
+        invocations = 0
+        attempts = 0
+        while self.pending:
+            batch = self.pending[:batch_size]
+            invocations += 1
+            response = handler({'Records': batch}, None) or {}
+            failures = response.get('batchItemFailures') or []
+            if not failures:
+                del self.pending[:len(batch)]
+                attempts = 0
+                continue
+            attempts += 1
+            if attempts >= max_attempts:
+                raise RuntimeError(f'Stream consumer failed {attempts} times from record {failures[0]["itemIdentifier"]}')
+            failed_at = next(index for index, record in enumerate(batch)
+                             if record['dynamodb']['SequenceNumber'] == failures[0]['itemIdentifier'])
+            del self.pending[:failed_at]
+        return invocations
@@ -0,0 +1,14 @@
+// API Gateway caches goal reads per caller (see the APIGateway construct). The "v" query
+// parameter is part of the cache key, so bumping it after a write makes the next reads miss
+// the stage cache instead of returning entries cached before the write.
+const STORAGE_KEY = 'goalsWriteVersion';
+
+export function markGoalsChanged() {
+  localStorage.setItem(STORAGE_KEY, Date.now().toString());
+}
+
+export function goalsReadInit(params: Record<string, string> = {}) {
+  const version = localStorage.getItem(STORAGE_KEY);
+  const queryStringParameters = version ? { ...params, v: version } : params;
+  return Object.keys(queryStringParameters).length ? { queryStringParameters } : null;
+}
@@ -10,6 +10,7 @@ import {
   Form,
 } from 'react-bootstrap';
 import { Redirect } from 'react-router-dom';
+import { goalsReadInit, markGoalsChanged } from '../../common/goalsCache';
 
 import './AddEditGoal.css';
 
@@ -71,7 +72,7 @@ export default class AddEditGoal extends Component<
       isLoading: true,
     });
 
-    API.get('goals', `/goals/${goalId}`, null)
+    API.get('goals', `/goals/${goalId}`, goalsReadInit())
       .then((value: any) => {
         this.setState({
           isLoading: false,
@@ -130,6 +131,7 @@ export default class AddEditGoal extends Component<
       },
     })
       .then((value: any) => {
+        markGoalsChanged();
         this.setState({
           isUpdating: false,
           redirect: '/',
@@ -154,6 +156,7 @@ export default class AddEditGoal extends Component<
       },
     })
       .then((value: any) => {
+        markGoalsChanged();
         this.setState({
           isUpdating: false,
           redirect: '/',
@@ -179,6 +182,7 @@ export default class AddEditGoal extends Component<
 
     return API.del('goals', `/goals/${this.props.match.params.id}`, null)
       .then((value: any) => {
+        markGoalsChanged();
         this.setState({
           isDeleting: false,
           showDeleteModal: false,
@@ -2,6 +2,7 @@ import React, { Component } from 'react';
 import { Button, Table, Spinner } from 'react-bootstrap';
 import API from '@aws-amplify/api';
 import { Redirect } from 'react-router-dom';
+import { goalsReadInit } from '../../common/goalsCache';
 
 import fullStack from '../../images/full-stack.png';
 import './home.css';
@@ -12,7 +13,9 @@ interface HomeProps {
 
 interface HomeState {
   isLoading: boolean;
+  isLoadingMore: boolean;
   goals: Goal[];
+  nextCursor: string | null;
   redirect: boolean;
 }
 
@@ -23,13 +26,22 @@ interface Goal {
   createdAt: Date;
 }
 
+interface GoalsPage {
+  items: Goal[];
+  nextCursor: string | null;
+}
+
+const PAGE_SIZE = '50';
+
 export default class Home extends Component<HomeProps, HomeState> {
   constructor(props: HomeProps) {
     super(props);
 
     this.state = {
       isLoading: true,
+      isLoadingMore: false,
       goals: [],
+      nextCursor: null,
       redirect: false,
     };
   }
@@ -42,8 +54,8 @@ export default class Home extends Component<HomeProps, HomeState> {
     this.setState({ isLoading: true });
 
     try {
-      const goals = await this.goals();
-      this.setState({ goals });
+      const page = await this.goals();
+      this.setState({ goals: page.items, nextCursor: page.nextCursor });
     } catch (error) {
       console.error('Failed to load goals:', error);
       alert('An error occurred while loading your goals.');
@@ -52,10 +64,38 @@ export default class Home extends Component<HomeProps, HomeState> {
     }
   }
 
-  goals() {
-    return API.get('goals', '/goals', null);
+  goals(cursor?: string): Promise<GoalsPage> {
+    // The API's default (ascending) key order, not order=desc: goals created before ids became
+    // time-ordered keep UUID ids, which sort above every ULID, so a newest-first first page of a
+    // user with many such goals would hold none of the new ones
+    const params: Record<string, string> = { limit: PAGE_SIZE };
+    if (cursor) {
+      params.cursor = cursor;
+    }
+    return API.get('goals', '/goals', goalsReadInit(params));
   }
 
+  onLoadMore = async () => {
+    if (!this.state.nextCursor) {
+      return;
+    }
+
+    this.setState({ isLoadingMore: true });
+
+    try {
+      const page = await this.goals(this.state.nextCursor);
+      this.setState({
+        goals: this.state.goals.concat(page.items),
+        nextCursor: page.nextCursor,
+      });
+    } catch (error) {
+      console.error('Failed to load goals:', error);
+      alert('An error occurred while loading your goals.');
+    } finally {
+      this.setState({ isLoadingMore: false });
+    }
+  };
+
   renderGoalsList(goals: Goal[]) {
     let goalsList: Goal[] = [];
 
@@ -143,6 +183,17 @@ export default class Home extends Component<HomeProps, HomeState> {
             )}
           </tbody>
         </Table>
+        {this.state.nextCursor && (
+          <div className="text-center mb-3">
+            <Button
+              variant="secondary"
+              onClick={this.onLoadMore}
+              disabled={this.state.isLoadingMore}
+            >
+              {this.state.isLoadingMore ? 'Loading...' : 'Load more'}
+            </Button>
+          </div>
+        )}
       </div>
     );
   }